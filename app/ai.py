@@ -1,21 +1,59 @@
-from openai import OpenAI
+from functools import lru_cache
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncIterator
+
 from .config import settings
+from .metrics import observe
+from .prompts import build_messages
+from .tools import FILLER, TOOL_SPECS, ToolCall, ToolSession, assistant_tool_message, tool_messages
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+# The openai package takes about a second to import, so the clients are built
+# on first use (main warms the async one in a thread after startup).
+@lru_cache(maxsize=1)
+def get_client() -> "OpenAI":
+    from openai import OpenAI
+
+    return OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+
+
+@lru_cache(maxsize=1)
+def get_async_client() -> "AsyncOpenAI":
+    """Shared by every live call so connections to the API are pooled per worker."""
+    from openai import AsyncOpenAI
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+
+
+MODEL = "gpt-4o-mini"
+# Follow-up requests allowed after tool calls in one caller turn.
+MAX_TOOL_ROUNDS = 2
 
 SYSTEM_PROMPT = """You are the voice agent for a professional moving company.
 - Be concise, warm, and decisive.
 - Capabilities: schedule appointments; provide estimates (ask miles, rooms, stairs, special items); order status lookup by name/phone/order #; FAQs (insurance, packing, windows, etc.); escalate to human if stuck.
 - Always confirm key details back to the caller.
+- Use the tools for prices, bookings and order status as soon as you have what they need; never guess a price.
+- When the caller lists furniture, record it with update_inventory as you go; quotes then use those items.
+- If a booking comes back unavailable, offer the open times it returns; never promise a time the tools have not confirmed.
 """
 
+# Built once: the same object (and bytes) opens every request.
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+def _messages(history: list[dict], user_text: str) -> list[dict]:
+    return build_messages(_SYSTEM_MESSAGE, history, user_text, settings.PROMPT_TOKEN_BUDGET).messages
+
 def stream_completion(history: list[dict], user_text: str):
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}] + history + [
-        {"role": "user", "content": user_text}
-    ]
-    stream = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
+    stream = get_client().chat.completions.create(
+        model=MODEL,
+        messages=_messages(history, user_text),
         temperature=0.2,
         stream=True
     )
@@ -23,3 +61,94 @@ def stream_completion(history: list[dict], user_text: str):
         delta = chunk.choices[0].delta
         if delta and delta.content:
             yield delta.content
+
+async def astream_completion(
+    history: list[dict], user_text: str, tools: ToolSession | None = None
+) -> AsyncIterator[str]:
+    """Async counterpart of ``stream_completion`` for use on the event loop.
+
+    With ``tools`` the model may call the workflows in ``app.tools``: the
+    calls run while ``FILLER`` is being spoken, and their results go back in
+    a follow-up request whose answer is streamed in the same turn (at most
+    ``MAX_TOOL_ROUNDS`` times).
+
+    Cancelling the consuming task closes the HTTP stream, so an interrupted
+    answer stops generating (and billing) tokens right away. Each turn logs
+    its prompt size (local count, and the provider's including cached
+    tokens when reported), time to first token and tool calls.
+    """
+    prompt = build_messages(_SYSTEM_MESSAGE, history, user_text, settings.PROMPT_TOKEN_BUDGET)
+    messages = prompt.messages
+    started = time.perf_counter()
+    ttft = None
+    usage = None
+    tool_calls = 0
+    filled = False
+    try:
+        for round_ in range(MAX_TOOL_ROUNDS + 1):
+            offer_tools = tools is not None and round_ < MAX_TOOL_ROUNDS
+            requested = time.perf_counter()
+            stream = await get_async_client().chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.2,
+                stream=True,
+                stream_options={"include_usage": True},
+                **({"tools": TOOL_SPECS} if offer_tools else {}),
+            )
+            observe("llm_request", time.perf_counter() - requested)
+            spoken: list[str] = []
+            pending: dict[int, dict] = {}
+            try:
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if not delta:
+                        continue
+                    if delta.content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - started
+                            observe("llm_ttft", ttft)
+                        spoken.append(delta.content)
+                        yield delta.content
+                    for part in delta.tool_calls or ():
+                        entry = pending.setdefault(part.index, {"id": "", "name": "", "arguments": ""})
+                        entry["id"] = part.id or entry["id"]
+                        if part.function is not None:
+                            entry["name"] += part.function.name or ""
+                            entry["arguments"] += part.function.arguments or ""
+                    if pending and not spoken and not filled:
+                        # Cover the tool round-trip with speech, once per turn.
+                        filled = True
+                        if ttft is None:
+                            ttft = time.perf_counter() - started
+                            observe("llm_ttft", ttft)
+                        spoken.append(FILLER)
+                        yield FILLER
+            finally:
+                await stream.close()
+            if not pending:
+                return
+            calls = [ToolCall(**pending[index]) for index in sorted(pending)]
+            tool_calls += len(calls)
+            tools_started = time.perf_counter()
+            results = await tools.run_all(calls)
+            observe("tool_round", time.perf_counter() - tools_started)
+            messages = [*messages, assistant_tool_message("".join(spoken), calls), *tool_messages(calls, results)]
+    finally:
+        observe("llm_turn", time.perf_counter() - started)
+        details = getattr(usage, "prompt_tokens_details", None)
+        logger.info(
+            "llm turn: prompt_tokens=%d (provider %s, cached %s) messages=%d dropped=%d tool_calls=%d ttft_ms=%s total_ms=%.0f",
+            prompt.tokens,
+            getattr(usage, "prompt_tokens", "n/a"),
+            getattr(details, "cached_tokens", "n/a"),
+            len(prompt.messages),
+            prompt.dropped,
+            tool_calls,
+            "n/a" if ttft is None else f"{ttft * 1e3:.0f}",
+            (time.perf_counter() - started) * 1e3,
+        )
@@ -0,0 +1,244 @@
+"""Precompiled binary form of the furniture catalog and its match index.
+
+Parsing ``CATALOG_TSV`` and building the trigram index costs a few
+milliseconds that would otherwise land on the first estimate of every cold
+worker. ``python -m app.catalog_artifact`` serializes both into
+``app/catalog.bin`` at build time; ``furniture_catalog`` loads it at import
+and falls back to parsing the TSV when the file is missing or stale.
+
+Layout (little-endian): a fixed header, a NUL-separated string table, then
+flat typed arrays for the item columns, trigram postings and exact-name
+lookups. Every array is read with ``array.frombytes`` so loading is a handful
+of copies rather than per-record parsing.
+"""
+from __future__ import annotations
+
+from array import array
+from hashlib import sha256
+from pathlib import Path
+import struct
+import sys
+from types import CodeType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .furniture_catalog import CatalogItem, _MatchIndex
+
+# furniture_catalog loads the artifact while it is itself being imported, so
+# this module only reaches back into it from inside functions.
+
+
+ARTIFACT_PATH = Path(__file__).with_name("catalog.bin")
+
+_MAGIC = b"DMCAT"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<5sH32s5I")
+_STRING_COLUMNS = ("key", "name", "handling", "surcharge", "normalized")
+_NONE = 0xFFFFFFFF
+
+
+def fingerprint() -> bytes:
+    """Digest of everything the artifact is derived from.
+
+    That is the data (``CATALOG_TSV``, ``ALIASES``) and the code that turns
+    it into the index: the bytecode of ``normalize_query``, ``_trigrams``
+    and ``_build_match_index`` and the tables they use, so editing the
+    matcher invalidates an artifact built before the edit. Bytecode is
+    specific to the Python minor version, so an artifact built under another
+    version also reads as stale (the TSV is parsed instead).
+    """
+    from . import furniture_catalog as catalog
+
+    digest = sha256()
+    digest.update(str(_FORMAT_VERSION).encode())
+    digest.update(catalog.CATALOG_TSV.encode("utf-8"))
+    digest.update(repr(sorted(catalog.ALIASES.items())).encode("utf-8"))
+    for func in (catalog.normalize_query, catalog._trigrams, catalog._build_match_index):
+        _digest_code(digest, func.__code__)
+    digest.update(repr((
+        sorted(catalog._SYMBOL_WORDS.items()), catalog._SYMBOL_RE.pattern, catalog._NON_WORD_RE.pattern,
+    )).encode("utf-8"))
+    return digest.digest()
+
+
+def _digest_code(digest, code: CodeType) -> None:
+    # Bytecode, names and constants, recursing into nested functions; not the line numbers.
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _digest_code(digest, const)
+        elif isinstance(const, frozenset):  # set literals; their repr order follows string hashing
+            digest.update(repr(sorted(const, key=repr)).encode("utf-8"))
+        else:
+            digest.update(repr(const).encode("utf-8"))
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, buffer: memoryview, offset: int, count: int) -> tuple[array, int]:
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(buffer[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def dumps(items: dict[str, CatalogItem], index: _MatchIndex) -> bytes:
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def intern(value: str | None) -> int:
+        if value is None:
+            return _NONE
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    positions = {key: position for position, key in enumerate(index.keys)}
+    columns = {name: array("I") for name in _STRING_COLUMNS}
+    volumes = array("d")
+    weights = array("d")
+    for key, normalized in zip(index.keys, index.normalized):
+        item = items[key]
+        columns["key"].append(intern(key))
+        columns["name"].append(intern(item.name))
+        columns["handling"].append(intern(item.handling))
+        columns["surcharge"].append(intern(item.surcharge))
+        columns["normalized"].append(intern(normalized))
+        volumes.append(item.volume)
+        weights.append(item.weight)
+    # Index positions are in sorted key order; keep the TSV order for catalog_items().
+    item_order = array("H", (positions[key] for key in items))
+
+    gram_ids = array("I")
+    posting_offsets = array("I", [0])
+    postings = array("H")
+    for gram, hits in index.postings.items():
+        gram_ids.append(intern(gram))
+        postings.extend(hits)
+        posting_offsets.append(len(postings))
+
+    exact_ids = array("I")
+    exact_positions = array("H")
+    for text, key in index.exact.items():
+        exact_ids.append(intern(text))
+        exact_positions.append(positions[key])
+
+    blob = "\0".join(strings).encode("utf-8")
+
+    sections = [
+        _HEADER.pack(
+            _MAGIC,
+            _FORMAT_VERSION,
+            fingerprint(),
+            len(index.keys),
+            len(strings),
+            len(blob),
+            len(gram_ids),
+            len(exact_ids),
+        ),
+        blob,
+        *(_little_endian(columns[name]) for name in _STRING_COLUMNS),
+        _little_endian(volumes),
+        _little_endian(weights),
+        _little_endian(array("H", index.gram_counts)),
+        _little_endian(item_order),
+        _little_endian(gram_ids),
+        _little_endian(posting_offsets),
+        _little_endian(postings),
+        _little_endian(exact_ids),
+        _little_endian(exact_positions),
+    ]
+    return b"".join(sections)
+
+
+def loads(data: bytes) -> tuple[dict[str, CatalogItem], _MatchIndex] | None:
+    """Decode an artifact, or return ``None`` if it is foreign or out of date."""
+    from .furniture_catalog import CatalogItem, _MatchIndex
+
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, digest, n_items, n_strings, blob_size, n_grams, n_exact = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _FORMAT_VERSION or digest != fingerprint():
+        return None
+
+    buffer = memoryview(data)
+    offset = _HEADER.size
+    strings = bytes(buffer[offset : offset + blob_size]).decode("utf-8").split("\0")
+    offset += blob_size
+    if len(strings) != n_strings:
+        return None
+
+    def lookup(string_id: int) -> str | None:
+        return None if string_id == _NONE else strings[string_id]
+
+    keys, offset = _read_array("I", buffer, offset, n_items)
+    names, offset = _read_array("I", buffer, offset, n_items)
+    handling, offset = _read_array("I", buffer, offset, n_items)
+    surcharge, offset = _read_array("I", buffer, offset, n_items)
+    normalized, offset = _read_array("I", buffer, offset, n_items)
+    volumes, offset = _read_array("d", buffer, offset, n_items)
+    weights, offset = _read_array("d", buffer, offset, n_items)
+    gram_counts, offset = _read_array("H", buffer, offset, n_items)
+    item_order, offset = _read_array("H", buffer, offset, n_items)
+    gram_ids, offset = _read_array("I", buffer, offset, n_grams)
+    posting_offsets, offset = _read_array("I", buffer, offset, n_grams + 1)
+    postings, offset = _read_array("H", buffer, offset, posting_offsets[-1])
+    exact_ids, offset = _read_array("I", buffer, offset, n_exact)
+    exact_positions, offset = _read_array("H", buffer, offset, n_exact)
+
+    key_strings = tuple(strings[i] for i in keys)
+    rows = zip(
+        (strings[i] for i in names),
+        volumes,
+        weights,
+        map(lookup, handling),
+        map(lookup, surcharge),
+    )
+    by_position = list(map(CatalogItem, *zip(*rows)))
+    items = {key_strings[i]: by_position[i] for i in item_order}
+    posting_list = postings.tolist()
+    index = _MatchIndex(
+        keys=key_strings,
+        normalized=tuple(strings[i] for i in normalized),
+        gram_counts=tuple(gram_counts),
+        postings={
+            strings[gram_ids[i]]: tuple(posting_list[posting_offsets[i] : posting_offsets[i + 1]])
+            for i in range(n_grams)
+        },
+        exact={strings[exact_ids[i]]: key_strings[exact_positions[i]] for i in range(n_exact)},
+    )
+    return items, index
+
+
+def load_artifact(path: Path = ARTIFACT_PATH) -> tuple[dict[str, CatalogItem], _MatchIndex] | None:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        return loads(data)
+    except (struct.error, ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+
+def build_artifact(path: Path = ARTIFACT_PATH) -> int:
+    from .furniture_catalog import _build_match_index, _parse_catalog_tsv
+
+    items = _parse_catalog_tsv()
+    data = dumps(items, _build_match_index(items))
+    path.write_bytes(data)
+    return len(data)
+
+
+if __name__ == "__main__":
+    size = build_artifact()
+    print(f"wrote {ARTIFACT_PATH} ({size} bytes)")
@@ -1,14 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
+import sys
 from typing import Any, Mapping
 
-try:
-    import streamlit as st
-
-    _secrets_source: Mapping[str, Any] = st.secrets
-except Exception:  # pragma: no cover - streamlit not available
-    _secrets_source = {}
+# Same places Streamlit looks: the project's file wins over the user-wide one.
+SECRETS_PATHS = (Path(".streamlit/secrets.toml"), Path.home() / ".streamlit" / "secrets.toml")
 
 
 def _load_local_secrets(path: Path) -> Mapping[str, Any]:
@@ -30,8 +27,31 @@ def _load_local_secrets(path: Path) -> Mapping[str, Any]:
         return {}
 
 
-if not _secrets_source:
-    _secrets_source = _load_local_secrets(Path(".streamlit/secrets.toml"))
+def _streamlit_secrets() -> Mapping[str, Any]:
+    try:
+        import streamlit as st
+
+        return dict(st.secrets)
+    except Exception:  # pragma: no cover - no secrets configured
+        return {}
+
+
+def _load_secrets() -> Mapping[str, Any]:
+    # Inside a Streamlit app, st.secrets is already loaded (and may come from
+    # the hosting platform). Anywhere else, e.g. under uvicorn, importing
+    # streamlit just to parse a TOML file costs a few hundred milliseconds.
+    if "streamlit" in sys.modules:
+        secrets = _streamlit_secrets()
+        if secrets:
+            return secrets
+    for path in SECRETS_PATHS:
+        secrets = _load_local_secrets(path)
+        if secrets:
+            return secrets
+    return {}
+
+
+_secrets_source: Mapping[str, Any] = _load_secrets()
 
 
 def _get(key: str, default: str | None = None) -> str | None:
@@ -41,7 +61,14 @@ def _get(key: str, default: str | None = None) -> str | None:
 
 class Settings:
     OPENAI_API_KEY = _get("OPENAI_API_KEY")
+    OPENAI_BASE_URL = _get("OPENAI_BASE_URL")
     DATABASE_URL = _get("DATABASE_URL")
+    DB_POOL_SIZE = int(_get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(_get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(_get("DB_POOL_TIMEOUT", "30"))
+    # Run create_all/column and index checks when a worker starts; turn off when
+    # `python -m app.db` runs in the release step instead.
+    DB_INIT_ON_STARTUP = str(_get("DB_INIT_ON_STARTUP", "true")).lower() not in ("false", "0", "no")
     TWILIO_ACCOUNT_SID = _get("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = _get("TWILIO_AUTH_TOKEN")
     TWILIO_NUMBER = _get("TWILIO_NUMBER")
@@ -51,11 +78,46 @@ class Settings:
     AWS_SES_ACCESS_KEY_ID = _get("AWS_SES_ACCESS_KEY_ID")
     AWS_SES_SECRET_ACCESS_KEY = _get("AWS_SES_SECRET_ACCESS_KEY")
     AWS_SES_CONFIGURATION_SET = _get("AWS_SES_CONFIGURATION_SET")
+    EMAIL_SEND_CONCURRENCY = int(_get("EMAIL_SEND_CONCURRENCY", "4"))
     BASE_URL = _get("BASE_URL")
     WS_URL = _get("WS_URL") or (BASE_URL or "").replace("https", "wss") + "/voice/ws"
     ELEVENLABS_VOICE_ID = _get("ELEVENLABS_VOICE_ID", "UgBBYS2sOqTuMpoF3BR0")
     COMPANY_NAME = _get("COMPANY_NAME", "Dash Movers")
     COMPANY_CITY = _get("COMPANY_CITY", "Your City")
+    SESSION_STORE_URL = _get("SESSION_STORE_URL")
+    SESSION_TTL_SECONDS = int(_get("SESSION_TTL_SECONDS", "3600"))
+    HISTORY_TOKEN_BUDGET = int(_get("HISTORY_TOKEN_BUDGET", "1200"))
+    SUMMARY_TOKEN_BUDGET = int(_get("SUMMARY_TOKEN_BUDGET", "300"))
+    PROMPT_TOKEN_BUDGET = int(_get("PROMPT_TOKEN_BUDGET", "2000"))
+    # Coalesce LLM deltas into phrase/sentence frames; flush after this long regardless.
+    RELAY_COALESCE = str(_get("RELAY_COALESCE", "true")).lower() not in ("false", "0", "no")
+    RELAY_FLUSH_MS = int(_get("RELAY_FLUSH_MS", "200"))
+    # Let the LLM run quotes, bookings and order lookups (app.tools) during a turn.
+    LLM_TOOLS = str(_get("LLM_TOOLS", "true")).lower() not in ("false", "0", "no")
+    # Crew and fleet size for booking (app.scheduling); wall-clock times in the company's timezone.
+    # IANA zone those wall-clock times are in; "now" and "today" for bookings are taken there.
+    COMPANY_TIMEZONE = _get("COMPANY_TIMEZONE", "America/Chicago")
+    CREW_MOVERS = int(_get("CREW_MOVERS", "12"))
+    FLEET_TRUCKS = int(_get("FLEET_TRUCKS", "4"))
+    WORKDAY_START = _get("WORKDAY_START", "07:00")
+    WORKDAY_END = _get("WORKDAY_END", "19:00")
+    SCHEDULE_SLOT_MINUTES = int(_get("SCHEDULE_SLOT_MINUTES", "30"))
+    SCHEDULE_START_STEP_MINUTES = int(_get("SCHEDULE_START_STEP_MINUTES", "60"))
+    SCHEDULE_HORIZON_DAYS = int(_get("SCHEDULE_HORIZON_DAYS", "60"))
+    # Truck capacity for packing itemized moves (app.truck_loading): box volume, payload and
+    # the share of the box a furniture load fills. 7 lbs/cu ft loads stay weight-bound.
+    TRUCK_VOLUME_CUFT = float(_get("TRUCK_VOLUME_CUFT", "1700"))
+    TRUCK_PAYLOAD_LBS = float(_get("TRUCK_PAYLOAD_LBS", "8000"))
+    TRUCK_LOAD_FACTOR = float(_get("TRUCK_LOAD_FACTOR", "0.7"))
+    # Offline drive times (app.geo): warehouse as a ZIP, "City, ST" or "lat,lon"; optional
+    # ZIP centroid file (Census ZCTA gazetteer); road model fitted with DriveModel.calibrate.
+    WAREHOUSE_LOCATION = _get("WAREHOUSE_LOCATION")
+    GEO_ZIP_TABLE = _get("GEO_ZIP_TABLE")
+    GEO_ROAD_FACTOR = float(_get("GEO_ROAD_FACTOR", "1.2"))
+    GEO_AVG_MPH = float(_get("GEO_AVG_MPH", "55"))
+    GEO_OVERHEAD_MINUTES = float(_get("GEO_OVERHEAD_MINUTES", "10"))
+    # Per-number overrides for shared deployments: {"+1555...": {"COMPANY_NAME": ...}}.
+    COMPANIES: Mapping[str, Mapping[str, str]] = _get("COMPANIES") or {}
 
 
 settings = Settings()
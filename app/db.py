@@ -1,9 +1,14 @@
+from functools import lru_cache
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
+
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from .config import settings
 from .models import Base
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = os.getenv("DATABASE_URL") or settings.DATABASE_URL
 
 if DATABASE_URL:
     if DATABASE_URL.startswith("postgresql://"):
@@ -15,8 +20,97 @@ if DATABASE_URL:
             "postgres://", "postgresql+psycopg://", 1
         )
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=5, max_overflow=10)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+def _async_url(url: str) -> str:
+    # psycopg 3 serves both engines under the same dialect name; SQLite needs aiosqlite.
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+_pool_kwargs = dict(pool_pre_ping=True)
+if DATABASE_URL and not DATABASE_URL.startswith("sqlite"):
+    # SQLite picks its own pool class per driver, and not all of them accept sizing.
+    _pool_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+# Engines are created on first use: building one imports the driver (psycopg
+# or aiosqlite), and scripts that import models or workflows may never connect.
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """The sync engine, kept for startup DDL and scripts; request paths use the async one."""
+    return create_engine(DATABASE_URL, **_pool_kwargs)
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    kwargs = dict(_pool_kwargs)
+    if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+        # aiosqlite defaults to NullPool, which opens a connection (and a thread) per session.
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    return create_async_engine(_async_url(DATABASE_URL), **kwargs)
+
+@lru_cache(maxsize=1)
+def _sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autoflush=False, expire_on_commit=False)
+
+@lru_cache(maxsize=1)
+def _async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+def SessionLocal() -> Session:
+    return _sessionmaker()()
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_sessionmaker()()
+
+async def dispose_engines() -> None:
+    """Close pooled connections of whichever engines were created."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency yielding a pooled ``AsyncSession``."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def _add_missing_columns():
+    """Add nullable columns declared after a table was first created.
+
+    There is no migration tool in this project; this covers the additive
+    changes the models make so existing databases keep working.
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                ddl_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type}"))
 
 def init_db():
+    engine = get_engine()
     Base.metadata.create_all(engine)
+    _add_missing_columns()
+    # create_all skips tables that already exist, so add indexes declared
+    # after a table was first created.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+if __name__ == "__main__":
+    # Create or upgrade the schema ahead of time (e.g. in a release step) so
+    # workers can start with DB_INIT_ON_STARTUP=false.
+    init_db()
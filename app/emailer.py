@@ -1,16 +1,56 @@
-from __future__ import annotations
+"""Outbound email through Amazon SES.
+
+``send_email`` and ``send_bulk_templated_email`` are blocking calls on a
+process-wide SES client: building a boto3 session and client resolves
+credentials and endpoints, which costs tens of milliseconds, so it happens
+once. Request handlers should not call them directly; they hand messages to
+``email_queue`` and return. The queue sends from a few background workers
+(each in a thread, since boto3 blocks), groups templated messages into
+``SendBulkTemplatedEmail`` calls of up to 50 destinations, and retries
+throttled or transient failures with jittered exponential backoff.
 
-from typing import Any, Dict
+Every entry point takes an explicit ``client``; pass one wrapped in a
+``botocore.stub.Stubber`` to run without AWS (see
+``benchmarks/email_queue.py``).
+"""
+from __future__ import annotations
 
-import boto3
-from botocore.client import BaseClient
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
+import logging
+import random
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 from .config import settings
+from .metrics import EMAILS, timed
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+
+logger = logging.getLogger(__name__)
+
+# SES accepts at most 50 destinations per SendBulkTemplatedEmail call.
+BULK_BATCH_SIZE = 50
+THROTTLING_CODES = frozenset({"Throttling", "ThrottlingException", "TooManyRequestsException"})
+TRANSIENT_CODES = THROTTLING_CODES | {"ServiceUnavailable", "InternalFailure", "RequestTimeout"}
+# Per-destination statuses in a bulk response that are worth another attempt.
+RETRYABLE_BULK_STATUSES = frozenset({"AccountThrottled", "TransientFailure"})
 
 
+@lru_cache(maxsize=1)
 def _get_ses_client() -> BaseClient:
+    # boto3 is imported here rather than at module level: it adds a few hundred
+    # milliseconds to every cold start, and most requests never send email.
+    import boto3
+    from botocore.config import Config
+
     session_kwargs: Dict[str, Any] = {}
-    client_kwargs: Dict[str, Any] = {}
+    client_kwargs: Dict[str, Any] = {
+        "config": Config(max_pool_connections=max(10, settings.EMAIL_SEND_CONCURRENCY)),
+    }
 
     if settings.AWS_SES_ACCESS_KEY_ID and settings.AWS_SES_SECRET_ACCESS_KEY:
         session_kwargs["aws_access_key_id"] = settings.AWS_SES_ACCESS_KEY_ID
@@ -21,11 +61,18 @@ def _get_ses_client() -> BaseClient:
     if settings.AWS_SES_REGION:
         client_kwargs["region_name"] = settings.AWS_SES_REGION
 
+    # botocore clients are thread-safe, so the queue's workers share this one.
     return session.client("ses", **client_kwargs)
 
 
-def send_email(to_email: str, subject: str, html: str) -> None:
-    client = _get_ses_client()
+def _with_configuration_set(request: Dict[str, Any]) -> Dict[str, Any]:
+    if settings.AWS_SES_CONFIGURATION_SET:
+        request["ConfigurationSetName"] = settings.AWS_SES_CONFIGURATION_SET
+    return request
+
+
+def send_email(to_email: str, subject: str, html: str, client: Optional[BaseClient] = None) -> None:
+    client = client or _get_ses_client()
 
     message: Dict[str, Any] = {
         "Source": settings.FROM_EMAIL,
@@ -36,7 +83,204 @@ def send_email(to_email: str, subject: str, html: str) -> None:
         },
     }
 
-    if settings.AWS_SES_CONFIGURATION_SET:
-        message["ConfigurationSetName"] = settings.AWS_SES_CONFIGURATION_SET
+    client.send_email(**_with_configuration_set(message))
+
+
+def send_bulk_templated_email(
+    template: str,
+    destinations: List[tuple[str, Dict[str, Any]]],
+    default_data: Optional[Dict[str, Any]] = None,
+    client: Optional[BaseClient] = None,
+) -> List[str]:
+    """Send one SES template to up to 50 ``(to_email, template_data)`` pairs.
+
+    Returns the SES status for each destination, in order.
+    """
+    client = client or _get_ses_client()
+
+    request: Dict[str, Any] = {
+        "Source": settings.FROM_EMAIL,
+        "Template": template,
+        "DefaultTemplateData": json.dumps(default_data or {}),
+        "Destinations": [
+            {
+                "Destination": {"ToAddresses": [to_email]},
+                "ReplacementTemplateData": json.dumps(data),
+            }
+            for to_email, data in destinations
+        ],
+    }
+
+    response = client.send_bulk_templated_email(**_with_configuration_set(request))
+    return [entry["Status"] for entry in response["Status"]]
+
+
+def _is_transient(exc: Exception) -> bool:
+    # Duck-typed botocore ClientError, so this module never imports botocore itself.
+    response = getattr(exc, "response", None)
+    return isinstance(response, dict) and response.get("Error", {}).get("Code") in TRANSIENT_CODES
+
+
+@dataclass
+class _Email:
+    to_email: str
+    subject: str
+    html: str
+    attempts: int = 0
+
+
+@dataclass
+class _TemplatedBatch:
+    template: str
+    destinations: List[tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    attempts: int = 0
+
+
+class EmailQueue:
+    """Background SES dispatch with bounded concurrency, batching and retries."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], BaseClient] = _get_ses_client,
+        concurrency: int = 4,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        batch_window: float = 0.05,
+    ) -> None:
+        self._client_factory = client_factory
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_window = batch_window
+        self._queue: asyncio.Queue | None = None
+        self._templated: Dict[str, _TemplatedBatch] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+        self.api_calls = 0
+
+    def start(self) -> None:
+        if not self._workers:
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            loop = asyncio.get_running_loop()
+            self._workers = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Send everything already queued, then stop the workers."""
+        await self.drain()
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._workers = []
+
+    async def drain(self) -> None:
+        """Wait until every queued message, including pending retries, is settled."""
+        self._flush_templated()
+        while True:
+            if self._queue is not None:
+                await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*self._retries, return_exceptions=True)
+
+    def enqueue(self, to_email: str, subject: str, html: str) -> None:
+        """Queue a one-off HTML email; never blocks."""
+        self._put(_Email(to_email, subject, html))
+
+    def enqueue_templated(self, to_email: str, template: str, template_data: Dict[str, Any]) -> None:
+        """Queue a templated email; destinations sharing a template go out in bulk calls."""
+        batch = self._templated.get(template)
+        if batch is None:
+            batch = self._templated[template] = _TemplatedBatch(template)
+        batch.destinations.append((to_email, template_data))
+        if len(batch.destinations) >= BULK_BATCH_SIZE:
+            self._put(self._templated.pop(template))
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush_templated)
+
+    def _flush_templated(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batches, self._templated = self._templated, {}
+        for batch in batches.values():
+            self._put(batch)
+
+    def _put(self, job) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._queue.put_nowait(job)
+        if not self._workers:
+            self.start()
+
+    async def _worker(self) -> None:
+        client = None
+        while True:
+            job = await self._queue.get()
+            try:
+                if client is None:
+                    client = await asyncio.to_thread(self._client_factory)
+                await self._send(client, job)
+            except Exception:
+                logger.exception("email worker failed on %r", job)
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, client: BaseClient, job) -> None:
+        job.attempts += 1
+        self.api_calls += 1
+        try:
+            if isinstance(job, _Email):
+                with timed("email_send"):
+                    await asyncio.to_thread(send_email, job.to_email, job.subject, job.html, client)
+                self.sent += 1
+                EMAILS.inc("sent")
+                return
+            with timed("email_send_bulk"):
+                statuses = await asyncio.to_thread(send_bulk_templated_email, job.template, job.destinations, None, client)
+        except Exception as exc:
+            if _is_transient(exc) and job.attempts < self.max_attempts:
+                EMAILS.inc("retried", amount=1 if isinstance(job, _Email) else len(job.destinations))
+                self._retry_later(job)
+            else:
+                failed = 1 if isinstance(job, _Email) else len(job.destinations)
+                self.failed += failed
+                EMAILS.inc("failed", amount=failed)
+                logger.error("giving up on email after %d attempts: %s", job.attempts, exc)
+            return
+
+        retry = _TemplatedBatch(job.template, attempts=job.attempts)
+        for destination, status in zip(job.destinations, statuses):
+            if status == "Success":
+                self.sent += 1
+                EMAILS.inc("sent")
+            elif status in RETRYABLE_BULK_STATUSES and job.attempts < self.max_attempts:
+                retry.destinations.append(destination)
+                EMAILS.inc("retried")
+            else:
+                self.failed += 1
+                EMAILS.inc("failed")
+                logger.error("SES rejected templated email to %s: %s", destination[0], status)
+        if retry.destinations:
+            self._retry_later(retry)
+
+    def _retry_later(self, job) -> None:
+        # Full jitter keeps workers that were throttled together from retrying together.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)))
+        task = asyncio.get_running_loop().create_task(self._requeue_after(delay, job))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue_after(self, delay: float, job) -> None:
+        await asyncio.sleep(delay)
+        self._put(job)
+
 
-    client.send_email(**message)
+email_queue = EmailQueue(concurrency=settings.EMAIL_SEND_CONCURRENCY)
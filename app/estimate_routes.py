@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date
+import json
+from typing import Annotated
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+
+from .furniture_catalog import LocationProfile, ProfileName, normalize_query
+from .pricing import pricing_rules
+from .utils import TTLCache
+from .workflows import estimate_from_inventory
+
+
+router = APIRouter(tags=["estimate"])
+
+# Keys include the pricing version, so a rate change misses the cache at once;
+# the TTL just bounds memory held for one-off requests.
+ESTIMATE_CACHE_TTL_SECONDS = 300.0
+_estimate_cache = TTLCache(ttl=ESTIMATE_CACHE_TTL_SECONDS, maxsize=2048)
+
+
+# Coast to coast is under 3,000 road miles; past this a request is a typo or a probe,
+# and unbounded inputs can price to Infinity, which is not valid JSON.
+MAX_DISTANCE_MILES = 5000
+MAX_ITEM_QUANTITY = 1000
+
+# At least one item, and every quantity from 1 to MAX_ITEM_QUANTITY; anything else is a 422.
+ItemQuantities = Annotated[dict[str, Annotated[int, Field(ge=1, le=MAX_ITEM_QUANTITY)]], Field(min_length=1)]
+ItemNames = Annotated[list[str], Field(min_length=1)]
+
+
+class EstimatePayload(BaseModel):
+    items: ItemQuantities | ItemNames = Field(
+        ..., description="Items to move, as {name: quantity} or a list of names (one each)"
+    )
+    distance_miles: float = Field(
+        ..., ge=0, le=MAX_DISTANCE_MILES, description="Miles between origin and destination"
+    )
+    move_date: date = Field(..., description="Date of the move (YYYY-MM-DD)")
+    profile: ProfileName = Field(LocationProfile.MULTI_FLOOR, description="Location profile for mover productivity")
+
+
+def _canonical_items(items: dict[str, int] | list[str]) -> dict[str, int]:
+    pairs = items.items() if isinstance(items, dict) else ((name, 1) for name in items)
+    merged: dict[str, int] = {}
+    for name, qty in pairs:
+        key = normalize_query(name)
+        merged[key] = merged.get(key, 0) + qty
+    return dict(sorted(merged.items()))
+
+
+def _encoded_estimate(items: dict[str, int], distance: float, move_date: date, profile: str) -> bytes:
+    return json.dumps(estimate_from_inventory(items, distance, move_date, profile)).encode()
+
+
+@router.post("/estimate")
+async def estimate(payload: EstimatePayload) -> Response:
+    """Price a move from the caller's inventory, distance and move date."""
+    items = _canonical_items(payload.items)
+    distance = round(payload.distance_miles, 1)
+    key = (
+        tuple(items.items()),
+        distance,
+        payload.move_date,
+        payload.profile,
+        pricing_rules.current().version,
+    )
+
+    async def compute() -> bytes:
+        # Cold inventories can take milliseconds of fuzzy matching; keep that off the event loop.
+        return await asyncio.to_thread(
+            _encoded_estimate, items, distance, payload.move_date, payload.profile
+        )
+
+    # Cache the encoded body so warm hits skip response serialization too.
+    body = await _estimate_cache.get_or_compute(key, compute)
+    return Response(content=body, media_type="application/json")
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Iterable
+from typing import Iterable, Literal
 import difflib
 import math
 import re
 
+from .truck_loading import plan_loads
+
 
 @dataclass(frozen=True)
 class CatalogItem:
@@ -410,11 +412,10 @@ Yard Ornaments\t2\t14\t\t
 """
 
 
-@lru_cache()
-def _catalog() -> dict[str, CatalogItem]:
+def _parse_catalog_tsv() -> dict[str, CatalogItem]:
     items: dict[str, CatalogItem] = {}
     for raw_line in CATALOG_TSV.strip().splitlines()[1:]:
-        columns = re.split(r"\t", raw_line)
+        columns = raw_line.split("\t")
         if len(columns) < 3:
             continue
         name = columns[0].strip()
@@ -434,42 +435,250 @@ def _catalog() -> dict[str, CatalogItem]:
     return items
 
 
+@lru_cache()
+def _compiled_catalog() -> tuple[dict[str, CatalogItem], _MatchIndex] | None:
+    from .catalog_artifact import load_artifact
+
+    return load_artifact()
+
+
+@lru_cache()
+def _catalog() -> dict[str, CatalogItem]:
+    compiled = _compiled_catalog()
+    if compiled is not None:
+        return compiled[0]
+    return _parse_catalog_tsv()
+
+
 def catalog_items() -> Iterable[CatalogItem]:
     return _catalog().values()
 
 
+# Spoken or tool-supplied names that do not fuzzy-match well onto the catalog
+# wording. Keys are normalized queries, values are catalog keys.
+ALIASES: dict[str, str] = {
+    "king mattress": "bed king - mattress",
+    "king box spring": "bed king - box spring",
+    "king bed frame": "bed king - frame",
+    "queen mattress": "bed queen - mattress",
+    "queen box spring": "bed queen - box spring",
+    "queen bed frame": "bed queen - frame",
+    "full mattress": "bed double/full - mattress",
+    "double mattress": "bed double/full - mattress",
+    "full box spring": "bed double/full - box spring",
+    "twin mattress": "bed twin/single - mattress",
+    "single mattress": "bed twin/single - mattress",
+    "twin box spring": "bed twin/single - box spring",
+    "bunk bed": "bed - bunk (set of 2)",
+    "bunk beds": "bed - bunk (set of 2)",
+    "daybed": "bed - daybed",
+    "couch": "sofa - 3 seater",
+    "sofa": "sofa - 3 seater",
+    "loveseat": "sofa - loveseat",
+    "love seat": "sofa - loveseat",
+    "sectional": "sofa - sec. per section",
+    "sectional sofa": "sofa - sec. per section",
+    "recliner": "chair - os/reclining",
+    "armchair": "chair - arm",
+    "fridge": "refrigerator",
+    "washer": "washing machine",
+    "stove": "range/stove",
+    "oven": "range/stove",
+    "grill": "bbq grill - large",
+    "bbq": "bbq grill - large",
+    "tv": "tv - 51\"-80\"",
+    "television": "tv - 51\"-80\"",
+    "piano": "upright piano - large",
+    "grand piano": "piano - baby grand",
+    "baby grand piano": "piano - baby grand",
+    "night stand": "nightstand - small",
+    "nightstand": "nightstand - small",
+    "dresser": "dresser - double",
+    "bookshelf": "bookcase - medium",
+    "bookcase": "bookcase - medium",
+    "dining table": "dining table - medium",
+    "coffee table": "table - coffee (md)",
+    "kitchen table": "table - kitchen",
+    "dining chair": "chair - dining",
+    "office chair": "chair - office",
+    "desk": "desk - medium",
+    "file cabinet": "file cab - vert. 2-3 dr",
+    "filing cabinet": "file cab - vert. 2-3 dr",
+    "gun safe": "safe - (lg)",
+    "safe": "safe - (md)",
+    "tote": "plastic tote - large",
+    "rug": "rug - medium",
+    "mirror": "mirror/picture",
+    "picture": "mirror/picture",
+    "lamp": "lamp - table",
+    "floor lamp": "lamp - floor",
+    "pool table": "pool table - slate",
+}
+
+_SYMBOL_WORDS = {"<": " under ", ">": " over ", "&": " and "}
+_SYMBOL_RE = re.compile(r"[<>&]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9.]+")
+# How many index hits get the full SequenceMatcher treatment.
+_SHORTLIST_SIZE = 16
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase ``text`` and collapse punctuation and underscores to spaces."""
+    lowered = _SYMBOL_RE.sub(lambda m: _SYMBOL_WORDS[m.group(0)], text.lower())
+    return " ".join(_NON_WORD_RE.sub(" ", lowered).split())
+
+
+def _trigrams(normalized: str) -> set[str]:
+    padded = f" {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class _MatchIndex:
+    keys: tuple[str, ...]
+    normalized: tuple[str, ...]
+    gram_counts: tuple[int, ...]
+    postings: dict[str, tuple[int, ...]]
+    exact: dict[str, str]
+
+
+def _build_match_index(items: dict[str, CatalogItem]) -> _MatchIndex:
+    keys = tuple(sorted(items))
+    normalized = tuple(normalize_query(key) for key in keys)
+    postings: dict[str, list[int]] = {}
+    gram_counts: list[int] = []
+    for position, text in enumerate(normalized):
+        grams = _trigrams(text)
+        gram_counts.append(len(grams))
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+
+    exact: dict[str, str] = {}
+    for key, text in zip(keys, normalized):
+        exact.setdefault(text, key)
+    for alias, key in ALIASES.items():
+        if key in items:
+            exact.setdefault(normalize_query(alias), key)
+
+    return _MatchIndex(
+        keys=keys,
+        normalized=normalized,
+        gram_counts=tuple(gram_counts),
+        postings={gram: tuple(hits) for gram, hits in postings.items()},
+        exact=exact,
+    )
+
+
+@lru_cache()
+def _match_index() -> _MatchIndex:
+    compiled = _compiled_catalog()
+    if compiled is not None:
+        return compiled[1]
+    return _build_match_index(_catalog())
+
+
+def _shortlist(index: _MatchIndex, normalized: str) -> list[int]:
+    grams = _trigrams(normalized)
+    shared: dict[int, int] = {}
+    for gram in grams:
+        for position in index.postings.get(gram, ()):
+            shared[position] = shared.get(position, 0) + 1
+    if not shared:
+        return list(range(len(index.keys)))
+
+    # Dice coefficient over trigram sets is a cheap proxy for the edit ratio.
+    query_count = len(grams)
+    ranked = sorted(
+        shared,
+        key=lambda pos: 2.0 * shared[pos] / (query_count + index.gram_counts[pos]),
+        reverse=True,
+    )
+    return ranked[:_SHORTLIST_SIZE]
+
+
 def find_best_item(query: str) -> tuple[CatalogItem, float]:
     key = query.strip().lower()
     items = _catalog()
     if key in items:
         return items[key], 1.0
-    candidates = difflib.get_close_matches(key, items.keys(), n=1, cutoff=0.0)
-    if not candidates:
+
+    index = _match_index()
+    normalized = normalize_query(query)
+    exact_key = index.exact.get(normalized)
+    if exact_key is not None:
+        return items[exact_key], 1.0
+    if not index.keys:
         raise KeyError(f"No catalog items found for '{query}'")
-    match_key = candidates[0]
-    score = difflib.SequenceMatcher(None, key, match_key).ratio()
-    return items[match_key], score
 
+    matcher = difflib.SequenceMatcher(None)
+    matcher.set_seq2(normalized)
+    best_score = -1.0
+    best_key = ""
+    for position in _shortlist(index, normalized):
+        matcher.set_seq1(index.normalized[position])
+        score = matcher.ratio()
+        candidate = index.keys[position]
+        if score > best_score or (score == best_score and candidate > best_key):
+            best_score = score
+            best_key = candidate
+    return items[best_key], best_score
 
-def total_weight(order: dict[str, int]) -> tuple[float, list[dict]]:
-    total = 0.0
-    breakdown: list[dict] = []
-    for name, qty in order.items():
-        item, confidence = find_best_item(name)
-        weight = item.weight * qty
-        total += weight
-        breakdown.append(
-            {
-                "requested": name,
-                "matched_name": item.name,
-                "quantity": qty,
-                "weight_each": item.weight,
-                "weight_total": weight,
-                "confidence": round(confidence, 3),
-                "handling": item.handling,
-                "surcharge": item.surcharge,
-            }
+
+# Bounded so a stream of one-off misspellings cannot grow memory without limit.
+RESOLVE_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve_normalized(normalized: str) -> tuple[CatalogItem, float]:
+    return find_best_item(normalized)
+
+
+def resolve_items(names: Iterable[str]) -> list[tuple[CatalogItem, float]]:
+    """Resolve ``names`` to catalog items, in order, matching each distinct name once.
+
+    Lookups go through an LRU keyed on the normalized query, so repeated names
+    across calls ("bar stool", "box 1.5") skip the matcher entirely.
+    """
+    normalized = [normalize_query(name) for name in names]
+    resolved = {key: _resolve_normalized(key) for key in dict.fromkeys(normalized)}
+    return [resolved[key] for key in normalized]
+
+
+def resolve_cache_info():
+    """Hit/miss counters for the ``resolve_items`` cache (a ``functools`` CacheInfo)."""
+    return _resolve_normalized.cache_info()
+
+
+def _order_breakdown(order: dict[str, int]) -> tuple[float, float, list[dict]]:
+    names = list(order)
+    quantities = [order[name] for name in names]
+    matches = resolve_items(names)
+
+    weights = [item.weight * qty for (item, _), qty in zip(matches, quantities)]
+    volumes = [item.volume * qty for (item, _), qty in zip(matches, quantities)]
+
+    breakdown = [
+        {
+            "requested": name,
+            "matched_name": item.name,
+            "quantity": qty,
+            "weight_each": item.weight,
+            "weight_total": weight,
+            "volume_each": item.volume,
+            "volume_total": volume,
+            "confidence": round(confidence, 3),
+            "handling": item.handling,
+            "surcharge": item.surcharge,
+        }
+        for name, qty, (item, confidence), weight, volume in zip(
+            names, quantities, matches, weights, volumes
         )
+    ]
+    return sum(weights), sum(volumes), breakdown
+
+
+def total_weight(order: dict[str, int]) -> tuple[float, list[dict]]:
+    total, _, breakdown = _order_breakdown(order)
     return total, breakdown
 
 
@@ -496,6 +705,17 @@ class LocationProfile:
     DOCK_JOB = "dock_job"
 
 
+# The profiles as a type, for request models: anything else is rejected with a 422.
+ProfileName = Literal[
+    LocationProfile.MULTI_FLOOR,
+    LocationProfile.HEAVY_STAIRS,
+    LocationProfile.SECOND_FLOOR_APT,
+    LocationProfile.FIRST_FLOOR_HOME,
+    LocationProfile.GROUND_STORAGE,
+    LocationProfile.DOCK_JOB,
+]
+
+
 PROFILE_RATE = {
     LocationProfile.MULTI_FLOOR: 310.0,
     LocationProfile.HEAVY_STAIRS: 295.0,
@@ -520,16 +740,25 @@ def estimate_hours(weight_lbs: float, profile: str, mover_count: int | None = No
 
 
 def summarize_order(order: dict[str, int], profile: str = LocationProfile.MULTI_FLOOR) -> dict:
-    total, breakdown = total_weight(order)
+    """Totals, crew and hours for an itemized order; trucks come from packing it by volume and weight."""
+    total, volume, breakdown = _order_breakdown(order)
     movers = movers_needed(total)
-    trucks = trucks_needed(total)
+    plan = plan_loads((item["volume_each"], item["weight_each"], item["quantity"]) for item in breakdown)
     hours = estimate_hours(total, profile, movers)
     return {
         "total_weight_lbs": total,
+        "total_volume_cuft": volume,
         "movers_needed": movers,
-        "trucks_needed": trucks,
+        "trucks_needed": plan.trucks,
+        "truck_loads": plan.as_dicts(),
         "estimated_labor_hours": hours,
         "movement_rate_lbs_per_mover_hour": hourly_rate_lbs(profile),
         "profile": profile,
         "items": breakdown,
     }
+
+
+# Load the catalog and match index at import (from app/catalog.bin when it has
+# been built) so a cold worker's first estimate does not pay for parsing.
+_catalog()
+_match_index()
@@ -0,0 +1,420 @@
+"""Offline drive times between addresses, and stop ordering for multi-stop moves.
+
+Nothing here calls a maps API. A location is resolved to a centroid
+(``locate``):
+
+* ``"lat,lon"`` literals;
+* a 5-digit ZIP, from the ZIP table at ``GEO_ZIP_TABLE`` when configured.
+  It reads the Census ZCTA Gazetteer file (``*_Gaz_zcta_national.txt``)
+  as published, or any ``zip<TAB>lat<TAB>lon`` file;
+* a city, from the bundled ``PLACES_TSV`` table of US city centroids
+  (``"Austin, TX"``, ``"austin tx"``, or ``"Austin"`` when unambiguous).
+
+The ZIP table is external data and is not shipped with the app. Without it
+only the bundled metro centroids are known: street addresses, suburbs and
+ZIP codes mostly resolve to nothing, or to one centroid for both ends
+(``Route.has_distance`` is false), and quotes keep the caller's miles.
+``log_coverage`` says which case a worker is in, once, at startup.
+
+Drive time is the great-circle distance stretched by a road factor, at an
+average speed, plus a fixed overhead for getting in and out of
+neighborhoods (``DriveModel``). The defaults approximate a loaded moving
+truck (about 25 minutes across town, 3.7 hours for 180 miles as the crow
+flies). ``DriveModel.calibrate`` fits the factor, speed and overhead from a
+few real trips; put the results in ``GEO_ROAD_FACTOR`` / ``GEO_AVG_MPH`` /
+``GEO_OVERHEAD_MINUTES``.
+
+Pairwise results are memoized (``drive``), so quoting the same areas
+again costs a dict lookup. ``plan_route`` orders the intermediate stops of a
+multi-stop move (nearest neighbor, then 2-opt and relocation; exact for up to
+``EXACT_STOP_LIMIT`` stops) and returns the warehouse legs and loaded
+drive time that ``MoveSpec`` needs. ``WAREHOUSE_LOCATION`` places the
+warehouse; without it the warehouse legs keep ``MoveSpec``'s defaults.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import permutations
+import logging
+import math
+from pathlib import Path
+import re
+from typing import Iterable, Sequence
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.8
+# Exhaustive ordering up to this many intermediate stops (120 orders); local search beyond.
+EXACT_STOP_LIMIT = 5
+
+PLACES_TSV = """City\tState\tLat\tLon
+Albuquerque\tNM\t35.0844\t-106.6504
+Anchorage\tAK\t61.2181\t-149.9003
+Atlanta\tGA\t33.7490\t-84.3880
+Austin\tTX\t30.2672\t-97.7431
+Baltimore\tMD\t39.2904\t-76.6122
+Birmingham\tAL\t33.5186\t-86.8104
+Boise\tID\t43.6150\t-116.2023
+Boston\tMA\t42.3601\t-71.0589
+Buffalo\tNY\t42.8864\t-78.8784
+Charleston\tSC\t32.7765\t-79.9311
+Charlotte\tNC\t35.2271\t-80.8431
+Chicago\tIL\t41.8781\t-87.6298
+Cincinnati\tOH\t39.1031\t-84.5120
+Cleveland\tOH\t41.4993\t-81.6944
+Columbus\tOH\t39.9612\t-82.9988
+Dallas\tTX\t32.7767\t-96.7970
+Denver\tCO\t39.7392\t-104.9903
+Des Moines\tIA\t41.5868\t-93.6250
+Detroit\tMI\t42.3314\t-83.0458
+El Paso\tTX\t31.7619\t-106.4850
+Fort Worth\tTX\t32.7555\t-97.3308
+Fresno\tCA\t36.7378\t-119.7871
+Hartford\tCT\t41.7658\t-72.6734
+Honolulu\tHI\t21.3069\t-157.8583
+Houston\tTX\t29.7604\t-95.3698
+Indianapolis\tIN\t39.7684\t-86.1581
+Jacksonville\tFL\t30.3322\t-81.6557
+Kansas City\tMO\t39.0997\t-94.5786
+Las Vegas\tNV\t36.1699\t-115.1398
+Los Angeles\tCA\t34.0522\t-118.2437
+Louisville\tKY\t38.2527\t-85.7585
+Madison\tWI\t43.0731\t-89.4012
+Memphis\tTN\t35.1495\t-90.0490
+Miami\tFL\t25.7617\t-80.1918
+Milwaukee\tWI\t43.0389\t-87.9065
+Minneapolis\tMN\t44.9778\t-93.2650
+Nashville\tTN\t36.1627\t-86.7816
+New Orleans\tLA\t29.9511\t-90.0715
+New York\tNY\t40.7128\t-74.0060
+Oklahoma City\tOK\t35.4676\t-97.5164
+Omaha\tNE\t41.2565\t-95.9345
+Orlando\tFL\t28.5383\t-81.3792
+Philadelphia\tPA\t39.9526\t-75.1652
+Phoenix\tAZ\t33.4484\t-112.0740
+Pittsburgh\tPA\t40.4406\t-79.9959
+Portland\tOR\t45.5152\t-122.6784
+Providence\tRI\t41.8240\t-71.4128
+Raleigh\tNC\t35.7796\t-78.6382
+Richmond\tVA\t37.5407\t-77.4360
+Sacramento\tCA\t38.5816\t-121.4944
+Salt Lake City\tUT\t40.7608\t-111.8910
+San Antonio\tTX\t29.4241\t-98.4936
+San Diego\tCA\t32.7157\t-117.1611
+San Francisco\tCA\t37.7749\t-122.4194
+San Jose\tCA\t37.3382\t-121.8863
+Seattle\tWA\t47.6062\t-122.3321
+Spokane\tWA\t47.6588\t-117.4260
+St. Louis\tMO\t38.6270\t-90.1994
+Tampa\tFL\t27.9506\t-82.4572
+Tucson\tAZ\t32.2226\t-110.9747
+Washington\tDC\t38.9072\t-77.0369
+"""
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    lat: float
+    lon: float
+
+
+def haversine_miles(a: Place, b: Place) -> float:
+    lat1, lat2 = math.radians(a.lat), math.radians(b.lat)
+    dlat = lat2 - lat1
+    dlon = math.radians(b.lon - a.lon)
+    h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(h)))
+
+
+@dataclass(frozen=True)
+class DriveModel:
+    road_factor: float = 1.2
+    avg_mph: float = 55.0
+    overhead_minutes: float = 10.0
+
+    @classmethod
+    def from_settings(cls) -> DriveModel:
+        return cls(settings.GEO_ROAD_FACTOR, settings.GEO_AVG_MPH, settings.GEO_OVERHEAD_MINUTES)
+
+    def road_miles(self, crow_miles: float) -> float:
+        return crow_miles * self.road_factor
+
+    def minutes(self, crow_miles: float) -> float:
+        if crow_miles <= 0:
+            return 0.0
+        return self.overhead_minutes + self.road_miles(crow_miles) / self.avg_mph * 60.0
+
+    @classmethod
+    def calibrate(cls, trips: Iterable[tuple[float, float, float]]) -> DriveModel:
+        """Fit from observed ``(crow_miles, road_miles, minutes)`` trips.
+
+        The road factor is the median road/crow ratio; speed and overhead
+        are a least-squares line of minutes over road miles.
+        """
+        import numpy as np
+
+        rows = np.asarray([trip for trip in trips if trip[0] > 0], dtype=np.float64)
+        if len(rows) < 2:
+            raise ValueError("need at least two trips with a non-zero distance")
+        road_factor = float(np.median(rows[:, 1] / rows[:, 0]))
+        per_mile, overhead = np.polyfit(rows[:, 1], rows[:, 2], 1)
+        return cls(round(road_factor, 3), round(60.0 / float(per_mile), 1), round(max(float(overhead), 0.0), 1))
+
+
+@dataclass(frozen=True)
+class Leg:
+    miles: float
+    minutes: float
+
+
+def _parse_places() -> dict[str, Place]:
+    places: dict[str, Place] = {}
+    for line in PLACES_TSV.splitlines()[1:]:
+        city, state, lat, lon = line.split("\t")
+        places[_normalize(f"{city} {state}")] = Place(f"{city}, {state}", float(lat), float(lon))
+    return places
+
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_SAINT_RE = re.compile(r"\bsaint\b")
+_ZIP_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_LATLON_RE = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+def _normalize(text: str) -> str:
+    return _SAINT_RE.sub("st", _NON_WORD_RE.sub(" ", text.lower())).strip()
+
+
+@lru_cache(maxsize=1)
+def _city_index() -> tuple[dict[str, Place], dict[str, Place]]:
+    """(by "city st", by "city" for names that occur in one state only)."""
+    by_city_state = _parse_places()
+    by_city: dict[str, Place | None] = {}
+    for key, place in by_city_state.items():
+        city = key.rsplit(" ", 1)[0]
+        by_city[city] = None if city in by_city else place
+    return by_city_state, {city: place for city, place in by_city.items() if place is not None}
+
+
+@lru_cache(maxsize=1)
+def _zip_table() -> dict[str, tuple[float, float]]:
+    path = settings.GEO_ZIP_TABLE
+    if not path:
+        return {}
+    try:
+        return _read_zip_table(Path(path))
+    except (OSError, ValueError, IndexError):
+        # Cached like a missing table: quotes fall back to cities rather than failing on every call.
+        logger.exception("could not read GEO_ZIP_TABLE %s; locating by city only", path)
+        return {}
+
+
+def _read_zip_table(path: Path) -> dict[str, tuple[float, float]]:
+    table: dict[str, tuple[float, float]] = {}
+    with path.open(encoding="utf-8") as fh:
+        header = fh.readline().rstrip("\n").split("\t")
+        columns = [name.strip().upper() for name in header]
+        if "INTPTLAT" in columns:  # Census gazetteer
+            zip_col, lat_col, lon_col = columns.index("GEOID"), columns.index("INTPTLAT"), columns.index("INTPTLONG")
+        else:
+            zip_col, lat_col, lon_col = 0, 1, 2
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            table[fields[zip_col].strip()] = (float(fields[lat_col]), float(fields[lon_col]))
+    return table
+
+
+def _locate_city(normalized: str) -> Place | None:
+    by_city_state, by_city = _city_index()
+    words = normalized.split()
+    # Longest "city st" or "city" suffix wins, so "12 Main St Austin TX" finds Austin.
+    for start in range(len(words)):
+        tail = " ".join(words[start:])
+        place = by_city_state.get(tail) or by_city.get(tail)
+        if place is not None:
+            return place
+    return None
+
+
+def log_coverage() -> None:
+    """Log which locations this worker can place (and load the ZIP table while at it)."""
+    zips = _zip_table()
+    cities = len(_city_index()[0])
+    if zips:
+        logger.info("geo: %d ZIP centroids and %d city centroids", len(zips), cities)
+    else:
+        logger.warning(
+            "geo: no GEO_ZIP_TABLE; only %d metro centroids are bundled, so most addresses will not "
+            "resolve and quotes will use the caller's miles",
+            cities,
+        )
+
+
+@lru_cache(maxsize=4096)
+def locate(text: str) -> Place | None:
+    """The centroid for a ZIP, city or ``"lat,lon"`` in ``text``, or ``None``."""
+    match = _LATLON_RE.match(text)
+    if match:
+        return Place(text.strip(), float(match.group(1)), float(match.group(2)))
+    zips = _zip_table()
+    for code in _ZIP_RE.findall(text):
+        if code in zips:
+            lat, lon = zips[code]
+            return Place(code, lat, lon)
+    return _locate_city(_normalize(text))
+
+
+@lru_cache(maxsize=1)
+def drive_model() -> DriveModel:
+    return DriveModel.from_settings()
+
+
+@lru_cache(maxsize=65536)
+def _drive_between(a: Place, b: Place) -> Leg:
+    crow = haversine_miles(a, b)
+    model = drive_model()
+    return Leg(round(model.road_miles(crow), 2), round(model.minutes(crow), 2))
+
+
+def drive(a: Place, b: Place) -> Leg:
+    """Road miles and minutes from ``a`` to ``b`` (memoized, symmetric)."""
+    if (b.lat, b.lon) < (a.lat, a.lon):
+        a, b = b, a
+    return _drive_between(a, b)
+
+
+def drive_cache_info():
+    return _drive_between.cache_info()
+
+
+@lru_cache(maxsize=1)
+def warehouse() -> Place | None:
+    location = settings.WAREHOUSE_LOCATION
+    return locate(location) if location else None
+
+
+def _path_minutes(matrix: list[list[float]], order: Sequence[int]) -> float:
+    return sum(matrix[i][j] for i, j in zip(order, order[1:]))
+
+
+def order_stops(matrix: list[list[float]]) -> list[int]:
+    """Visit order for an open path from node 0 to node ``n - 1`` through every other node.
+
+    Exhaustive for up to ``EXACT_STOP_LIMIT`` intermediate stops; beyond
+    that, nearest neighbor improved by 2-opt and single-stop moves until
+    neither helps.
+    """
+    n = len(matrix)
+    middle = list(range(1, n - 1))
+    if n <= 3:
+        return list(range(n))
+    if len(middle) <= EXACT_STOP_LIMIT:
+        best = min(permutations(middle), key=lambda perm: _path_minutes(matrix, (0, *perm, n - 1)))
+        return [0, *best, n - 1]
+
+    order = [0]
+    remaining = set(middle)
+    while remaining:
+        nearest = min(remaining, key=lambda node: matrix[order[-1]][node])
+        order.append(nearest)
+        remaining.remove(nearest)
+    order.append(n - 1)
+
+    improved = True
+    while improved:
+        improved = _two_opt(matrix, order) | _relocate(matrix, order)
+    return order
+
+
+def _two_opt(matrix: list[list[float]], order: list[int]) -> bool:
+    """Reverse segments while that shortens the path; True if anything changed."""
+    changed = False
+    n = len(order)
+    for i in range(1, n - 2):
+        for j in range(i + 1, n - 1):
+            a, b, c, d = order[i - 1], order[i], order[j], order[j + 1]
+            if matrix[a][c] + matrix[b][d] < matrix[a][b] + matrix[c][d] - 1e-9:
+                order[i:j + 1] = reversed(order[i:j + 1])
+                changed = True
+    return changed
+
+
+def _relocate(matrix: list[list[float]], order: list[int]) -> bool:
+    """Move single stops to a cheaper position while that shortens the path."""
+    changed = False
+    for i in range(1, len(order) - 1):
+        node = order[i]
+        prev, nxt = order[i - 1], order[i + 1]
+        saving = matrix[prev][node] + matrix[node][nxt] - matrix[prev][nxt]
+        rest = order[:i] + order[i + 1:]
+        best, best_at = saving - 1e-9, None
+        for k in range(1, len(rest)):
+            a, b = rest[k - 1], rest[k]
+            cost = matrix[a][node] + matrix[node][b] - matrix[a][b]
+            if cost < best:
+                best, best_at = cost, k
+        if best_at is not None:
+            rest.insert(best_at, node)
+            order[:] = rest
+            changed = True
+    return changed
+
+
+@dataclass(frozen=True)
+class Route:
+    stops: tuple[Place, ...]  # origin, intermediate stops in visiting order, destination
+    legs: tuple[Leg, ...]
+    warehouse_to_origin: Leg | None
+    destination_to_warehouse: Leg | None
+
+    @property
+    def loaded_miles(self) -> float:
+        return round(sum(leg.miles for leg in self.legs), 2)
+
+    @property
+    def loaded_minutes(self) -> float:
+        return round(sum(leg.minutes for leg in self.legs), 2)
+
+    @property
+    def has_distance(self) -> bool:
+        """False when both ends fall on one centroid (two addresses in one city): the miles are unknown, not 0."""
+        return self.stops[0] != self.stops[-1] and self.loaded_miles > 0
+
+    @property
+    def extra_stops(self) -> int:
+        return len(self.stops) - 2
+
+    def spec_fields(self) -> dict:
+        """``MoveSpec`` keyword arguments for the route's drive times."""
+        fields = {"origin_to_destination_minutes": self.loaded_minutes, "extra_stops": self.extra_stops}
+        if self.warehouse_to_origin is not None:
+            fields["warehouse_to_origin_minutes"] = self.warehouse_to_origin.minutes
+        if self.destination_to_warehouse is not None:
+            fields["destination_to_warehouse_minutes"] = self.destination_to_warehouse.minutes
+        return fields
+
+
+def plan_route(origin: Place, destination: Place, stops: Sequence[Place] = ()) -> Route:
+    """Order ``stops`` between ``origin`` and ``destination`` for the least drive time."""
+    nodes = [origin, *stops, destination]
+    matrix = [[drive(a, b).minutes for b in nodes] for a in nodes]
+    ordered = [nodes[i] for i in order_stops(matrix)]
+    depot = warehouse()
+    return Route(
+        stops=tuple(ordered),
+        legs=tuple(drive(a, b) for a, b in zip(ordered, ordered[1:])),
+        warehouse_to_origin=drive(depot, origin) if depot else None,
+        destination_to_warehouse=drive(destination, depot) if depot else None,
+    )
+
+
+def route_for(origin: str, destination: str, stops: Sequence[str] = ()) -> Route | None:
+    """``plan_route`` for free-text locations, or ``None`` if any of them cannot be placed."""
+    places = [locate(text) for text in (origin, destination, *stops)]
+    if any(place is None for place in places):
+        return None
+    return plan_route(places[0], places[1], places[2:])
@@ -0,0 +1,216 @@
+"""Local intent routing for caller utterances.
+
+Canned intents (schedule, quote, order status, live agent) are answered by
+``ws_handler`` without an LLM round-trip. ``classify`` decides which one, if
+any, an utterance is, in two local steps:
+
+1. ``KeywordClassifier``: precompiled word-boundary patterns, so "border"
+   is not an order and "bookshelf" is not a booking.
+2. ``CentroidClassifier``: TF-IDF vectors compared against per-intent
+   centroids built from ``TRAINING_UTTERANCES``; catches close paraphrases
+   with no trigger word ("are the movers on their way").
+
+Anything below the similarity threshold is ``Intent.OTHER`` and goes to the
+LLM. The threshold sits above the 0.2-0.35 scores that short answers to the
+canned questions ("next saturday morning", "a two bedroom apartment") reach
+against the schedule and quote centroids; a wrong canned reply repeats the
+question the caller just answered, while a miss only costs an LLM turn. Swap the router with ``set_classifier`` (anything with a
+``classify(text) -> IntentMatch`` method).
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+import math
+import re
+from typing import Iterable, Protocol
+
+
+class Intent:
+    SCHEDULE = "schedule"
+    QUOTE = "quote"
+    STATUS = "status"
+    HANDOFF = "handoff"
+    OTHER = "other"
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    label: str
+    score: float
+    source: str
+
+
+class IntentClassifier(Protocol):
+    def classify(self, text: str) -> IntentMatch: ...
+
+
+# Checked in order; the first intent with a hit wins.
+KEYWORD_PATTERNS: list[tuple[str, str]] = [
+    (Intent.STATUS, r"already (?:scheduled|booked)|any (?:news|update)|an update"),
+    (Intent.SCHEDULE, r"schedul\w*|book|booking|appointment|reserve|reschedule"),
+    (Intent.QUOTE, r"quotes?|estimates?|price|pricing|how much|cost"),
+    (Intent.STATUS, r"status|order|job|where(?:'s| is) my|track(?:ing)?"),
+    (Intent.HANDOFF, r"human|agent|representative|real person|operator|live person"),
+]
+
+TRAINING_UTTERANCES: list[tuple[str, str]] = [
+    ("i want to set up a move for next friday", Intent.SCHEDULE),
+    ("can you send a crew on the fourteenth", Intent.SCHEDULE),
+    ("do you have any openings next week", Intent.SCHEDULE),
+    ("what days are available in june", Intent.SCHEDULE),
+    ("i need movers on saturday morning", Intent.SCHEDULE),
+    ("can i get on the calendar for the first", Intent.SCHEDULE),
+    ("lock in a date for my move", Intent.SCHEDULE),
+    ("i would like to hire you for the 3rd", Intent.SCHEDULE),
+    ("is tuesday open", Intent.SCHEDULE),
+    ("can you come out monday morning", Intent.SCHEDULE),
+    ("put me on the calendar", Intent.SCHEDULE),
+    ("are you available on the 9th", Intent.SCHEDULE),
+    ("what would it run me to move a two bedroom", Intent.QUOTE),
+    ("how expensive is a local move", Intent.QUOTE),
+    ("what are your rates", Intent.QUOTE),
+    ("what do you charge per hour", Intent.QUOTE),
+    ("ballpark for moving a three bedroom house", Intent.QUOTE),
+    ("what's the damage for moving across town", Intent.QUOTE),
+    ("is it cheaper on a weekday", Intent.QUOTE),
+    ("how many dollars for a studio apartment", Intent.QUOTE),
+    ("what do you charge", Intent.QUOTE),
+    ("is it more expensive on a saturday", Intent.QUOTE),
+    ("i'm trying to budget for the move", Intent.QUOTE),
+    ("what will it run", Intent.QUOTE),
+    ("when is my truck arriving", Intent.STATUS),
+    ("are my movers on the way", Intent.STATUS),
+    ("what time will the crew get here", Intent.STATUS),
+    ("checking on my move reference number", Intent.STATUS),
+    ("i already booked and want an update", Intent.STATUS),
+    ("is my move still confirmed for tomorrow", Intent.STATUS),
+    ("my reference is ord one two three", Intent.STATUS),
+    ("has my delivery left the warehouse", Intent.STATUS),
+    ("when will the movers arrive", Intent.STATUS),
+    ("are the guys on their way", Intent.STATUS),
+    ("what time is my crew showing up", Intent.STATUS),
+    ("when are they getting to my place", Intent.STATUS),
+    ("let me talk to someone", Intent.HANDOFF),
+    ("put me through to a manager", Intent.HANDOFF),
+    ("transfer me please", Intent.HANDOFF),
+    ("i want to speak to a person", Intent.HANDOFF),
+    ("connect me with the office", Intent.HANDOFF),
+    ("can i talk to somebody in dispatch", Intent.HANDOFF),
+    ("i'd rather speak with somebody", Intent.HANDOFF),
+    ("get me someone on the phone", Intent.HANDOFF),
+    ("do you wrap furniture in blankets", Intent.OTHER),
+    ("are you insured", Intent.OTHER),
+    ("do you move pianos", Intent.OTHER),
+    ("can you take apart my bed frame", Intent.OTHER),
+    ("do you sell boxes", Intent.OTHER),
+    ("what areas do you serve", Intent.OTHER),
+    ("do the movers take the windows out", Intent.OTHER),
+    ("hello can you hear me", Intent.OTHER),
+    ("thank you that's all", Intent.OTHER),
+    ("yes that sounds good", Intent.OTHER),
+    ("it's a three bedroom with a basement", Intent.OTHER),
+    ("about twelve miles", Intent.OTHER),
+    ("my wife ordered the boxes already", Intent.OTHER),
+    ("the movers should take the couch first", Intent.OTHER),
+    ("we have a garage full of tools", Intent.OTHER),
+    ("do you charge extra for stairs", Intent.QUOTE),
+]
+
+# Function words carry no intent and would otherwise pull everything towards
+# whichever centroid has the most conversational filler.
+STOPWORDS = frozenset(
+    "a an and are at be can could do does for from get go have hi i i'd i'm i've in is it "
+    "it's just like me my of on or our please so that the their them there they this to "
+    "uh um us we we're what when will with would you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _tokens(text: str) -> list[str]:
+    words = [word for word in _TOKEN_RE.findall(text.lower()) if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class KeywordClassifier:
+    def __init__(self, patterns: Iterable[tuple[str, str]] = KEYWORD_PATTERNS) -> None:
+        self._patterns = [
+            (label, re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE)) for label, pattern in patterns
+        ]
+
+    def classify(self, text: str) -> IntentMatch:
+        for label, pattern in self._patterns:
+            if pattern.search(text):
+                return IntentMatch(label, 1.0, "keyword")
+        return IntentMatch(Intent.OTHER, 0.0, "keyword")
+
+
+class CentroidClassifier:
+    def __init__(
+        self,
+        utterances: Iterable[tuple[str, str]] = TRAINING_UTTERANCES,
+        threshold: float = 0.4,
+    ) -> None:
+        self.threshold = threshold
+        docs = [(Counter(_tokens(text)), label) for text, label in utterances]
+        document_frequency: Counter[str] = Counter()
+        for counts, _ in docs:
+            document_frequency.update(counts.keys())
+        total = len(docs)
+        self._idf = {term: math.log((1 + total) / (1 + df)) + 1.0 for term, df in document_frequency.items()}
+
+        sums: dict[str, dict[str, float]] = {}
+        for counts, label in docs:
+            centroid = sums.setdefault(label, {})
+            for term, weight in self._vector(counts).items():
+                centroid[term] = centroid.get(term, 0.0) + weight
+        self._centroids = {label: self._normalized(vector) for label, vector in sums.items()}
+
+    @staticmethod
+    def _normalized(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {term: v / norm for term, v in vector.items()} if norm else {}
+
+    def _vector(self, counts: Counter[str]) -> dict[str, float]:
+        return self._normalized(
+            {term: count * self._idf[term] for term, count in counts.items() if term in self._idf}
+        )
+
+    def classify(self, text: str) -> IntentMatch:
+        vector = self._vector(Counter(_tokens(text)))
+        best_label, best_score = Intent.OTHER, 0.0
+        for label, centroid in self._centroids.items():
+            score = sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            if score > best_score:
+                best_label, best_score = label, score
+        if best_score < self.threshold:
+            return IntentMatch(Intent.OTHER, best_score, "centroid")
+        return IntentMatch(best_label, best_score, "centroid")
+
+
+class CascadeClassifier:
+    """Keyword patterns first, then the centroid model for utterances with no trigger word."""
+
+    def __init__(self, *stages: IntentClassifier) -> None:
+        self.stages = stages or (KeywordClassifier(), CentroidClassifier())
+
+    def classify(self, text: str) -> IntentMatch:
+        match = IntentMatch(Intent.OTHER, 0.0, "none")
+        for stage in self.stages:
+            match = stage.classify(text)
+            if match.label != Intent.OTHER:
+                return match
+        return match
+
+
+_classifier: IntentClassifier = CascadeClassifier()
+
+
+def set_classifier(classifier: IntentClassifier) -> None:
+    global _classifier
+    _classifier = classifier
+
+
+def classify(text: str) -> IntentMatch:
+    return _classifier.classify(text)
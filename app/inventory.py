@@ -0,0 +1,184 @@
+"""Running inventory for a live call.
+
+Callers list their items one or two at a time ("two dressers... and the
+couch... actually no couch"). Re-running ``summarize_order`` over the whole
+order after each change re-resolves every name and rebuilds the breakdown.
+``InventorySession`` keeps the order as catalog key -> quantity plus the
+running item count, weight, volume and handling/surcharge counts, so each
+``add``/``remove``/``set_quantity`` is one name resolution (through the
+``resolve_items`` cache) and a few additions. Movers and hours are derived
+from the running weight on demand; trucks come from packing the lines by
+volume and weight (``truck_loading.plan_loads``), at most once per revision
+and only when asked for.
+
+Lines are keyed by the matched catalog item, so "couch" and "sofa" are one
+line. ``to_dict`` is the compact form kept in ``ConversationState.inventory``:
+the profile and the quantities, from which ``from_dict`` rebuilds the totals
+with plain catalog lookups (no matching).
+"""
+from __future__ import annotations
+
+from collections import Counter
+
+from .furniture_catalog import (
+    CatalogItem,
+    LocationProfile,
+    _catalog,
+    estimate_hours,
+    hourly_rate_lbs,
+    movers_needed,
+    resolve_items,
+)
+from .truck_loading import LoadPlan, plan_loads
+
+
+class InventorySession:
+    def __init__(self, profile: str = LocationProfile.MULTI_FLOOR) -> None:
+        self.profile = profile
+        self.lines: dict[str, int] = {}
+        self.item_count = 0
+        self.weight_lbs = 0.0
+        self.volume_cuft = 0.0
+        self.handling: Counter[str] = Counter()
+        self.surcharges: Counter[str] = Counter()
+        # Spoken name and match confidence per line, for the breakdown (not persisted).
+        self._requested: dict[str, tuple[str, float]] = {}
+        # Bumped on every change that moves the totals; tool results are cached per revision.
+        self.revision = 0
+        self._plan: LoadPlan | None = None
+        self._plan_revision = -1
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def add(self, name: str, quantity: int = 1) -> tuple[CatalogItem, float]:
+        """Add ``quantity`` of ``name``; returns the matched item and match confidence."""
+        item, confidence = self._resolve(name)
+        self._change(item, self.lines.get(item.name.lower(), 0) + quantity)
+        return item, confidence
+
+    def remove(self, name: str, quantity: int | None = None) -> tuple[CatalogItem, float]:
+        """Remove ``quantity`` of ``name``, or the whole line when ``quantity`` is ``None``."""
+        item, confidence = self._resolve(name)
+        current = self.lines.get(item.name.lower(), 0)
+        self._change(item, 0 if quantity is None else current - quantity)
+        return item, confidence
+
+    def set_quantity(self, name: str, quantity: int) -> tuple[CatalogItem, float]:
+        """Set the quantity of ``name`` outright (0 removes it). Repeating it is a no-op."""
+        item, confidence = self._resolve(name)
+        self._change(item, quantity)
+        return item, confidence
+
+    def _resolve(self, name: str) -> tuple[CatalogItem, float]:
+        item, confidence = resolve_items([name])[0]
+        self._requested[item.name.lower()] = (name, confidence)
+        return item, confidence
+
+    def _change(self, item: CatalogItem, quantity: int) -> None:
+        key = item.name.lower()
+        quantity = max(int(quantity), 0)
+        delta = quantity - self.lines.get(key, 0)
+        if not quantity:
+            self._requested.pop(key, None)
+        if delta == 0:
+            return
+        if quantity:
+            self.lines[key] = quantity
+        else:
+            del self.lines[key]
+        self.item_count += delta
+        self.weight_lbs += item.weight * delta
+        self.volume_cuft += item.volume * delta
+        if item.handling:
+            self.handling[item.handling] += delta
+        if item.surcharge:
+            self.surcharges[item.surcharge] += delta
+        self.revision += 1
+
+    def set_profile(self, profile: str) -> None:
+        if profile != self.profile:
+            self.profile = profile
+            self.revision += 1
+
+    @property
+    def movers(self) -> int:
+        return movers_needed(self.weight_lbs)
+
+    @property
+    def trucks(self) -> int:
+        return self.load_plan().trucks
+
+    def load_plan(self) -> LoadPlan:
+        plan, revision = self._plan, self.revision
+        if plan is None or self._plan_revision != revision:
+            # get_quote reads this from a worker thread: pack a snapshot, tagged with its revision.
+            items = _catalog()
+            plan = plan_loads([(items[key].volume, items[key].weight, qty) for key, qty in list(self.lines.items())])
+            self._plan, self._plan_revision = plan, revision
+        return plan
+
+    @property
+    def hours(self) -> float:
+        return estimate_hours(self.weight_lbs, self.profile, self.movers)
+
+    def totals(self) -> dict:
+        """The running figures, without the per-item breakdown."""
+        return {
+            "total_weight_lbs": round(self.weight_lbs, 2),
+            "total_volume_cuft": round(self.volume_cuft, 2),
+            "movers_needed": self.movers,
+            "trucks_needed": self.trucks,
+            "estimated_labor_hours": self.hours,
+            "handling": {flag: count for flag, count in self.handling.items() if count},
+            "surcharges": {flag: count for flag, count in self.surcharges.items() if count},
+            "item_count": self.item_count,
+        }
+
+    def summary(self) -> dict:
+        """The same shape as ``summarize_order`` (the breakdown costs one pass over the lines)."""
+        items = _catalog()
+        breakdown = []
+        for key, quantity in self.lines.items():
+            item = items[key]
+            requested, confidence = self._requested.get(key, (item.name, 1.0))
+            breakdown.append({
+                "requested": requested,
+                "matched_name": item.name,
+                "quantity": quantity,
+                "weight_each": item.weight,
+                "weight_total": item.weight * quantity,
+                "volume_each": item.volume,
+                "volume_total": item.volume * quantity,
+                "confidence": round(confidence, 3),
+                "handling": item.handling,
+                "surcharge": item.surcharge,
+            })
+        return {
+            "total_weight_lbs": self.weight_lbs,
+            "total_volume_cuft": self.volume_cuft,
+            "movers_needed": self.movers,
+            "trucks_needed": self.trucks,
+            "truck_loads": self.load_plan().as_dicts(),
+            "estimated_labor_hours": self.hours,
+            "movement_rate_lbs_per_mover_hour": hourly_rate_lbs(self.profile),
+            "profile": self.profile,
+            "items": breakdown,
+        }
+
+    def to_dict(self) -> dict:
+        if not self.lines and self.profile == LocationProfile.MULTI_FLOOR:
+            return {}
+        return {"profile": self.profile, "items": dict(self.lines)}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> InventorySession:
+        session = cls(data.get("profile", LocationProfile.MULTI_FLOOR) if data else LocationProfile.MULTI_FLOOR)
+        items = _catalog()
+        for key, quantity in (data or {}).get("items", {}).items():
+            item = items.get(key)
+            if item is not None:  # a catalog rebuild may have dropped the item
+                session._change(item, quantity)
+        session.revision = 0
+        session._plan = None
+        return session
@@ -1,3 +1,10 @@
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from .tracing import TraceIdFilter
+
+# key=value fields so log search can filter a call by trace_id (its Twilio callSid).
+LOG_FORMAT = "%(asctime)s level=%(levelname)s logger=%(name)s trace_id=%(trace_id)s %(message)s"
+
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(TraceIdFilter())
@@ -1,12 +1,29 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import init_db
+from . import logging_conf  # noqa: F401  (log format with trace_id)
+from .ai import get_async_client
+from .config import settings
+from .db import dispose_engines, init_db
+from .emailer import email_queue
+from .pricing import pricing_rules
+from .scheduling import scheduler
+from .sessions import session_store
+from .transcripts import transcript_writer
+from .estimate_routes import router as estimate_router
+from .metrics_routes import router as metrics_router
 from .order_routes import router as order_router
+from .schedule_routes import router as schedule_router
 from .twilio_routes import router as voice_router
 from .ws_handler import router as ws_router
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Dash Movers Voice Agent")
+app.state.warmup = None
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,8 +35,63 @@ app.add_middleware(
 
 app.include_router(voice_router)
 app.include_router(order_router)
+app.include_router(estimate_router)
+app.include_router(schedule_router)
 app.include_router(ws_router)
+app.include_router(metrics_router)
 
 @app.on_event("startup")
-def _startup():
-    init_db()
+async def _startup():
+    if settings.DB_INIT_ON_STARTUP:
+        init_db()
+    transcript_writer.start()
+    # Quotes never load pricing themselves: have the published rates before serving.
+    await asyncio.to_thread(pricing_rules.refresh)
+    pricing_rules.start()
+    # Likewise the capacity index: load it off the loop before the first booking needs it.
+    await scheduler.refresh()
+    scheduler.start()
+    email_queue.start()
+    # Import openai and build its client (and the quote surface) off the loop
+    # while the worker already serves webhooks, so the first call's turn does
+    # not pay for it.
+    app.state.warmup = asyncio.get_running_loop().create_task(_warm_up())
+
+def _load_openai() -> None:
+    # The resource modules are imported on first attribute access, not with the client.
+    get_async_client().chat.completions
+
+def _load_geo() -> None:
+    from .geo import log_coverage
+
+    log_coverage()
+
+def _build_quote_surface() -> None:
+    from .quote_surface import current
+
+    current()
+
+async def _warm_up():
+    try:
+        await asyncio.to_thread(_load_openai)
+    except Exception:
+        logger.exception("OpenAI client warm-up failed; it will be built on first use")
+    try:
+        await asyncio.to_thread(_load_geo)
+    except Exception:
+        logger.exception("location tables failed to load")
+    try:
+        await asyncio.to_thread(_build_quote_surface)
+    except Exception:
+        logger.exception("quote surface build failed; it will be built on first use")
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await pricing_rules.stop()
+    await scheduler.stop()
+    await email_queue.stop()
+    await transcript_writer.stop()
+    await session_store().close()
+    if app.state.warmup is not None:
+        await app.state.warmup
+    await dispose_engines()
@@ -0,0 +1,214 @@
+"""In-process latency histograms and counters, exported in Prometheus format.
+
+Every hot-path stage records into one histogram family,
+``dash_stage_seconds{stage=...}``, so a slow turn can be split into intent
+classification, LLM time to first token, streaming, websocket sends, tool
+and DB work, transcript writes and email sends. Use ``timed`` as a context
+manager or decorator (sync or async); ``observe`` records a duration that
+was measured some other way.
+
+Recording is a ``perf_counter`` pair, a ``bisect`` over the bucket bounds
+and a few additions under a per-series lock, cheap enough to leave on in
+production. ``render`` produces the text served at ``/metrics``;
+``summary`` gives p50/p95/p99 estimated from the buckets.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+import functools
+import inspect
+import math
+import threading
+import time
+
+# Upper bounds in seconds, from sub-millisecond cache hits to slow LLM turns.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _HistogramSeries:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the ``q`` rank."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return math.nan
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                if index == len(self.bounds):
+                    return lower  # past the last bound: report the bound
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> _HistogramSeries:
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, _HistogramSeries(self.buckets))
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series.counts):
+                cumulative += count
+                le = _label_text(self.labelnames, values, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _label_text(self.labelnames, values)
+            lines.append(f"{self.name}_sum{label_text} {series.sum!r}")
+            lines.append(f"{self.name}_count{label_text} {series.count}")
+        return lines
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            "/".join(values) or self.name: {
+                "count": series.count,
+                "p50": series.quantile(0.50),
+                "p95": series.quantile(0.95),
+                "p99": series.quantile(0.99),
+            }
+            for values, series in sorted(self._series.items())
+            if series.count
+        }
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, values)} {_number(value)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("dash_stage_seconds", "Time spent per hot-path stage.", ("stage",))
+TOOL_CALLS = Counter("dash_tool_calls_total", "LLM tool calls by tool and cache outcome.", ("tool", "cached"))
+EMAILS = Counter("dash_emails_total", "Emails handled by the background queue, by outcome.", ("outcome",))
+VOICE_TURNS = Counter("dash_voice_turns_total", "Caller turns on /voice/ws by how they were answered.", ("route",))
+TRANSCRIPT_DROPPED = Counter(
+    "dash_transcript_turns_dropped_total", "Transcript turns dropped because flushes kept failing."
+)
+
+REGISTRY: list[Histogram | Counter] = [STAGE_SECONDS, TOOL_CALLS, EMAILS, VOICE_TURNS, TRANSCRIPT_DROPPED]
+
+
+def observe(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+class timed:
+    """Record the duration of a block or of every call to a function under ``stage``."""
+
+    __slots__ = ("stage", "_series", "_started")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self._series = STAGE_SECONDS.labels(stage)
+
+    def __enter__(self) -> timed:
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._series.observe(time.perf_counter() - self._started)
+
+    def __call__(self, func):
+        series = self._series
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    series.observe(time.perf_counter() - started)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+
+        return wrapper
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> dict[str, dict[str, float]]:
+    return STAGE_SECONDS.summary()
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from .metrics import render, summary
+
+router = APIRouter(tags=["metrics"])
+
+# Prometheus text exposition format.
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    return Response(content=render(), media_type=_CONTENT_TYPE)
+
+
+@router.get("/metrics/latency")
+async def latency() -> dict:
+    """p50/p95/p99 seconds per stage, estimated from the histogram buckets."""
+    return summary()
@@ -9,7 +9,7 @@ class ConversationLog(Base):
     __tablename__ = "conversation_logs"
     id: Mapped[int] = mapped_column(primary_key=True)
     call_sid: Mapped[str] = mapped_column(String(64))
-    session_id: Mapped[str] = mapped_column(String(64))
+    session_id: Mapped[str] = mapped_column(String(64), index=True)
     from_number: Mapped[str] = mapped_column(String(32))
     to_number: Mapped[str] = mapped_column(String(32))
     transcript: Mapped[dict] = mapped_column(JSON, default=dict)
@@ -26,6 +26,17 @@ class Appointment(Base):
     destination_addr: Mapped[str] = mapped_column(Text)
     notes: Mapped[str] = mapped_column(Text, default="")
     status: Mapped[str] = mapped_column(String(32), default="scheduled")
+    # Parsed from ``datetime_iso`` with the job's size, for capacity checks; see ``scheduling``.
+    start_at: Mapped[datetime | None] = mapped_column(DateTime, index=True)
+    end_at: Mapped[datetime | None] = mapped_column(DateTime)
+    movers: Mapped[int | None] = mapped_column(Integer)
+    trucks: Mapped[int | None] = mapped_column(Integer)
+
+class ScheduleDay(Base):
+    """One row per booked day; reservations for a day serialize on it."""
+    __tablename__ = "schedule_days"
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    reservations: Mapped[int] = mapped_column(Integer, default=0)
 
 class Order(Base):
     __tablename__ = "orders"
@@ -35,10 +46,20 @@ class Order(Base):
     status: Mapped[str] = mapped_column(String(64))
     eta: Mapped[str] = mapped_column(String(64), default="")
     notes: Mapped[str] = mapped_column(Text, default="")
+    # Normalized lookup keys; see ``order_lookup``.
+    phone_e164: Mapped[str | None] = mapped_column(String(16), index=True)
+    email: Mapped[str | None] = mapped_column(String(256), index=True)
+    name_key: Mapped[str | None] = mapped_column(String(128), index=True)
+    surname_key: Mapped[str | None] = mapped_column(String(128), index=True)
 
 class PricingRules(Base):
     __tablename__ = "pricing_rules"
     id: Mapped[int] = mapped_column(primary_key=True)
+    # The row with the highest version is the live ruleset; ``rates`` holds
+    # overrides keyed by ``quotes.PricingRuleset`` field names.
+    version: Mapped[int | None] = mapped_column(Integer, index=True, default=1)
+    rates: Mapped[dict | None] = mapped_column(JSON, default=dict)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     base_fee: Mapped[float] = mapped_column(Float, default=129.0)
     per_mile: Mapped[float] = mapped_column(Float, default=2.5)
     per_room: Mapped[float] = mapped_column(Float, default=85.0)
@@ -0,0 +1,162 @@
+"""Indexed order lookup by reference, phone, email or customer name.
+
+Orders used to be found with ``Order.notes.contains(phone)`` and
+``customer_name.ilike('%name%')``: leading-wildcard scans over every lead
+ever recorded, run while the caller waits. ``record_order_email`` now stores
+normalized keys alongside each order:
+
+* ``phone_e164``: the number in E.164 form (``+15555550100``);
+* ``email``: trimmed and lowercased;
+* ``name_key`` / ``surname_key``: the lowercased full name and its last
+  word, matched by prefix with a range predicate so a plain B-tree index
+  serves "pat", "pat smi" and "smith" alike.
+
+Rows written before these columns existed are filled in from the
+``Phone:``/``Email:`` lines of their notes by ``python -m app.order_lookup``.
+"""
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import SessionLocal
+from .models import Order
+
+_NON_DIGITS = re.compile(r"\D+")
+_NAME_JUNK = re.compile(r"[^a-z0-9' ]+")
+_NOTE_FIELD = re.compile(r"^(Phone|Email): *(.*)$", re.MULTILINE)
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def normalize_phone(raw: str | None, default_country_code: str = "1") -> str | None:
+    """E.164 form of a spoken or typed number, or ``None`` if it cannot be one."""
+    if not raw:
+        return None
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.strip().startswith("+"):
+        number = digits
+    elif raw.strip().startswith("00"):
+        number = digits[2:]
+    elif len(digits) == 10:
+        number = default_country_code + digits
+    elif len(digits) == 11 and digits.startswith(default_country_code):
+        number = digits
+    else:
+        return None
+    # E.164 allows at most 15 digits and no leading zero.
+    if not 8 <= len(number) <= 15 or number.startswith("0"):
+        return None
+    return "+" + number
+
+
+def normalize_email(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    email = raw.strip().lower()
+    return email if "@" in email else None
+
+
+def normalize_name(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    name = " ".join(_NAME_JUNK.sub(" ", raw.lower()).split())
+    return name or None
+
+
+def lookup_columns(name: str | None, phone: str | None, email: str | None) -> dict:
+    """Values for an ``Order``'s lookup columns."""
+    name_key = normalize_name(name)
+    return {
+        "phone_e164": normalize_phone(phone),
+        "email": normalize_email(email),
+        "name_key": name_key,
+        "surname_key": name_key.rsplit(" ", 1)[-1] if name_key else None,
+    }
+
+
+def _prefix(column, prefix: str):
+    # A half-open range rather than LIKE 'x%': it uses the index on SQLite and
+    # on Postgres regardless of the column's collation or case rules.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+
+def order_query(
+    ref: str | None = None,
+    name: str | None = None,
+    phone: str | None = None,
+    email: str | None = None,
+):
+    """The ``select(Order)`` for the first identifier that is usable, or ``None``."""
+    if ref:
+        return select(Order).where(Order.ext_ref == ref.strip().upper())
+    phone_e164 = normalize_phone(phone)
+    if phone_e164:
+        return select(Order).where(Order.phone_e164 == phone_e164)
+    email_key = normalize_email(email)
+    if email_key:
+        return select(Order).where(Order.email == email_key)
+    name_key = normalize_name(name)
+    if name_key:
+        return select(Order).where(or_(_prefix(Order.name_key, name_key), _prefix(Order.surname_key, name_key)))
+    return None
+
+
+async def find_order(
+    db: AsyncSession,
+    ref: str | None = None,
+    name: str | None = None,
+    phone: str | None = None,
+    email: str | None = None,
+) -> Order | None:
+    """Most recent order matching the identifier the caller gave."""
+    query = order_query(ref, name, phone, email)
+    if query is None:
+        return None
+    return (await db.scalars(query.order_by(Order.id.desc()).limit(1))).first()
+
+
+def _fields_from_notes(notes: str | None) -> dict[str, str]:
+    return {label.lower(): value.strip() for label, value in _NOTE_FIELD.findall(notes or "")}
+
+
+def backfill(session_factory=SessionLocal, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fill the lookup columns of orders that predate them; returns rows updated.
+
+    Walks the table in primary-key batches so it can run against a live
+    database, and is safe to re-run: only rows with no ``name_key`` are read.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        with session_factory() as db:
+            rows = db.execute(
+                select(Order.id, Order.customer_name, Order.notes)
+                .where(Order.id > last_id, Order.name_key.is_(None))
+                .order_by(Order.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            params = []
+            for order_id, customer_name, notes in rows:
+                fields = _fields_from_notes(notes)
+                columns = lookup_columns(customer_name, fields.get("phone"), fields.get("email"))
+                # An empty key marks the row as visited when the name is blank.
+                columns["name_key"] = columns["name_key"] or ""
+                params.append({"id": order_id, **columns})
+            db.execute(update(Order), params)
+            db.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
+
+
+if __name__ == "__main__":
+    from .db import init_db
+
+    init_db()
+    count = backfill()
+    print(f"backfilled lookup columns on {count} orders")
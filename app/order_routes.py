@@ -1,10 +1,12 @@
 from uuid import uuid4
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .db import SessionLocal
+from .db import get_session
 from .models import Order
+from .order_lookup import lookup_columns
 
 
 router = APIRouter(tags=["orders"])
@@ -25,7 +27,7 @@ class OrderEmailPayload(BaseModel):
 
 
 @router.post("/orders/email")
-def record_order_email(payload: OrderEmailPayload) -> dict:
+async def record_order_email(payload: OrderEmailPayload, db: AsyncSession = Depends(get_session)) -> dict:
     """Record an order request and return a generated reference."""
     ext_ref = f"ORD-{uuid4().hex[:8].upper()}"
 
@@ -42,15 +44,16 @@ def record_order_email(payload: OrderEmailPayload) -> dict:
     ]
     notes = "\n".join(summary_lines)
 
-    with SessionLocal() as db:
-        order = Order(
-            ext_ref=ext_ref,
-            customer_name=payload.name,
-            status="new lead",
-            eta=payload.move_date,
-            notes=notes,
-        )
-        db.add(order)
-        db.commit()
+    order = Order(
+        ext_ref=ext_ref,
+        customer_name=payload.name,
+        status="new lead",
+        eta=payload.move_date,
+        notes=notes,
+        **lookup_columns(payload.name, payload.phone, payload.email),
+    )
+    db.add(order)
+    await db.commit()
 
     return {"status": "received", "order_ref": ext_ref}
+
@@ -0,0 +1,91 @@
+"""In-memory pricing ruleset, refreshed from the ``pricing_rules`` table.
+
+Quotes read ``pricing_rules.current()``, an immutable ``PricingRuleset``
+snapshot, so pricing a move never touches the database: until a load has
+succeeded (before startup's first ``refresh``, or through a database
+outage) it is ``DEFAULT_RULES``. A background task
+polls the highest ``version`` in the table every ``refresh_interval``
+seconds and only reloads the ruleset when it changed; ``notify_changed()``
+triggers an immediate refresh in this process. Publishing new rates is an
+insert (or update) with a higher version, with no redeploy.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+import logging
+
+from sqlalchemy import func, select
+
+from .db import SessionLocal
+from .models import PricingRules
+from .quotes import DEFAULT_RULES, PricingRuleset
+
+logger = logging.getLogger(__name__)
+
+
+class PricingRulesProvider:
+    def __init__(self, session_factory=SessionLocal, refresh_interval: float = 60.0) -> None:
+        self._session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._snapshot: PricingRuleset | None = None
+        self._changed: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def current(self) -> PricingRuleset:
+        """The live ruleset; ``DEFAULT_RULES`` until a load succeeds. Never queries."""
+        return self._snapshot or DEFAULT_RULES
+
+    def refresh(self) -> PricingRuleset:
+        """Reload from the database if the published version changed (blocking)."""
+        try:
+            with self._session_factory() as db:
+                latest = db.scalar(select(func.max(PricingRules.version)))
+                if latest is None:
+                    snapshot = DEFAULT_RULES
+                elif self._snapshot is not None and self._snapshot.version == latest:
+                    return self._snapshot
+                else:
+                    row = db.scalars(
+                        select(PricingRules)
+                        .where(PricingRules.version == latest)
+                        .order_by(PricingRules.id.desc())
+                        .limit(1)
+                    ).one()
+                    snapshot = PricingRuleset.from_overrides(latest, row.rates)
+        except Exception:
+            logger.exception("could not load pricing rules; keeping the current ruleset")
+            if self._snapshot is None:
+                self._snapshot = DEFAULT_RULES
+            return self._snapshot
+
+        if self._snapshot is None or snapshot.version != self._snapshot.version:
+            logger.info("pricing ruleset version %s loaded", snapshot.version)
+        self._snapshot = snapshot
+        return snapshot
+
+    def notify_changed(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._changed = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.refresh)
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), self.refresh_interval)
+            self._changed.clear()
+
+
+pricing_rules = PricingRulesProvider()
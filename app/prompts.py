@@ -0,0 +1,83 @@
+"""Prompt assembly for the voice agent's LLM turns.
+
+``build_messages`` lays a turn out as
+
+    [system prompt] [rolling summary] [recent turns] [caller's words]
+
+and caps it at ``PROMPT_TOKEN_BUDGET``. The system message is a single
+module-level constant so the request prefix is byte-identical on every turn
+of every call, which is what provider-side prompt caching keys on. The
+summary and turns after it only change when ``ConversationState`` trims
+history, which it does down to a low-water mark (``LOW_WATER``) rather than
+one turn at a time, so the cached prefix also survives several turns in a
+row. The budget here is a backstop for turns that are unusually long.
+
+Tokens are counted locally with ``tiktoken`` when it is installed (and its
+encoding is available offline), otherwise estimated from character count.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Once history exceeds its budget it is trimmed to this fraction of it.
+LOW_WATER = 0.75
+# Per-message framing the chat format adds on top of the content.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # pragma: no cover - optional dependency / offline
+        logger.info("tiktoken unavailable; estimating prompt tokens from length")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # About four characters per token for English.
+    return len(text) // 4 + 1
+
+
+def message_tokens(messages: list[dict]) -> int:
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+@dataclass(frozen=True)
+class Prompt:
+    messages: list[dict]
+    tokens: int
+    dropped: int
+
+
+def build_messages(system: dict, history: list[dict], user_text: str, budget: int) -> Prompt:
+    """The messages for one turn, trimmed from the oldest turn to fit ``budget`` tokens.
+
+    ``system`` is passed through untouched (pass the same object every turn).
+    Leading system notes in ``history`` (the rolling summary) are kept; only
+    conversation turns are dropped, and the caller's words always go out.
+    """
+    notes = 0
+    while notes < len(history) and history[notes]["role"] == "system":
+        notes += 1
+    fixed = [system, *history[:notes]]
+    turns = history[notes:]
+    user = {"role": "user", "content": user_text}
+
+    sizes = [count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in turns]
+    fixed_tokens = message_tokens(fixed) + count_tokens(user_text) + MESSAGE_OVERHEAD_TOKENS
+    total = fixed_tokens + sum(sizes)
+    start = 0
+    while start < len(turns) and total > budget:
+        total -= sizes[start]
+        start += 1
+    return Prompt([*fixed, *turns[start:], user], total, start)
@@ -0,0 +1,172 @@
+"""Precomputed ``compute_quote`` surface for instant ballpark prices.
+
+For a move with no boxes, no disassembly tasks and the default warehouse
+legs, the quote depends only on weight, ``LocationProfile``, weekday or
+weekend, local or intrastate and (intrastate only) the origin-to-destination
+drive time. ``QuoteSurface.build`` evaluates that grid once per pricing
+version with ``compute_quotes_batch`` and keeps it in two float32 arrays
+(about 750 KB); ``lookup`` is then a few index computations and one
+multiply-add.
+
+* Drive time is billed in quarter hours, so the drive axis has one entry
+  per 15 minutes and lookups on it are exact.
+* The weight axis has a point every ``WEIGHT_STEP`` lbs. Movers, trucks
+  and protective materials all change at multiples of 500 lbs, and the
+  rules use "up to" thresholds, so they, and with them the hourly cost of
+  the crew and the protective materials, are constant on each half-open
+  cell ``(w0, w0 + step]``. Billed hours are linear in weight inside a
+  cell, so each cell stores the hours just above ``w0`` and at
+  ``w0 + step`` before the local 3-hour minimum, and the lookup
+  interpolates them and applies the minimum. What remains is the
+  hundredth-of-an-hour rounding of labor hours;
+  ``benchmarks/quote_surface.py`` bounds the deviation from
+  ``compute_quote``.
+
+Inputs outside the grid (over ``MAX_WEIGHT_LBS`` or ``MAX_DRIVE_MINUTES``,
+or an empty move) return ``None``, so callers fall back to
+``compute_quote``, which also stays the source for finalized quotes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import threading
+
+import numpy as np
+
+from .furniture_catalog import PROFILE_RATE, LocationProfile, movers_needed, trucks_needed
+from .pricing import pricing_rules
+from .quotes import PricingRuleset
+from .quotes_batch import compute_quotes_batch
+
+WEIGHT_STEP = 500.0
+MAX_WEIGHT_LBS = 40000.0
+DRIVE_STEP_MINUTES = 15
+MAX_DRIVE_MINUTES = 720
+# Offset of each cell's left sample: inside the cell, far below a cent of difference.
+_JUST_ABOVE = 1e-3
+# compute_quote's local travel (Rule 5/7) and billed minimum (Rule 6).
+LOCAL_TRAVEL_HOURS = 1.0 + (20.0 / 60.0)
+LOCAL_MINIMUM_HOURS = 3.0
+
+PROFILES = tuple(PROFILE_RATE)
+_PROFILE_INDEX = {profile: i for i, profile in enumerate(PROFILES)}
+_DEFAULT_PROFILE = _PROFILE_INDEX[LocationProfile.MULTI_FLOOR]
+
+
+@dataclass(frozen=True)
+class QuoteSurface:
+    version: int
+    # [profile, weekend, cell, field]
+    local: np.ndarray
+    # [profile, weekend, drive quarter hours, cell, field]
+    intrastate: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return self.local.nbytes + self.intrastate.nbytes
+
+    @classmethod
+    def build(cls, rules: PricingRuleset) -> QuoteSurface:
+        cells = int(MAX_WEIGHT_LBS // WEIGHT_STEP)
+        quarters = MAX_DRIVE_MINUTES // DRIVE_STEP_MINUTES + 1
+
+        def evaluate(*axes: np.ndarray, intrastate: bool) -> np.ndarray:
+            # Both ends of every cell in one batch call: [profile, weekend, (drive,) cell, side].
+            mesh = np.meshgrid(np.arange(len(PROFILES)), np.arange(2), *axes, np.arange(cells), np.arange(2), indexing="ij")
+            profile, weekend, cell, side = mesh[0], mesh[1], mesh[-2], mesh[-1]
+            weights = cell * WEIGHT_STEP + np.where(side == 0, _JUST_ABOVE, WEIGHT_STEP)
+            quote = compute_quotes_batch(
+                weights.ravel(),
+                np.asarray(PROFILES)[profile.ravel()],
+                friday_or_saturday=weekend.ravel().astype(bool),
+                is_intrastate=np.full(weights.size, intrastate),
+                origin_to_destination_minutes=mesh[2].ravel() * float(DRIVE_STEP_MINUTES) if intrastate else None,
+                rules=rules,
+            )
+            if intrastate:
+                hours = quote["total_hours"]
+            else:
+                hours = quote["onsite_hours"] + LOCAL_TRAVEL_HOURS  # before the local minimum
+            hourly = quote["mover_rate"] * quote["movers"] + quote["truck_rate"] * quote["trucks"]
+            grid = lambda values: values.reshape(weights.shape)  # noqa: E731
+            return np.stack(
+                [
+                    grid(hours)[..., 0],
+                    grid(hours)[..., 1],
+                    grid(hourly)[..., 1],  # constant across the cell
+                    grid(quote["protective_materials"])[..., 1],
+                ],
+                axis=-1,
+            ).astype(np.float32)
+
+        return cls(
+            version=rules.version,
+            local=evaluate(intrastate=False),
+            intrastate=evaluate(np.arange(quarters), intrastate=True),
+        )
+
+    def lookup(
+        self,
+        weight_lbs: float,
+        profile: str,
+        weekend: bool,
+        intrastate: bool,
+        drive_minutes: float = 20.0,
+    ) -> tuple[float, float] | None:
+        """``(subtotal, total_hours)`` for the move, or ``None`` outside the grid."""
+        if not 0 < weight_lbs <= MAX_WEIGHT_LBS:
+            return None
+        cell = math.ceil(weight_lbs / WEIGHT_STEP) - 1
+        t = (weight_lbs - cell * WEIGHT_STEP) / WEIGHT_STEP
+        p = _PROFILE_INDEX.get(profile, _DEFAULT_PROFILE)
+        if intrastate:
+            if not 0 <= drive_minutes <= MAX_DRIVE_MINUTES:
+                return None
+            # The same quarter-hour rounding compute_quote applies.
+            quarters = math.ceil(drive_minutes / 60.0 * 4)
+            hours0, hours1, hourly, fixed = self.intrastate[p, int(weekend), quarters, cell].tolist()
+            hours = hours0 + (hours1 - hours0) * t
+        else:
+            hours0, hours1, hourly, fixed = self.local[p, int(weekend), cell].tolist()
+            hours = max(hours0 + (hours1 - hours0) * t, LOCAL_MINIMUM_HOURS)
+        return hourly * hours + fixed, hours
+
+
+_lock = threading.Lock()
+_surface: QuoteSurface | None = None
+
+
+def current() -> QuoteSurface:
+    """The surface for the live pricing version, rebuilt (once) when the version changes."""
+    global _surface
+    rules = pricing_rules.current()
+    surface = _surface
+    if surface is None or surface.version != rules.version:
+        with _lock:
+            surface = _surface
+            if surface is None or surface.version != rules.version:
+                surface = _surface = QuoteSurface.build(rules)
+    return surface
+
+
+def ballpark(
+    weight_lbs: float,
+    profile: str,
+    weekend: bool,
+    intrastate: bool,
+    drive_minutes: float = 20.0,
+) -> dict | None:
+    """A first-pass price from the surface, or ``None`` when ``compute_quote`` is needed."""
+    surface = current()
+    found = surface.lookup(weight_lbs, profile, weekend, intrastate, drive_minutes)
+    if found is None:
+        return None
+    subtotal, total_hours = found
+    return {
+        "subtotal": round(subtotal, 2),
+        "total_hours": round(total_hours, 2),
+        "movers": movers_needed(weight_lbs),
+        "trucks": trucks_needed(weight_lbs),
+        "pricing_version": surface.version,
+    }
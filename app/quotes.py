@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 import math
-from typing import Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 from .furniture_catalog import (
     LocationProfile,
@@ -45,6 +46,57 @@ RENTAL_BOX_RATES: Dict[str, tuple[float, float]] = {
 }
 
 
+@dataclass(frozen=True)
+class PricingRuleset:
+    """Immutable snapshot of every rate ``compute_quote`` uses.
+
+    The module constants above are the defaults; ``app.pricing`` loads
+    overrides from the ``pricing_rules`` table.
+    """
+
+    version: int = 0
+    local_mover_rate_weekday: float = LOCAL_MOVER_RATE_WEEKDAY
+    local_mover_rate_weekend: float = LOCAL_MOVER_RATE_WEEKEND
+    local_truck_rate_weekday: float = LOCAL_TRUCK_RATE_WEEKDAY
+    local_truck_rate_weekend: float = LOCAL_TRUCK_RATE_WEEKEND
+    intrastate_mover_rate_weekday: float = INTRASTATE_MOVER_RATE_WEEKDAY
+    intrastate_mover_rate_weekend: float = INTRASTATE_MOVER_RATE_WEEKEND
+    intrastate_truck_rate_weekday: float = INTRASTATE_TRUCK_RATE_WEEKDAY
+    intrastate_truck_rate_weekend: float = INTRASTATE_TRUCK_RATE_WEEKEND
+    protective_per_1000_lbs: float = PROTECTIVE_PER_1000_LBS
+    sales_tax: float = SALES_TAX
+    purchase_box_rates: Mapping[str, tuple[float, float]] = field(
+        default_factory=lambda: MappingProxyType(dict(PURCHASE_BOX_RATES)), hash=False
+    )
+    rental_box_rates: Mapping[str, tuple[float, float]] = field(
+        default_factory=lambda: MappingProxyType(dict(RENTAL_BOX_RATES)), hash=False
+    )
+
+    @classmethod
+    def from_overrides(cls, version: int, overrides: Mapping[str, Any] | None) -> "PricingRuleset":
+        """Defaults with any known fields in ``overrides`` replaced; unknown keys are ignored.
+
+        Box rate tables are merged per box name rather than replaced wholesale.
+        """
+        defaults = cls()
+        names = {f.name for f in fields(cls)} - {"version"}
+        changes: dict[str, Any] = {"version": version}
+        for name, value in (overrides or {}).items():
+            if name not in names:
+                continue
+            if name.endswith("_box_rates"):
+                merged = dict(getattr(defaults, name))
+                merged.update({box: (float(rate), float(labor)) for box, (rate, labor) in value.items()})
+                value = MappingProxyType(merged)
+            else:
+                value = float(value)
+            changes[name] = value
+        return replace(defaults, **changes)
+
+
+DEFAULT_RULES = PricingRuleset()
+
+
 @dataclass
 class BoxOrder:
     purchase: Dict[str, int] = field(default_factory=dict)
@@ -61,20 +113,24 @@ class MoveSpec:
     origin_to_destination_minutes: float = 20.0
     warehouse_to_origin_minutes: float = 30.0
     destination_to_warehouse_minutes: float = 30.0
+    # Stops between origin and destination; origin_to_destination_minutes covers the whole route.
+    extra_stops: int = 0
     disassembled_beds: int = 0
     sleep_number_beds: int = 0
     desks_to_disassemble: int = 0
     box_order: BoxOrder = field(default_factory=BoxOrder)
     mover_override: int | None = None
+    # Trucks from packing the inventory (truck_loading.plan_loads) instead of the weight rule.
+    truck_override: int | None = None
 
 
 def _round_up_quarter(hour_value: float) -> float:
     return math.ceil(hour_value * 4) / 4.0
 
 
-def _protective_materials_cost(weight_lbs: float) -> float:
+def _protective_materials_cost(weight_lbs: float, rules: PricingRuleset = DEFAULT_RULES) -> float:
     units = math.ceil(max(weight_lbs, 0.0) / 1000.0)
-    return units * PROTECTIVE_PER_1000_LBS
+    return units * rules.protective_per_1000_lbs
 
 
 def _extra_task_hours(spec: MoveSpec, movers: int) -> float:
@@ -85,11 +141,11 @@ def _extra_task_hours(spec: MoveSpec, movers: int) -> float:
     return (0.5 * tasks) / movers
 
 
-def _box_costs(order: BoxOrder) -> dict:
+def _box_costs(order: BoxOrder, rules: PricingRuleset = DEFAULT_RULES) -> dict:
     purchase_box_total = 0.0
     purchase_labor_total = 0.0
     for name, count in order.purchase.items():
-        rate, labor = PURCHASE_BOX_RATES.get(name, (0.0, 0.0))
+        rate, labor = rules.purchase_box_rates.get(name, (0.0, 0.0))
         purchase_box_total += rate * count
         pack_count = order.packing_services.get(name, 0)
         purchase_labor_total += labor * pack_count
@@ -97,13 +153,13 @@ def _box_costs(order: BoxOrder) -> dict:
     rental_box_total = 0.0
     rental_labor_total = 0.0
     for name, count in order.rental.items():
-        rate, labor = RENTAL_BOX_RATES.get(name, (0.0, 0.0))
+        rate, labor = rules.rental_box_rates.get(name, (0.0, 0.0))
         rental_box_total += rate * count
         pack_count = order.packing_services.get(name, 0)
         rental_labor_total += labor * pack_count
 
     taxable_total = purchase_box_total + purchase_labor_total
-    tax = taxable_total * SALES_TAX
+    tax = taxable_total * rules.sales_tax
 
     return {
         "purchase_boxes": round(purchase_box_total, 2),
@@ -122,21 +178,21 @@ def _box_costs(order: BoxOrder) -> dict:
     }
 
 
-def _hourly_rates(spec: MoveSpec) -> tuple[float, float]:
+def _hourly_rates(spec: MoveSpec, rules: PricingRuleset = DEFAULT_RULES) -> tuple[float, float]:
     if spec.is_intrastate:
         if spec.friday_or_saturday:
-            return INTRASTATE_MOVER_RATE_WEEKEND, INTRASTATE_TRUCK_RATE_WEEKEND
-        return INTRASTATE_MOVER_RATE_WEEKDAY, INTRASTATE_TRUCK_RATE_WEEKDAY
+            return rules.intrastate_mover_rate_weekend, rules.intrastate_truck_rate_weekend
+        return rules.intrastate_mover_rate_weekday, rules.intrastate_truck_rate_weekday
 
     if spec.friday_or_saturday:
-        return LOCAL_MOVER_RATE_WEEKEND, LOCAL_TRUCK_RATE_WEEKEND
-    return LOCAL_MOVER_RATE_WEEKDAY, LOCAL_TRUCK_RATE_WEEKDAY
+        return rules.local_mover_rate_weekend, rules.local_truck_rate_weekend
+    return rules.local_mover_rate_weekday, rules.local_truck_rate_weekday
 
 
 def _travel_hours(spec: MoveSpec, is_local: bool) -> float:
     if is_local:
         # Rule 5 and Rule 7 (local): 1 hour travel + 20 minutes between sites.
-        return 1.0 + (20.0 / 60.0)
+        return 1.0 + (20.0 / 60.0) * (1 + spec.extra_stops)
 
     # Intrastate: actual drive times with minimums and quarter-hour rounding.
     to_origin = max(0.5, spec.warehouse_to_origin_minutes / 60.0)
@@ -150,9 +206,9 @@ def _travel_hours(spec: MoveSpec, is_local: bool) -> float:
     return to_origin + to_warehouse + origin_to_dest
 
 
-def compute_quote(spec: MoveSpec) -> dict:
+def compute_quote(spec: MoveSpec, rules: PricingRuleset = DEFAULT_RULES) -> dict:
     movers = spec.mover_override if spec.mover_override is not None else movers_needed(spec.total_weight_lbs)
-    trucks = trucks_needed(spec.total_weight_lbs)
+    trucks = spec.truck_override if spec.truck_override is not None else trucks_needed(spec.total_weight_lbs)
     movement_rate = hourly_rate_lbs(spec.location_profile)
 
     onsite_hours = estimate_hours(spec.total_weight_lbs, spec.location_profile, movers)
@@ -164,13 +220,13 @@ def compute_quote(spec: MoveSpec) -> dict:
     if not spec.is_intrastate:
         total_hours = max(total_hours, 3.0)  # Rule 6 local minimum
 
-    mover_rate, truck_rate = _hourly_rates(spec)
+    mover_rate, truck_rate = _hourly_rates(spec, rules)
 
     mover_cost = mover_rate * movers * total_hours
     truck_cost = truck_rate * trucks * total_hours
 
-    box_costs = _box_costs(spec.box_order)
-    protective_cost = _protective_materials_cost(spec.total_weight_lbs)
+    box_costs = _box_costs(spec.box_order, rules)
+    protective_cost = _protective_materials_cost(spec.total_weight_lbs, rules)
 
     subtotal = mover_cost + truck_cost + box_costs["total"] + protective_cost
 
@@ -193,6 +249,7 @@ def compute_quote(spec: MoveSpec) -> dict:
             "protective_materials": round(protective_cost, 2),
         },
         "subtotal": round(subtotal, 2),
+        "pricing_version": rules.version,
         "notes": {
             "local_minimum_hours": 3.0 if not spec.is_intrastate else None,
             "quarter_hour_rounding": spec.is_intrastate,
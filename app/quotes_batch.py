@@ -0,0 +1,159 @@
+"""Columnar ``compute_quote`` for repricing many moves at once.
+
+``compute_quotes_batch`` takes one NumPy array per ``MoveSpec`` field and
+returns one array per quote figure. Every step mirrors ``quotes.py``
+operation for operation (same order of float operations, same ceilings and
+minimums) so results match ``compute_quote`` to the cent; see
+``benchmarks/quotes_batch.py`` for the check over 100k specs.
+
+Box orders are not columnar; pass each spec's ``_box_costs(...)["total"]``
+as ``box_totals`` when they matter. Rates come from ``rules``, as in
+``compute_quote``.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .furniture_catalog import PROFILE_RATE, LocationProfile, hourly_rate_lbs
+from .metrics import timed
+from .quotes import DEFAULT_RULES, PricingRuleset
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """``round(x, 2)`` elementwise, with Python's semantics.
+
+    ``np.round`` rounds ``x * 100`` half-to-even, while ``round`` rounds the
+    exact binary value; they can only disagree when ``x * 100`` sits within
+    float error of a half cent, so those few elements are redone in Python.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie:
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def _round_up_quarter(hours: np.ndarray) -> np.ndarray:
+    return np.ceil(hours * 4) / 4.0
+
+
+def _movers_needed(weights: np.ndarray) -> np.ndarray:
+    extra = np.ceil((weights - 4000) / 2500)
+    movers = np.where(weights <= 4000, 2, 2 + extra)
+    return np.where(weights <= 0, 0, movers).astype(np.int64)
+
+
+def _trucks_needed(weights: np.ndarray) -> np.ndarray:
+    trucks = np.maximum(1, np.ceil(weights / 8000))
+    return np.where(weights <= 0, 0, trucks).astype(np.int64)
+
+
+def _profile_rates(profiles) -> np.ndarray:
+    labels = np.asarray(profiles, dtype=str)
+    # Unknown profiles fall back to the multi-floor rate, as hourly_rate_lbs does.
+    rates = np.full(labels.shape, PROFILE_RATE[LocationProfile.MULTI_FLOOR])
+    for profile, rate in PROFILE_RATE.items():
+        rates[labels == profile] = rate
+    return rates
+
+
+def _column(values, size: int, default: float, dtype=np.float64) -> np.ndarray:
+    if values is None:
+        return np.full(size, default, dtype=dtype)
+    column = np.asarray(values, dtype=dtype)
+    if column.shape != (size,):
+        raise ValueError(f"expected {size} values, got shape {column.shape}")
+    return column
+
+
+@timed("quote_batch")
+def compute_quotes_batch(
+    total_weight_lbs,
+    location_profile,
+    friday_or_saturday=None,
+    is_intrastate=None,
+    origin_to_destination_minutes=None,
+    warehouse_to_origin_minutes=None,
+    destination_to_warehouse_minutes=None,
+    extra_stops=None,
+    extra_tasks=None,
+    mover_override=None,
+    truck_override=None,
+    box_totals=None,
+    rules: PricingRuleset = DEFAULT_RULES,
+) -> dict[str, np.ndarray]:
+    """Quote ``len(total_weight_lbs)`` moves at once.
+
+    Defaults match ``MoveSpec``. ``extra_tasks`` is the per-spec sum of
+    disassembled beds, sleep number beds and desks; ``mover_override`` and
+    ``truck_override`` use a negative value for "no override".
+    """
+    weights = np.asarray(total_weight_lbs, dtype=np.float64)
+    n = weights.shape[0]
+    weekend = _column(friday_or_saturday, n, False, bool)
+    intrastate = _column(is_intrastate, n, False, bool)
+    o2d = _column(origin_to_destination_minutes, n, 20.0)
+    w2o = _column(warehouse_to_origin_minutes, n, 30.0)
+    d2w = _column(destination_to_warehouse_minutes, n, 30.0)
+    stops = _column(extra_stops, n, 0, np.int64)
+    tasks = _column(extra_tasks, n, 0, np.int64)
+    override = _column(mover_override, n, -1, np.int64)
+    trucks_given = _column(truck_override, n, -1, np.int64)
+    boxes = _column(box_totals, n, 0.0)
+    if isinstance(location_profile, str):
+        movement_rate = np.full(n, hourly_rate_lbs(location_profile))
+    else:
+        movement_rate = _profile_rates(location_profile)
+        if movement_rate.shape != (n,):
+            raise ValueError(f"expected {n} profiles, got shape {movement_rate.shape}")
+
+    movers = np.where(override >= 0, override, _movers_needed(weights))
+    trucks = np.where(trucks_given >= 0, trucks_given, _trucks_needed(weights))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        labor = _round2(weights / (movement_rate * movers))
+        task_hours = (0.5 * tasks) / movers
+    onsite_hours = np.where(movers == 0, 0.0, labor) + np.where(movers <= 0, 0.0, task_hours)
+
+    local_travel = 1.0 + (20.0 / 60.0) * (1 + stops)
+    to_origin = _round_up_quarter(np.maximum(0.5, w2o / 60.0))
+    to_warehouse = _round_up_quarter(np.maximum(0.5, d2w / 60.0))
+    origin_to_dest = _round_up_quarter(o2d / 60.0)
+    travel_hours = np.where(intrastate, to_origin + to_warehouse + origin_to_dest, local_travel)
+
+    total_hours = onsite_hours + travel_hours
+    total_hours = np.where(intrastate, total_hours, np.maximum(total_hours, 3.0))
+
+    mover_rate = np.where(
+        intrastate,
+        np.where(weekend, rules.intrastate_mover_rate_weekend, rules.intrastate_mover_rate_weekday),
+        np.where(weekend, rules.local_mover_rate_weekend, rules.local_mover_rate_weekday),
+    )
+    truck_rate = np.where(
+        intrastate,
+        np.where(weekend, rules.intrastate_truck_rate_weekend, rules.intrastate_truck_rate_weekday),
+        np.where(weekend, rules.local_truck_rate_weekend, rules.local_truck_rate_weekday),
+    )
+
+    mover_cost = mover_rate * movers * total_hours
+    truck_cost = truck_rate * trucks * total_hours
+    protective = np.ceil(np.maximum(weights, 0.0) / 1000.0) * rules.protective_per_1000_lbs
+    subtotal = mover_cost + truck_cost + boxes + protective
+
+    return {
+        "weight_lbs": weights,
+        "movement_rate_lbs_per_mover_hour": movement_rate,
+        "movers": movers,
+        "trucks": trucks,
+        "onsite_hours": _round2(onsite_hours),
+        "travel_hours": _round2(travel_hours),
+        "total_hours": _round2(total_hours),
+        "mover_rate": mover_rate,
+        "truck_rate": truck_rate,
+        "mover_cost": _round2(mover_cost),
+        "truck_cost": _round2(truck_cost),
+        "boxes_and_packing": boxes,
+        "protective_materials": _round2(protective),
+        "subtotal": _round2(subtotal),
+    }
@@ -0,0 +1,138 @@
+"""Output stage for ConversationRelay text frames.
+
+Sending every LLM delta as its own websocket frame means hundreds of tiny
+frames per answer, one JSON serialization each, and a TTS engine fed word
+fragments. ``SpeechChunker`` coalesces deltas into speakable chunks instead:
+
+* the first chunk goes out as soon as it holds a short phrase, so time to
+  first audio stays close to the first token;
+* after that, chunks end at sentence ends, or at clause punctuation once
+  they are long enough to be worth a frame;
+* a timer flushes whatever is buffered up to the last whole word if the
+  model stalls for ``max_delay`` seconds (a lone partial word waits for the
+  next delta or ``finish``);
+* ``finish`` sends the remainder with ``last: true`` in the same frame.
+
+Frames are formatted around the JSON-encoded token rather than built as a
+dict and serialized, using ``orjson`` when it is installed.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from typing import Awaitable, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_SENTENCE_END = re.compile(r"[.!?…][\"')\]]?\s")
+_CLAUSE_END = re.compile(r"[,;:—]\s")
+
+if orjson is not None:
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:  # pragma: no cover - optional speedup
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def text_frame(token: str, last: bool = False) -> str:
+    """``{"type": "text", "token": ..., "last": ...}`` without building a dict."""
+    return f'{{"type":"text","token":{dumps(token)},"last":{"true" if last else "false"}}}'
+
+
+class SpeechChunker:
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        max_delay: float = 0.2,
+        first_chunk_words: int = 3,
+        min_clause_chars: int = 24,
+    ) -> None:
+        self._send = send
+        self.max_delay = max_delay
+        self.min_clause_chars = min_clause_chars
+        self._first_words = re.compile(rf"\s*(?:\S+\s+){{{first_chunk_words}}}")
+        self._buffer = ""
+        self._sent_any = False
+        self._finished = False
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+        self._pending: set[asyncio.Task] = set()
+        self.frames = 0
+        # Text of the frames sent so far: what the caller can have heard.
+        self.sent: list[str] = []
+
+    def _boundary(self) -> int:
+        """End of the longest prefix of the buffer that should be sent now, or 0."""
+        text = self._buffer
+        if not self._sent_any:
+            match = self._first_words.match(text)
+            if match:
+                return match.end()
+        cut = 0
+        for match in _SENTENCE_END.finditer(text):
+            cut = match.end()
+        if cut:
+            return cut
+        for match in _CLAUSE_END.finditer(text):
+            if match.end() >= self.min_clause_chars:
+                cut = match.end()
+        return cut
+
+    async def push(self, token: str) -> None:
+        self._buffer += token
+        if self._boundary():
+            await self._flush(timed=False)
+        if self._buffer and self._timer is None and self.max_delay > 0:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._on_timer)
+
+    async def finish(self) -> None:
+        """Send what is left, flagged as the end of the answer."""
+        self.cancel()
+        async with self._lock:
+            self._finished = True
+            text, self._buffer = self._buffer, ""
+            await self._send(text_frame(text, last=True))
+            self.frames += 1
+            self.sent.append(text)
+
+    def cancel(self) -> None:
+        """Drop the flush timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def abort(self) -> None:
+        """Barge-in: drop the timer, any timed flush in flight and the buffer."""
+        self.cancel()
+        for task in self._pending:
+            task.cancel()
+        self._buffer = ""
+
+    async def _flush(self, timed: bool) -> None:
+        self.cancel()
+        async with self._lock:
+            if self._finished:
+                return
+            if timed:
+                # Hold back a trailing partial word; it will complete with the next delta.
+                # With no space at all, send nothing: the next push re-arms the timer.
+                cut = self._buffer.rfind(" ") + 1
+            else:
+                cut = self._boundary()
+            chunk, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            if not chunk:
+                return
+            self._sent_any = True
+            await self._send(text_frame(chunk))
+            self.frames += 1
+            self.sent.append(chunk)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self._flush(timed=True))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
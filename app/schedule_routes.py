@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .furniture_catalog import LocationProfile, ProfileName
+from .scheduling import DEFAULT_JOB, JobSize, scheduler
+
+
+router = APIRouter(tags=["schedule"])
+
+
+@router.get("/schedule/open-slots")
+async def open_slots(
+    weight_lbs: float | None = Query(None, gt=0, description="Sizes the job with movers_needed/trucks_needed"),
+    profile: ProfileName = Query(LocationProfile.MULTI_FLOOR),
+    movers: int | None = Query(None, ge=1, description="Overrides the movers derived from the weight"),
+    trucks: int | None = Query(None, ge=1, description="Overrides the trucks derived from the weight"),
+    hours: float | None = Query(None, gt=0, description="Overrides the estimated hours"),
+    after: datetime | None = Query(None, description="Earliest start, local wall-clock time"),
+    count: int = Query(5, ge=1, le=50),
+) -> dict:
+    """The next ``count`` starts with enough free movers and trucks for the move."""
+    job = JobSize.from_weight(weight_lbs, profile) if weight_lbs else DEFAULT_JOB
+    job = JobSize(movers or job.movers, trucks or job.trucks, hours or job.hours)
+    if after is not None:
+        after = after.replace(tzinfo=None)
+    slots = scheduler.open_slots(job, after, count)
+    if not slots and (job.movers > scheduler.index.movers or job.trucks > scheduler.index.trucks):
+        raise HTTPException(status_code=422, detail="The move needs more movers or trucks than the company has.")
+    return {
+        "job": {"movers": job.movers, "trucks": job.trucks, "hours": job.hours},
+        "open_slots": [slot.isoformat(timespec="minutes") for slot in slots],
+    }
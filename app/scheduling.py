@@ -0,0 +1,411 @@
+"""Crew and truck capacity for booking moves.
+
+The company has ``CREW_MOVERS`` movers and ``FLEET_TRUCKS`` trucks; every
+scheduled appointment holds some of each from its start for its estimated
+hours. ``CapacityIndex`` keeps, per day, how many movers and trucks are
+committed in each ``SCHEDULE_SLOT_MINUTES`` slot of the workday, so
+"does this job fit at 9:00" is a slice ``max`` over a handful of slots and
+"the next N open starts" scans days in memory without touching the
+database (well under a millisecond for the default 60-day horizon).
+
+The index is a cache. ``Scheduler.reserve`` is the source of truth:
+
+1. it takes a per-day lock by upserting and updating that day's
+   ``schedule_days`` row, which serializes reservations for the same day
+   across workers (a row lock on PostgreSQL, the write lock on SQLite);
+2. it re-reads the appointments overlapping the job from the database and
+   checks the capacity against them;
+3. it inserts the appointment in the same transaction.
+
+A conflict raises ``SlotUnavailable`` carrying the next open starts, so the
+caller can be offered alternatives in the same turn. A background task
+reloads the index every ``refresh_interval`` seconds to pick up bookings
+made by other workers, like ``pricing_rules``.
+
+Times are naive wall-clock times in the company's timezone
+(``COMPANY_TIMEZONE``); an offset in a booking's ``datetime_iso`` is
+dropped, not converted. "Now" and "today" come from ``company_now``, not
+the server clock (UTC on most hosts).
+
+The app awaits ``Scheduler.refresh`` at startup, before serving, so the
+blocking load never runs on the event loop; if that load fails the index
+starts empty and ``reserve`` still checks every booking against the
+database.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+import logging
+import math
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, update
+
+from .config import settings
+from .db import AsyncSessionLocal, SessionLocal
+from .furniture_catalog import LocationProfile, estimate_hours, movers_needed, trucks_needed
+from .metrics import timed
+from .models import Appointment, ScheduleDay
+
+logger = logging.getLogger(__name__)
+
+# Drive to the origin and between sites, added to the labor estimate.
+DEFAULT_TRAVEL_HOURS = 1.0
+
+
+def company_now() -> datetime:
+    """The current wall-clock time in the company's timezone, naive like every slot time."""
+    return datetime.now(ZoneInfo(settings.COMPANY_TIMEZONE)).replace(tzinfo=None)
+
+
+class SlotUnavailable(Exception):
+    """The requested start does not have the crew or trucks the move needs."""
+
+    def __init__(self, start: datetime, alternatives: list[datetime]) -> None:
+        super().__init__(f"no capacity at {start.isoformat(timespec='minutes')}")
+        self.start = start
+        self.alternatives = alternatives
+
+
+@dataclass(frozen=True)
+class JobSize:
+    movers: int
+    trucks: int
+    hours: float
+
+    @classmethod
+    def from_quote(cls, quote: dict) -> JobSize:
+        """Size a job from ``compute_quote`` output (on-site plus travel hours)."""
+        return cls(int(quote["movers"]), int(quote["trucks"]), float(quote["total_hours"]))
+
+    @classmethod
+    def from_weight(
+        cls,
+        weight_lbs: float,
+        profile: str = LocationProfile.MULTI_FLOOR,
+        travel_hours: float = DEFAULT_TRAVEL_HOURS,
+    ) -> JobSize:
+        movers = movers_needed(weight_lbs)
+        return cls(movers, trucks_needed(weight_lbs), estimate_hours(weight_lbs, profile, movers) + travel_hours)
+
+
+# Used when a booking does not say how big the move is: a typical 2-3 room local move.
+DEFAULT_JOB = JobSize(movers=2, trucks=1, hours=4.0)
+
+
+def parse_start(value: str) -> datetime:
+    """The move start from a booking's ``datetime_iso`` (``ValueError`` if it is not ISO 8601)."""
+    return datetime.fromisoformat(value.strip()).replace(tzinfo=None, second=0, microsecond=0)
+
+
+def _clock(value: str) -> time:
+    return time.fromisoformat(value)
+
+
+class CapacityIndex:
+    """Movers and trucks committed per slot of each workday."""
+
+    def __init__(
+        self,
+        movers: int,
+        trucks: int,
+        day_start: time,
+        day_end: time,
+        slot_minutes: int,
+    ) -> None:
+        self.movers = movers
+        self.trucks = trucks
+        self.day_start = day_start
+        self.slot_minutes = slot_minutes
+        workday = datetime.combine(date.min, day_end) - datetime.combine(date.min, day_start)
+        self.slots_per_day = max(1, int(workday.total_seconds() // 60) // slot_minutes)
+        # day -> (movers per slot, trucks per slot); days without bookings are absent.
+        self._days: dict[date, tuple[list[int], list[int]]] = {}
+        self._jobs: dict[int, tuple[datetime, JobSize]] = {}
+
+    @classmethod
+    def from_settings(cls) -> CapacityIndex:
+        return cls(
+            settings.CREW_MOVERS,
+            settings.FLEET_TRUCKS,
+            _clock(settings.WORKDAY_START),
+            _clock(settings.WORKDAY_END),
+            settings.SCHEDULE_SLOT_MINUTES,
+        )
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, appointment_id: int) -> bool:
+        return appointment_id in self._jobs
+
+    def slot_time(self, day: date, slot: int) -> datetime:
+        return datetime.combine(day, self.day_start) + timedelta(minutes=slot * self.slot_minutes)
+
+    def length(self, job: JobSize) -> int:
+        """Slots a job holds; a job longer than the workday holds the whole day."""
+        return min(self.slots_per_day, max(1, math.ceil(job.hours * 60 / self.slot_minutes)))
+
+    def span(self, start: datetime, job: JobSize) -> tuple[int, int]:
+        """First and end slot of ``job`` starting at ``start`` (end may run past the workday)."""
+        offset = (start - datetime.combine(start.date(), self.day_start)).total_seconds() / 60
+        first = math.floor(offset / self.slot_minutes)
+        return first, math.ceil(offset / self.slot_minutes) + self.length(job)
+
+    def add(self, appointment_id: int, start: datetime, job: JobSize) -> None:
+        if appointment_id in self._jobs:
+            return
+        first, end = self.span(start, job)
+        first, end = max(first, 0), min(end, self.slots_per_day)
+        if first >= end:
+            return  # outside the workday: holds no slots
+        self._jobs[appointment_id] = (start, job)
+        movers, trucks = self._days.setdefault(
+            start.date(), ([0] * self.slots_per_day, [0] * self.slots_per_day)
+        )
+        for slot in range(first, end):
+            movers[slot] += job.movers
+            trucks[slot] += job.trucks
+
+    def remove(self, appointment_id: int) -> None:
+        entry = self._jobs.pop(appointment_id, None)
+        if entry is None:
+            return
+        start, job = entry
+        first, end = self.span(start, job)
+        movers, trucks = self._days[start.date()]
+        for slot in range(max(first, 0), min(end, self.slots_per_day)):
+            movers[slot] -= job.movers
+            trucks[slot] -= job.trucks
+
+    def fits(self, start: datetime, job: JobSize) -> bool:
+        first, end = self.span(start, job)
+        if first < 0 or end > self.slots_per_day:
+            return False
+        return self._fits_slots(start.date(), first, end, job)
+
+    def _fits_slots(self, day: date, first: int, end: int, job: JobSize) -> bool:
+        if job.movers > self.movers or job.trucks > self.trucks:
+            return False
+        usage = self._days.get(day)
+        if usage is None:
+            return True
+        movers, trucks = usage
+        return (
+            max(movers[first:end]) + job.movers <= self.movers
+            and max(trucks[first:end]) + job.trucks <= self.trucks
+        )
+
+    def open_slots(
+        self,
+        job: JobSize,
+        after: datetime,
+        count: int,
+        step_slots: int = 1,
+        horizon_days: int = 60,
+    ) -> list[datetime]:
+        """The first ``count`` starts at or after ``after`` where ``job`` fits."""
+        found: list[datetime] = []
+        if job.movers > self.movers or job.trucks > self.trucks:
+            return found
+        length = self.length(job)
+        last_first = self.slots_per_day - length
+        day = after.date()
+        for _ in range(horizon_days):
+            opening = datetime.combine(day, self.day_start)
+            first = 0
+            if opening < after:
+                waited = (after - opening).total_seconds() / 60 / self.slot_minutes
+                first = math.ceil(math.ceil(waited) / step_slots) * step_slots
+            usage = self._days.get(day)
+            if usage is None:
+                starts = range(first, last_first + 1, step_slots)
+            else:
+                starts = self._open_starts(usage, job, length, first, step_slots)
+            for slot in starts:
+                found.append(self.slot_time(day, slot))
+                if len(found) == count:
+                    return found
+            day += timedelta(days=1)
+        return found
+
+    def _open_starts(self, usage, job: JobSize, length: int, first: int, step_slots: int):
+        """Starts on one booked day, in one pass: a start fits once ``length`` free slots end at it."""
+        movers, trucks = usage
+        mover_room, truck_room = self.movers - job.movers, self.trucks - job.trucks
+        free_from = 0
+        for slot, (held_movers, held_trucks) in enumerate(zip(movers, trucks)):
+            if held_movers > mover_room or held_trucks > truck_room:
+                free_from = slot + 1
+                continue
+            start = slot - length + 1
+            if start >= free_from and start >= first and start % step_slots == 0:
+                yield start
+
+
+class Scheduler:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        async_session_factory=AsyncSessionLocal,
+        refresh_interval: float = 60.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._async_session_factory = async_session_factory
+        self.refresh_interval = refresh_interval
+        self._index: CapacityIndex | None = None
+        # Reservations since the running reload's query, re-applied when it swaps in.
+        self._booked_during_load: dict[int, tuple[datetime, JobSize]] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def index(self) -> CapacityIndex:
+        """The live index. Loads once on first use if nothing has refreshed it yet
+        (scripts; the app refreshes at startup, off the event loop)."""
+        index = self._index
+        if index is None:
+            index = self._index = self.load()
+        return index
+
+    def load(self) -> CapacityIndex:
+        """Build an index from today's and future scheduled appointments (blocking)."""
+        index = CapacityIndex.from_settings()
+        today = datetime.combine(company_now().date(), time.min)
+        with self._session_factory() as db:
+            self._backfill(db)
+            rows = db.execute(
+                select(Appointment.id, Appointment.start_at, Appointment.end_at, Appointment.movers, Appointment.trucks)
+                .where(Appointment.start_at >= today, Appointment.status != "cancelled")
+            ).all()
+        for row in rows:
+            index.add(row.id, row.start_at, self._row_job(row))
+        return index
+
+    @staticmethod
+    def _backfill(db) -> None:
+        """Give appointments booked before capacity tracking a start and the default size."""
+        legacy = db.scalars(
+            select(Appointment).where(Appointment.start_at.is_(None), Appointment.status != "cancelled")
+        ).all()
+        for appt in legacy:
+            try:
+                appt.start_at = parse_start(appt.datetime_iso)
+            except ValueError:
+                continue  # free text; nothing to hold capacity against
+            appt.end_at = appt.start_at + timedelta(hours=DEFAULT_JOB.hours)
+            appt.movers, appt.trucks = DEFAULT_JOB.movers, DEFAULT_JOB.trucks
+        if legacy:
+            db.commit()
+
+    @staticmethod
+    def _row_job(row) -> JobSize:
+        hours = (row.end_at - row.start_at).total_seconds() / 3600 if row.end_at else DEFAULT_JOB.hours
+        return JobSize(
+            row.movers if row.movers is not None else DEFAULT_JOB.movers,
+            row.trucks if row.trucks is not None else DEFAULT_JOB.trucks,
+            hours,
+        )
+
+    async def refresh(self) -> None:
+        self._booked_during_load = {}
+        try:
+            index = await asyncio.to_thread(self.load)
+        except Exception:
+            logger.exception("could not load appointments; keeping the current capacity index")
+            if self._index is None:
+                # Never fall back to a blocking load on the event loop; reserve() still checks the database.
+                self._index = CapacityIndex.from_settings()
+            return
+        finally:
+            booked, self._booked_during_load = self._booked_during_load, None
+        for appointment_id, (start, job) in booked.items():
+            index.add(appointment_id, start, job)
+        self._index = index
+
+    @timed("schedule_open_slots")
+    def open_slots(self, job: JobSize, after: datetime | None = None, count: int = 3) -> list[datetime]:
+        now = company_now().replace(second=0, microsecond=0)
+        return self.index.open_slots(
+            job,
+            max(after or now, now),
+            count,
+            step_slots=max(1, settings.SCHEDULE_START_STEP_MINUTES // settings.SCHEDULE_SLOT_MINUTES),
+            horizon_days=settings.SCHEDULE_HORIZON_DAYS,
+        )
+
+    async def reserve(self, start: datetime, job: JobSize, **fields) -> int:
+        """Insert an appointment holding ``job``'s crew and trucks from ``start``.
+
+        Raises ``SlotUnavailable`` (with the next open starts) when the
+        workday or the remaining capacity cannot take the job.
+        """
+        index = self.index
+        # Alternatives start from the requested day's opening: an earlier time that day is the best offer.
+        same_day = datetime.combine(start.date(), time.min)
+        if start < company_now() or not index.fits(start, job):
+            raise SlotUnavailable(start, self.open_slots(job, same_day))
+        end = start + timedelta(minutes=index.length(job) * index.slot_minutes)
+
+        async with self._async_session_factory() as db:
+            await self._lock_day(db, start.date())
+            overlapping = (await db.execute(
+                select(Appointment.id, Appointment.start_at, Appointment.end_at, Appointment.movers, Appointment.trucks)
+                .where(Appointment.start_at < end, Appointment.end_at > start, Appointment.status != "cancelled")
+            )).all()
+            check = CapacityIndex.from_settings()
+            for row in overlapping:
+                check.add(row.id, row.start_at, self._row_job(row))
+            if not check.fits(start, job):
+                await db.rollback()
+                # Another worker got there first; catch this index up before suggesting alternatives.
+                for row in overlapping:
+                    self.index.add(row.id, row.start_at, self._row_job(row))
+                raise SlotUnavailable(start, self.open_slots(job, same_day))
+
+            appt = Appointment(start_at=start, end_at=end, movers=job.movers, trucks=job.trucks, **fields)
+            db.add(appt)
+            await db.commit()
+
+        self.index.add(appt.id, start, job)
+        if self._booked_during_load is not None:
+            self._booked_during_load[appt.id] = (start, job)
+        return appt.id
+
+    @staticmethod
+    async def _lock_day(db, day: date) -> None:
+        key = day.isoformat()
+        dialect = (await db.connection()).dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            await db.execute(insert(ScheduleDay).values(day=key, reservations=0).on_conflict_do_nothing(index_elements=["day"]))
+        elif await db.get(ScheduleDay, key) is None:
+            db.add(ScheduleDay(day=key, reservations=0))
+            await db.flush()
+        await db.execute(
+            update(ScheduleDay).where(ScheduleDay.day == key).values(reservations=ScheduleDay.reservations + 1)
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+
+scheduler = Scheduler()
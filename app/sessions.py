@@ -0,0 +1,272 @@
+"""Conversation state for ConversationRelay calls, keyed by ``sessionId``.
+
+``ws_handler`` used to keep each call's history in a local list: a reconnect
+routed to another uvicorn worker started from a blank context, and every
+turn resent the whole call to the LLM. ``ConversationState`` now holds the
+call's recent turns plus a rolling summary of older ones, trimmed to
+``HISTORY_TOKEN_BUDGET`` as turns are added, and lives in ``session_store()``
+(swap it with ``set_session_store``):
+
+* ``LocalSessionStore``: an in-process LRU with a TTL (the default).
+* ``SharedSessionStore``: the same LRU in front of a shared key-value
+  backend, so any worker can pick a session up. ``RedisBackend`` is used
+  when ``SESSION_STORE_URL`` is set (needs the ``redis`` package);
+  ``InMemoryBackend`` is a local stand-in with the same interface.
+
+Backend writes happen in the background so the voice path never waits on
+them. The backend is read once when a call connects; the local copy is the
+fallback when it is unreachable.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field, fields
+import json
+import logging
+import re
+import time
+from typing import Protocol
+
+from .config import settings
+from .prompts import LOW_WATER, count_tokens
+from .utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dash:session:"
+_SENTENCE_END = re.compile(r"(?<=[.?!])\s")
+
+
+def _first_sentence(text: str, limit: int = 160) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    return sentence if len(sentence) <= limit else sentence[: limit - 3].rstrip() + "..."
+
+
+class Summarizer(Protocol):
+    def fold(self, summary: str, turns: list[dict], budget: int) -> str: ...
+
+
+class ExtractiveSummarizer:
+    """Folds evicted turns into the summary without a model call.
+
+    Caller turns carry the facts the agent needs later (dates, rooms, miles,
+    names), so they are kept close to verbatim; agent turns are cut to their
+    first sentence. The oldest lines go first once ``budget`` is exceeded.
+    """
+
+    def fold(self, summary: str, turns: list[dict], budget: int) -> str:
+        lines = summary.splitlines() if summary else []
+        for turn in turns:
+            if turn["role"] == "user":
+                lines.append(f"Caller: {_first_sentence(turn['content'], limit=300)}")
+            else:
+                lines.append(f"Agent: {_first_sentence(turn['content'])}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > budget:
+            lines.pop(0)
+        return "\n".join(lines)
+
+
+@dataclass
+class ConversationState:
+    session_id: str
+    call_sid: str | None = None
+    from_number: str | None = None
+    to_number: str | None = None
+    summary: str = ""
+    turns: list[dict] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+    # InventorySession.to_dict() of the items the caller has listed so far.
+    inventory: dict = field(default_factory=dict)
+
+    def add_turn(
+        self,
+        role: str,
+        content: str,
+        budget: int | None = None,
+        summary_budget: int | None = None,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        """Append a turn, folding the oldest turns into the summary past ``budget`` tokens.
+
+        Trimming goes down to ``LOW_WATER`` of the budget so the history (and
+        with it the cached prompt prefix) then stays put for a few turns.
+        """
+        budget = settings.HISTORY_TOKEN_BUDGET if budget is None else budget
+        summary_budget = settings.SUMMARY_TOKEN_BUDGET if summary_budget is None else summary_budget
+        self.turns.append({"role": role, "content": content})
+        self.updated_at = time.time()
+
+        sizes = [count_tokens(turn["content"]) for turn in self.turns]
+        total = sum(sizes)
+        if total <= budget:
+            return
+        evicted: list[dict] = []
+        # Always keep the newest turn, however long.
+        while total > budget * LOW_WATER and len(self.turns) > 1:
+            evicted.append(self.turns.pop(0))
+            total -= sizes.pop(0)
+        if evicted:
+            self.summary = (summarizer or _summarizer).fold(self.summary, evicted, summary_budget)
+
+    def messages(self) -> list[dict]:
+        """History for the LLM: the rolling summary (if any), then the recent turns."""
+        if not self.summary:
+            return list(self.turns)
+        note = {"role": "system", "content": f"Earlier in this call:\n{self.summary}"}
+        return [note, *self.turns]
+
+    def dumps(self) -> bytes:
+        # Shallow on purpose: asdict() deep-copies every turn first.
+        return json.dumps({f.name: getattr(self, f.name) for f in fields(self)}, separators=(",", ":")).encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> ConversationState:
+        # Ignore fields this version does not know (written by a newer worker mid-deploy).
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in json.loads(data).items() if key in names})
+
+
+_summarizer: Summarizer = ExtractiveSummarizer()
+
+
+class SessionStore(Protocol):
+    async def load(self, session_id: str) -> ConversationState | None: ...
+
+    def save(self, state: ConversationState) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class LocalSessionStore:
+    def __init__(self, maxsize: int = 2048, ttl: float = 3600.0) -> None:
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    async def load(self, session_id: str) -> ConversationState | None:
+        return self._cache.get(session_id)
+
+    def save(self, state: ConversationState) -> None:
+        self._cache.set(state.session_id, state)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class KeyValueBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class InMemoryBackend:
+    """Process-local fake of a shared backend; stores serialized bytes like Redis would."""
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._data: dict[str, tuple[float, bytes]] = {}
+        self.gets = 0
+        self.sets = 0
+
+    async def get(self, key: str) -> bytes | None:
+        self.gets += 1
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._clock():
+            self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.sets += 1
+        self._data[key] = (self._clock() + ttl, value)
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class RedisBackend:
+    def __init__(self, url: str) -> None:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("SESSION_STORE_URL needs the 'redis' package (pip install redis)") from exc
+        self._client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class SharedSessionStore:
+    def __init__(self, backend: KeyValueBackend, maxsize: int = 2048, ttl: float = 3600.0) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._local = LocalSessionStore(maxsize=maxsize, ttl=ttl)
+        self._pending: dict[str, ConversationState] = {}
+        self._writers: dict[str, asyncio.Task] = {}
+
+    async def load(self, session_id: str) -> ConversationState | None:
+        # The backend wins: the call may have moved to another worker and back
+        # since this worker last saw it.
+        try:
+            data = await self.backend.get(KEY_PREFIX + session_id)
+        except Exception:
+            logger.exception("session backend read failed for %s; using the local copy", session_id)
+            return await self._local.load(session_id)
+        if data is None:
+            return await self._local.load(session_id)
+        state = ConversationState.loads(data)
+        self._local.save(state)
+        return state
+
+    def save(self, state: ConversationState) -> None:
+        self._local.save(state)
+        self._pending[state.session_id] = state
+        if state.session_id not in self._writers:
+            task = asyncio.get_running_loop().create_task(self._write(state.session_id))
+            self._writers[state.session_id] = task
+
+    async def _write(self, session_id: str) -> None:
+        # One writer per session, always sending the newest snapshot, so writes
+        # never land out of order and bursts of turns coalesce.
+        try:
+            while session_id in self._pending:
+                state = self._pending.pop(session_id)
+                try:
+                    await self.backend.set(KEY_PREFIX + session_id, state.dumps(), int(self.ttl))
+                except Exception:
+                    logger.exception("session backend write failed for %s", session_id)
+        finally:
+            del self._writers[session_id]
+
+    async def flush(self) -> None:
+        """Wait for background writes to land."""
+        while self._writers:
+            await asyncio.gather(*self._writers.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        await self.backend.close()
+
+
+def _default_store() -> SessionStore:
+    if settings.SESSION_STORE_URL:
+        return SharedSessionStore(RedisBackend(settings.SESSION_STORE_URL), ttl=settings.SESSION_TTL_SECONDS)
+    return LocalSessionStore(ttl=settings.SESSION_TTL_SECONDS)
+
+
+_store: SessionStore = _default_store()
+
+
+def session_store() -> SessionStore:
+    return _store
+
+
+def set_session_store(store: SessionStore) -> None:
+    global _store
+    _store = store
@@ -0,0 +1,409 @@
+"""OpenAI function-calling tools for the voice agent.
+
+The LLM gets the quote, booking and order-status workflows as tools
+(``TOOL_SPECS``), so a caller who gives the details in one breath gets an
+answer in the same turn instead of a canned follow-up question.
+``ToolSession`` runs the calls for one call (connection):
+
+* calls from the same model response run concurrently, after its
+  ``update_inventory`` calls (those run first, one at a time, so no read
+  sees a half-applied change); blocking workflows (the quote math) go to a
+  worker thread, the async DB workflows stay on the event loop;
+* results are cached for the rest of the call by tool name and arguments,
+  so repeating a question (or the model re-issuing a call) costs nothing and
+  a booking is never created twice; order status, open slots and an
+  "unavailable" booking are asked afresh each time;
+* ``update_inventory`` keeps the items the caller lists in the call's
+  ``InventorySession``; once there is one, ``get_quote`` prices from its
+  running weight and the booking tools size the crew and trucks from it.
+  Results of these tools are cached per inventory revision,
+  so a changed inventory is never answered from the cache;
+* a failing tool returns ``{"error": ...}`` to the model rather than
+  breaking the turn; a booking at a full time returns the next open starts
+  instead, so the caller hears alternatives in the same turn.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import inspect
+import json
+import logging
+from typing import Any, Callable
+
+from .furniture_catalog import LocationProfile, trucks_needed
+from .geo import route_for
+from .inventory import InventorySession
+from .metrics import TOOL_CALLS, timed
+from .scheduling import DEFAULT_JOB, DEFAULT_TRAVEL_HOURS, JobSize, SlotUnavailable, scheduler
+from .workflows import ballpark_from_strings, create_appointment, estimate_from_strings, get_order_status
+
+logger = logging.getLogger(__name__)
+
+# Spoken while tools run, if the model has not said anything itself yet.
+FILLER = "One moment while I check that. "
+# Below this match confidence the model is asked to confirm the item with the caller.
+CONFIRM_BELOW = 0.6
+
+
+def _quote(
+    rooms: int | None = None,
+    miles: float | None = None,
+    stairs: bool = False,
+    piano: bool = False,
+    weekend: bool = False,
+    origin: str | None = None,
+    destination: str | None = None,
+    stops: list[str] | None = None,
+    *,
+    inventory: InventorySession | None = None,
+) -> dict:
+    route = route_for(origin, destination, stops or ()) if origin and destination else None
+    if route is not None and not route.has_distance and miles is not None:
+        # Both addresses fell on one city centroid: the caller's miles say more than 0.
+        route = None
+    if route is None and miles is None:
+        raise ValueError("need the miles, or an origin and destination with a ZIP code or city")
+    # Listed items beat the per-room guess, and are packed into trucks by volume too.
+    weight = trucks = None
+    if inventory is not None and len(inventory):
+        weight, trucks = inventory.weight_lbs, inventory.trucks
+    if weight is None and not rooms:
+        raise ValueError("need the number of rooms, or the caller's items via update_inventory")
+    rooms = int(rooms or 0)
+    quote = None
+    # The surface sizes trucks by weight only.
+    if route is None and not piano and (trucks is None or trucks == trucks_needed(weight)):
+        # A spoken first answer: the precomputed surface, within a fraction of a percent.
+        quote = ballpark_from_strings(float(miles), rooms, bool(stairs), bool(weekend), weight_lbs=weight)
+    if quote is None:
+        quote = estimate_from_strings(
+            float(miles or 0), rooms, bool(stairs), bool(piano), bool(weekend),
+            route=route, weight_lbs=weight, trucks=trucks,
+        )
+    result = {
+        "estimate_usd": quote["subtotal"],
+        "movers": quote["movers"],
+        "trucks": quote["trucks"],
+        "total_hours": quote["total_hours"],
+        "pricing_version": quote["pricing_version"],
+    }
+    if route is not None:
+        result["miles"] = route.loaded_miles
+        result["stop_order"] = [place.name for place in route.stops]
+    return result
+
+
+async def _update_inventory(
+    items: list[dict], stairs: bool | None = None, *, inventory: InventorySession
+) -> dict:
+    # On the event loop, not a worker thread: the session is shared with the call's other tools.
+    changes = []
+    for line in items:
+        item, confidence = inventory.set_quantity(str(line["name"]), int(line.get("quantity", 1)))
+        change = {"heard": line["name"], "item": item.name, "quantity": inventory.lines.get(item.name.lower(), 0)}
+        if confidence < CONFIRM_BELOW:
+            change["confirm"] = True
+        changes.append(change)
+    if stairs is not None:
+        inventory.set_profile(LocationProfile.HEAVY_STAIRS if stairs else LocationProfile.MULTI_FLOOR)
+    return {"changes": changes, **inventory.totals()}
+
+
+async def _job_size(
+    rooms: int | None, miles: float | None, stairs: bool, inventory: InventorySession | None = None
+) -> JobSize:
+    if inventory is not None and len(inventory):
+        # Listed items size the crew and trucks; the miles (when given) only add the travel time.
+        movers, trucks, hours = inventory.movers, inventory.trucks, inventory.hours
+        travel = DEFAULT_TRAVEL_HOURS
+        if miles is not None:
+            quote = await asyncio.to_thread(
+                estimate_from_strings, float(miles), 0, bool(stairs), False, False,
+                weight_lbs=inventory.weight_lbs, trucks=trucks,
+            )
+            travel = quote["travel_hours"]
+        return JobSize(movers, trucks, hours + travel)
+    if not rooms:
+        return DEFAULT_JOB
+    quote = await asyncio.to_thread(estimate_from_strings, float(miles or 0), int(rooms), bool(stairs), False, False)
+    return JobSize.from_quote(quote)
+
+
+def _starts(slots: list[datetime]) -> list[str]:
+    return [slot.isoformat(timespec="minutes") for slot in slots]
+
+
+async def _book(
+    customer_name: str,
+    phone: str,
+    datetime_iso: str,
+    origin_addr: str,
+    destination_addr: str,
+    email: str = "",
+    notes: str = "",
+    rooms: int | None = None,
+    miles: float | None = None,
+    stairs: bool = False,
+    *,
+    inventory: InventorySession | None = None,
+) -> dict:
+    try:
+        appointment_id = await create_appointment(
+            job=await _job_size(rooms, miles, stairs, inventory),
+            customer_name=customer_name,
+            phone=phone,
+            email=email,
+            datetime_iso=datetime_iso,
+            origin_addr=origin_addr,
+            destination_addr=destination_addr,
+            notes=notes,
+        )
+    except SlotUnavailable as exc:
+        return {"status": "unavailable", "open_slots": _starts(exc.alternatives)}
+    return {"appointment_id": appointment_id, "status": "scheduled"}
+
+
+async def _open_slots(
+    after_iso: str | None = None,
+    rooms: int | None = None,
+    miles: float | None = None,
+    count: int = 3,
+    *,
+    inventory: InventorySession | None = None,
+) -> dict:
+    job = await _job_size(rooms, miles, False, inventory)
+    after = datetime.fromisoformat(after_iso).replace(tzinfo=None) if after_iso else None
+    slots = scheduler.open_slots(job, after, max(1, min(int(count), 10)))
+    return {"open_slots": _starts(slots), "movers": job.movers, "trucks": job.trucks}
+
+
+async def _order_status(ref: str | None = None, name: str | None = None, phone: str | None = None, email: str | None = None) -> dict:
+    return {"status": await get_order_status(ref=ref, name=name, phone=phone, email=email)}
+
+
+@dataclass(frozen=True)
+class Tool:
+    name: str
+    description: str
+    parameters: dict
+    func: Callable[..., Any]
+    # Gets the call's InventorySession as ``inventory``; cached per inventory revision.
+    uses_inventory: bool = False
+    # Changes the inventory: runs before, not alongside, the other calls of a round.
+    mutates_inventory: bool = False
+    # False for answers that go stale during a call (order status, open slots).
+    cache: bool = True
+
+    @property
+    def spec(self) -> dict:
+        return {
+            "type": "function",
+            "function": {"name": self.name, "description": self.description, "parameters": self.parameters},
+        }
+
+
+def _object(properties: dict, required: list[str]) -> dict:
+    return {"type": "object", "properties": properties, "required": required, "additionalProperties": False}
+
+
+TOOLS: dict[str, Tool] = {
+    tool.name: tool
+    for tool in (
+        Tool(
+            "get_quote",
+            "Estimate the price of a move once the caller has given rooms or listed items, and miles or both addresses.",
+            _object(
+                {
+                    "miles": {"type": "number", "description": "Distance between origin and destination."},
+                    "rooms": {"type": "integer", "description": "Number of rooms, if the caller has not listed items."},
+                    "stairs": {"type": "boolean", "description": "Stairs at either end."},
+                    "piano": {"type": "boolean", "description": "A piano is being moved."},
+                    "weekend": {"type": "boolean", "description": "Friday or Saturday move."},
+                    "origin": {"type": "string", "description": "Pickup ZIP code or city, if given."},
+                    "destination": {"type": "string", "description": "Final drop-off ZIP code or city, if given."},
+                    "stops": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Other pickup or drop-off ZIP codes or cities, in any order.",
+                    },
+                },
+                [],
+            ),
+            _quote,
+            uses_inventory=True,
+        ),
+        Tool(
+            "update_inventory",
+            "Record items as the caller lists them, with the total quantity of each now (0 removes the item).",
+            _object(
+                {
+                    "items": {
+                        "type": "array",
+                        "items": _object(
+                            {
+                                "name": {"type": "string", "description": "The item as the caller said it."},
+                                "quantity": {"type": "integer", "description": "How many in total, after this change."},
+                            },
+                            ["name", "quantity"],
+                        ),
+                    },
+                    "stairs": {"type": "boolean", "description": "Stairs at either end, if mentioned."},
+                },
+                ["items"],
+            ),
+            _update_inventory,
+            uses_inventory=True,
+            mutates_inventory=True,
+        ),
+        Tool(
+            "book_appointment",
+            "Book a move after the caller has confirmed the date, time, addresses, name and phone.",
+            _object(
+                {
+                    "customer_name": {"type": "string"},
+                    "phone": {"type": "string"},
+                    "email": {"type": "string"},
+                    "datetime_iso": {"type": "string", "description": "Move start, ISO 8601."},
+                    "origin_addr": {"type": "string"},
+                    "destination_addr": {"type": "string"},
+                    "notes": {"type": "string"},
+                    "rooms": {"type": "integer", "description": "Rooms being moved, if known and no items are listed; sizes the crew."},
+                    "miles": {"type": "number", "description": "Distance of the move, if known."},
+                    "stairs": {"type": "boolean", "description": "Stairs at either end."},
+                },
+                ["customer_name", "phone", "datetime_iso", "origin_addr", "destination_addr"],
+            ),
+            _book,
+            uses_inventory=True,
+        ),
+        Tool(
+            "find_open_slots",
+            "List the next start times with a crew and truck free, when the caller asks what is available.",
+            _object(
+                {
+                    "after_iso": {"type": "string", "description": "Earliest start wanted, ISO 8601."},
+                    "rooms": {"type": "integer", "description": "Rooms being moved, if known and no items are listed."},
+                    "miles": {"type": "number", "description": "Distance of the move, if known."},
+                    "count": {"type": "integer", "description": "How many options to offer (default 3)."},
+                },
+                [],
+            ),
+            _open_slots,
+            uses_inventory=True,
+            cache=False,
+        ),
+        Tool(
+            "get_order_status",
+            "Look up an existing order by order number, or by name with phone or email.",
+            _object(
+                {
+                    "ref": {"type": "string", "description": "Order number."},
+                    "name": {"type": "string"},
+                    "phone": {"type": "string"},
+                    "email": {"type": "string"},
+                },
+                [],
+            ),
+            _order_status,
+            cache=False,
+        ),
+    )
+}
+
+# Built once so every request carries the same bytes (part of the cached prompt prefix).
+TOOL_SPECS: list[dict] = [tool.spec for tool in TOOLS.values()]
+
+
+@dataclass(frozen=True)
+class ToolCall:
+    id: str
+    name: str
+    arguments: str
+
+
+class ToolSession:
+    """Executes tool calls for one conversation, caching results by name and arguments."""
+
+    def __init__(self, tools: dict[str, Tool] | None = None, inventory: InventorySession | None = None) -> None:
+        self.tools = TOOLS if tools is None else tools
+        self.inventory = InventorySession() if inventory is None else inventory
+        self._results: dict[tuple[str, str], asyncio.Task] = {}
+        self.executed = 0
+        self.cache_hits = 0
+
+    async def run(self, call: ToolCall) -> str:
+        """The JSON result for one call, as sent back to the model."""
+        try:
+            args = json.loads(call.arguments or "{}")
+        except ValueError:
+            return json.dumps({"error": "arguments were not valid JSON"})
+        if call.name not in self.tools or not isinstance(args, dict):
+            return json.dumps({"error": f"unknown tool {call.name!r}"})
+
+        tool = self.tools[call.name]
+        revision = self.inventory.revision if tool.uses_inventory else None
+        key = (call.name, json.dumps(args, sort_keys=True), revision)
+        task = self._results.get(key)
+        if task is None:
+            # Cache the task, not the result, so a duplicate call in flight shares it.
+            task = self._results[key] = asyncio.create_task(self._execute(tool, args, key))
+            TOOL_CALLS.inc(call.name, "false")
+        else:
+            self.cache_hits += 1
+            TOOL_CALLS.inc(call.name, "true")
+        try:
+            return await asyncio.shield(task)
+        except Exception as exc:
+            self._results.pop(key, None)
+            logger.exception("tool %s failed", call.name)
+            return json.dumps({"error": str(exc) or type(exc).__name__})
+
+    async def run_all(self, calls: list[ToolCall]) -> list[str]:
+        """Results in call order: inventory changes one at a time first, then the rest together.
+
+        Reads are keyed (and priced) on the revision the changes leave behind,
+        and no worker thread reads the inventory while it is being changed.
+        """
+        results: dict[int, str] = {}
+        reads = []
+        for i, call in enumerate(calls):
+            tool = self.tools.get(call.name)
+            if tool is not None and tool.mutates_inventory:
+                results[i] = await self.run(call)
+            else:
+                reads.append(i)
+        for i, result in zip(reads, await asyncio.gather(*(self.run(calls[i]) for i in reads))):
+            results[i] = result
+        return [results[i] for i in range(len(calls))]
+
+    async def _execute(self, tool: Tool, args: dict, key: tuple) -> str:
+        self.executed += 1
+        if tool.uses_inventory:
+            args = {**args, "inventory": self.inventory}
+        with timed(f"tool:{tool.name}"):
+            if inspect.iscoroutinefunction(tool.func):
+                result = await tool.func(**args)
+            else:
+                result = await asyncio.to_thread(tool.func, **args)
+        # A full slot may free up, so "unavailable" is asked again rather than replayed.
+        if not tool.cache or (isinstance(result, dict) and result.get("status") == "unavailable"):
+            self._results.pop(key, None)
+        return json.dumps(result)
+
+
+def assistant_tool_message(content: str, calls: list[ToolCall]) -> dict:
+    """The assistant turn that requested ``calls``, as the API expects it echoed back."""
+    return {
+        "role": "assistant",
+        "content": content or None,
+        "tool_calls": [
+            {"id": call.id, "type": "function", "function": {"name": call.name, "arguments": call.arguments}}
+            for call in calls
+        ],
+    }
+
+
+def tool_messages(calls: list[ToolCall], results: list[str]) -> list[dict]:
+    return [{"role": "tool", "tool_call_id": call.id, "content": result} for call, result in zip(calls, results)]
@@ -0,0 +1,24 @@
+"""Per-call trace IDs for log records.
+
+``ws_handler`` binds ``trace_id`` to the Twilio ``callSid`` when a call is
+set up and to ``<callSid>/<turn>`` for each caller turn. It is a
+``ContextVar``, so tasks and ``asyncio.to_thread`` calls started from a
+turn inherit it, and ``TraceIdFilter`` (installed by ``logging_conf``)
+stamps it on every record as ``trace_id``.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+import logging
+
+trace_id: ContextVar[str] = ContextVar("trace_id", default="-")
+
+
+def bind(value: str | None) -> None:
+    trace_id.set(value or "-")
+
+
+class TraceIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id.get()
+        return True
@@ -0,0 +1,145 @@
+"""Write-behind transcript logging for ConversationRelay calls.
+
+The websocket handler used to open a session, look up the call's
+``ConversationLog`` row and commit twice per turn, all on the event loop.
+``TranscriptWriter`` instead buffers turns per call in memory and a single
+background task flushes them in batches across every live call through an
+``AsyncSession``. The voice path only ever appends to a dict.
+
+A failed or cancelled write puts its batch back in front of newer turns.
+While the database stays down, each call keeps at most
+``max_pending_turns`` of its newest turns; older ones are dropped and
+counted in ``dash_transcript_turns_dropped_total``.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+import logging
+
+from sqlalchemy import select
+
+from .db import AsyncSessionLocal
+from .metrics import TRANSCRIPT_DROPPED, timed
+from .models import ConversationLog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingCall:
+    call_sid: str | None
+    from_number: str | None
+    to_number: str | None
+    entries: list[dict] = field(default_factory=list)
+
+
+class TranscriptWriter:
+    def __init__(
+        self, session_factory=AsyncSessionLocal, flush_interval: float = 0.5, max_pending_turns: int = 500
+    ) -> None:
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._max_pending_turns = max_pending_turns
+        self._pending: dict[str, _PendingCall] = {}
+        self._write_lock: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._write_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        # Drain what is left, including a batch put back by the cancelled flush.
+        await self.flush()
+
+    def append(self, session_id, call_sid, from_number, to_number, role: str, text: str) -> None:
+        """Buffer one turn; never touches the database."""
+        if session_id is None:
+            return
+        pending = self._pending.get(session_id)
+        if pending is None:
+            pending = self._pending[session_id] = _PendingCall(call_sid, from_number, to_number)
+        pending.entries.append({"role": role, "text": text})
+        if self._task is None:
+            self.start()
+
+    async def end_call(self, session_id) -> None:
+        """Flush whatever is still buffered for a call that has disconnected."""
+        if session_id in self._pending:
+            await self.flush([session_id])
+
+    async def flush(self, session_ids=None) -> None:
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        # One writer at a time keeps each call's turns in order across batches.
+        async with self._write_lock:
+            if session_ids is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {sid: self._pending.pop(sid) for sid in session_ids if sid in self._pending}
+            if not batch:
+                return
+            try:
+                with timed("db_transcript_flush"):
+                    await self._write(batch)
+            except asyncio.CancelledError:
+                # stop() cancelled the background flush mid-write; keep the batch for its final drain.
+                self._requeue(batch)
+                raise
+            except Exception:
+                logger.exception("transcript flush failed for %d calls; will retry", len(batch))
+                self._requeue(batch)
+
+    def _requeue(self, batch: dict[str, _PendingCall]) -> None:
+        dropped = 0
+        for session_id, failed in batch.items():
+            newer = self._pending.get(session_id)
+            if newer is not None:
+                failed.entries.extend(newer.entries)
+            overflow = len(failed.entries) - self._max_pending_turns
+            if overflow > 0:
+                del failed.entries[:overflow]
+                dropped += overflow
+            self._pending[session_id] = failed
+        if dropped:
+            TRANSCRIPT_DROPPED.inc(amount=dropped)
+            logger.warning("transcript buffer full; dropped %d oldest turns", dropped)
+
+    async def _write(self, batch: dict[str, _PendingCall]) -> None:
+        async with self._session_factory() as db:
+            rows = {
+                rec.session_id: rec
+                for rec in await db.scalars(
+                    select(ConversationLog).where(ConversationLog.session_id.in_(list(batch)))
+                )
+            }
+            for session_id, pending in batch.items():
+                rec = rows.get(session_id)
+                if rec is None:
+                    db.add(ConversationLog(
+                        session_id=session_id,
+                        call_sid=pending.call_sid,
+                        from_number=pending.from_number,
+                        to_number=pending.to_number,
+                        transcript=pending.entries,
+                    ))
+                else:
+                    # Assign a new list: in-place appends to a JSON column are not tracked.
+                    rec.transcript = [*(rec.transcript or []), *pending.entries]
+            await db.commit()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+
+transcript_writer = TranscriptWriter()
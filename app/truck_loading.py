@@ -0,0 +1,172 @@
+"""How many trucks an itemized move fills, by cubic feet and by weight.
+
+``trucks_needed`` sizes the fleet on weight alone (8,000 lbs a truck), so
+bulky, light loads (sectionals, storage beds, patio sets) come out a truck
+short. ``plan_loads`` packs the matched inventory into trucks described by
+a ``TruckModel``: usable cubic feet (box volume times the share a furniture
+load really fills) and payload.
+
+Packing is first-fit decreasing over both dimensions. Units of the same
+size are interchangeable, so lines are grouped by (volume, weight) and each
+group is placed in bulk: as many units as fit in each open truck, in order.
+That is the same result as placing them one at a time, but the work grows
+with the number of distinct sizes (a few hundred in the catalog), not with
+the number of units or line items. Trucks with no room for the smallest
+unit still to come are retired as the pass goes. The pass runs with three
+orderings (largest share of a truck, combined share, cubic feet) and keeps
+the plan with the fewest trucks, stopping early once one meets the lower
+bound ``TruckModel.lower_bound``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import Iterable
+
+from .config import settings
+
+# Room left in a truck below this counts as none (volumes and weights are floats).
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class TruckModel:
+    volume_cuft: float = 1700.0
+    payload_lbs: float = 8000.0
+    # Share of the box a furniture load actually fills (odd shapes, pads, stacking limits).
+    load_factor: float = 0.7
+
+    @classmethod
+    def from_settings(cls) -> TruckModel:
+        return cls(settings.TRUCK_VOLUME_CUFT, settings.TRUCK_PAYLOAD_LBS, settings.TRUCK_LOAD_FACTOR)
+
+    @property
+    def usable_cuft(self) -> float:
+        return self.volume_cuft * self.load_factor
+
+    def lower_bound(self, weight_lbs: float, volume_cuft: float) -> int:
+        """Trucks needed if the load could be poured in; no packing does better."""
+        if weight_lbs <= 0 and volume_cuft <= 0:
+            return 0
+        return max(1, math.ceil(volume_cuft / self.usable_cuft - _EPS), math.ceil(weight_lbs / self.payload_lbs - _EPS))
+
+
+@dataclass(frozen=True)
+class TruckLoad:
+    volume_cuft: float
+    weight_lbs: float
+    units: int
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    loads: tuple[TruckLoad, ...]
+    lower_bound: int
+    # "volume" or "weight": which capacity the move as a whole uses more of.
+    binding: str
+
+    @property
+    def trucks(self) -> int:
+        return len(self.loads)
+
+    def as_dicts(self) -> list[dict]:
+        return [
+            {"volume_cuft": round(load.volume_cuft, 2), "weight_lbs": round(load.weight_lbs, 2), "units": load.units}
+            for load in self.loads
+        ]
+
+
+EMPTY_PLAN = LoadPlan(loads=(), lower_bound=0, binding="weight")
+
+
+def _fits(room_v: float, room_w: float, volume: float, weight: float) -> float:
+    """How many units of (volume, weight) fit in the room left (``inf`` for weightless, empty units)."""
+    by_volume = math.floor((room_v + _EPS) / volume) if volume > 0 else math.inf
+    by_weight = math.floor((room_w + _EPS) / weight) if weight > 0 else math.inf
+    return min(by_volume, by_weight)
+
+
+def _first_fit(groups: list[tuple[tuple[float, float], int]], cap_v: float, cap_w: float) -> list[list]:
+    # Smallest volume and weight still to come after each group, to retire full trucks.
+    min_v = [math.inf] * (len(groups) + 1)
+    min_w = [math.inf] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        (volume, weight), _ = groups[i]
+        min_v[i] = min(min_v[i + 1], volume)
+        min_w[i] = min(min_w[i + 1], weight)
+
+    loads: list[list] = []  # [volume, weight, units] per truck, in opening order
+    open_loads: list[list] = []
+    for i, ((volume, weight), quantity) in enumerate(groups):
+        for load in open_loads:
+            room_v, room_w = cap_v - load[0], cap_w - load[1]
+            if room_v + _EPS < volume or room_w + _EPS < weight:
+                continue
+            placed = min(quantity, _fits(room_v, room_w, volume, weight))
+            load[0] += volume * placed
+            load[1] += weight * placed
+            load[2] += placed
+            quantity -= placed
+            if not quantity:
+                break
+        per_truck = _fits(cap_v, cap_w, volume, weight)
+        while quantity:
+            placed = min(quantity, per_truck)
+            load = [volume * placed, weight * placed, placed]
+            loads.append(load)
+            open_loads.append(load)
+            quantity -= placed
+        open_loads = [
+            load for load in open_loads
+            if cap_v - load[0] + _EPS >= min_v[i + 1] and cap_w - load[1] + _EPS >= min_w[i + 1]
+        ]
+    return loads
+
+
+def plan_loads(lines: Iterable[tuple[float, float, int]], truck: TruckModel | None = None) -> LoadPlan:
+    """Pack ``(volume_each, weight_each, quantity)`` lines into trucks.
+
+    A unit bigger than a whole truck on its own (a camper on a small fleet)
+    is given as many trucks as its size needs, split evenly across them.
+    """
+    truck = truck or TruckModel.from_settings()
+    cap_v, cap_w = truck.usable_cuft, truck.payload_lbs
+    groups: dict[tuple[float, float], int] = {}
+    for volume, weight, quantity in lines:
+        if quantity > 0 and (volume > 0 or weight > 0):
+            groups[(volume, weight)] = groups.get((volume, weight), 0) + quantity
+    if not groups:
+        return EMPTY_PLAN
+
+    total_v = sum(volume * quantity for (volume, _), quantity in groups.items())
+    total_w = sum(weight * quantity for (_, weight), quantity in groups.items())
+    binding = "volume" if total_v / cap_v > total_w / cap_w else "weight"
+
+    oversize: list[TruckLoad] = []
+    for (volume, weight), quantity in list(groups.items()):
+        if volume > cap_v + _EPS or weight > cap_w + _EPS:
+            del groups[(volume, weight)]
+            share = max(math.ceil(volume / cap_v), math.ceil(weight / cap_w))
+            for _ in range(quantity):
+                oversize.append(TruckLoad(volume / share, weight / share, 1))
+                oversize.extend([TruckLoad(volume / share, weight / share, 0)] * (share - 1))
+
+    lower = truck.lower_bound(total_w, total_v)
+    best: list[list] | None = None
+    if groups:
+        for size_key in (
+            lambda size: max(size[0] / cap_v, size[1] / cap_w),
+            lambda size: size[0] / cap_v + size[1] / cap_w,
+            lambda size: size,
+        ):
+            ordered = sorted(groups.items(), key=lambda group: size_key(group[0]), reverse=True)
+            loads = _first_fit(ordered, cap_v, cap_w)
+            if best is None or len(loads) < len(best):
+                best = loads
+            if len(best) + len(oversize) <= lower:
+                break
+    return LoadPlan(
+        loads=tuple(oversize) + tuple(TruckLoad(v, w, units) for v, w, units in best or ()),
+        lower_bound=lower,
+        binding=binding,
+    )
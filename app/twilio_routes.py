@@ -1,37 +1,126 @@
+"""Twilio voice webhooks.
+
+Both endpoints sit between the caller's ring and the greeting, so their
+TwiML is rendered once per ``VoiceProfile`` and served as cached bytes. A
+profile is the per-number branding (company name, voice, forward number):
+the defaults come from settings, and numbers listed under ``COMPANIES`` in
+the secrets get their own, looked up by the webhook's ``To`` field.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+from urllib.parse import parse_qsl
+from xml.sax.saxutils import escape, quoteattr
+
 from fastapi import APIRouter, Request
 from fastapi.responses import Response
+
 from .config import settings
 
 router = APIRouter(prefix="/voice", tags=["voice"])
 
-@router.post("/incoming")
-async def incoming_call(_: Request):
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+# Sent by ws_handler in the ConversationRelay "end" message.
+LIVE_AGENT_REASON = "live-agent-handoff"
+
+_GOODBYE_TWIML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Response><Say>Thanks for calling. Goodbye!</Say></Response>"""
+
+
+@dataclass(frozen=True)
+class VoiceProfile:
+    company_name: str | None
+    voice_id: str | None
+    forward_number: str | None
+
+
+@dataclass(frozen=True)
+class HandoffData:
+    reason_code: str | None
+    payload: dict
+
+
+@lru_cache(maxsize=1)
+def _default_profile() -> VoiceProfile:
+    return VoiceProfile(settings.COMPANY_NAME, settings.ELEVENLABS_VOICE_ID, settings.TWILIO_FORWARD_NUMBER)
+
+
+@lru_cache(maxsize=256)
+def profile_for(to_number: str | None) -> VoiceProfile:
+    default = _default_profile()
+    company = settings.COMPANIES.get(to_number) if to_number else None
+    if not company:
+        return default
+    return VoiceProfile(
+        company.get("COMPANY_NAME", default.company_name),
+        company.get("ELEVENLABS_VOICE_ID", default.voice_id),
+        company.get("TWILIO_FORWARD_NUMBER", default.forward_number),
+    )
+
+
+@lru_cache(maxsize=256)
+def incoming_twiml(profile: VoiceProfile) -> bytes:
+    greeting = f"Hi, thanks for calling {profile.company_name}. How can I help with your move today?"
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
-  <Connect action="{settings.BASE_URL}/voice/after">
+  <Connect action={quoteattr(f"{settings.BASE_URL}/voice/after")}>
     <ConversationRelay
-      url="{settings.WS_URL}"
+      url={quoteattr(settings.WS_URL)}
       ttsProvider="ElevenLabs"
-      voice="{settings.ELEVENLABS_VOICE_ID}"
+      voice={quoteattr(profile.voice_id or "")}
       language="en-US"
       interruptible="speech"
       reportInputDuringAgentSpeech="speech"
-      welcomeGreeting="Hi, thanks for calling {settings.COMPANY_NAME}. How can I help with your move today?" />
+      welcomeGreeting={quoteattr(greeting)} />
   </Connect>
-</Response>"""
-    return Response(content=xml, media_type="text/xml")
+</Response>""".encode()
 
-@router.post("/after")
-async def after_connect(request: Request):
-    form = await request.form()
-    handoff = form.get("HandoffData", "")
-    if "live-agent" in handoff:
-        xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+
+@lru_cache(maxsize=256)
+def handoff_twiml(profile: VoiceProfile) -> bytes:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
   <Say>Connecting you to a specialist now.</Say>
-  <Dial>{settings.TWILIO_FORWARD_NUMBER}</Dial>
-</Response>"""
-    else:
-        xml = """<?xml version="1.0" encoding="UTF-8"?>
-<Response><Say>Thanks for calling. Goodbye!</Say></Response>"""
-    return Response(content=xml, media_type="text/xml")
+  <Dial>{escape(profile.forward_number or "")}</Dial>
+</Response>""".encode()
+
+
+def parse_handoff(raw: str | None) -> HandoffData:
+    """Decode the ``HandoffData`` JSON string Twilio echoes back from the "end" message."""
+    if not raw:
+        return HandoffData(None, {})
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return HandoffData(None, {})
+    if not isinstance(payload, dict):
+        return HandoffData(None, {})
+    reason = payload.get("reasonCode")
+    return HandoffData(reason if isinstance(reason, str) else None, payload)
+
+
+async def _form(request: Request) -> dict[str, str]:
+    # Twilio always posts urlencoded forms; parse_qsl skips the multipart machinery.
+    return dict(parse_qsl((await request.body()).decode("utf-8", "replace")))
+
+
+def _xml(body: bytes) -> Response:
+    return Response(content=body, media_type="text/xml")
+
+
+@router.post("/incoming")
+async def incoming_call(request: Request):
+    if not settings.COMPANIES:
+        return _xml(incoming_twiml(_default_profile()))
+    form = await _form(request)
+    return _xml(incoming_twiml(profile_for(form.get("To"))))
+
+
+@router.post("/after")
+async def after_connect(request: Request):
+    form = await _form(request)
+    handoff = parse_handoff(form.get("HandoffData"))
+    if handoff.reason_code == LIVE_AGENT_REASON:
+        return _xml(handoff_twiml(profile_for(form.get("To"))))
+    return _xml(_GOODBYE_TWIML)
@@ -1 +1,76 @@
-# Utility helpers can be added here
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TTLCache:
+    """Bounded LRU whose entries also expire ``ttl`` seconds after being stored.
+
+    ``get_or_compute`` is safe under concurrent callers on one event loop:
+    requests for a key that is already being computed wait for that result
+    instead of computing it again, and a cancelled caller leaves the
+    computation running for the rest.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        # The computation is its own task, and every caller (the first one too) awaits it
+        # through a shield: a caller that disconnects does not cancel it for the others.
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        # Runs before any awaiting caller resumes, so they find the value cached.
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # exception() also marks a failure retrieved, so one nobody awaited is not logged again.
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
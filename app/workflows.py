@@ -1,27 +1,30 @@
-from .db import SessionLocal
-from .models import Appointment, Order
+from datetime import date
+
+from .db import AsyncSessionLocal
+from .metrics import timed
+from .order_lookup import find_order
+from .pricing import pricing_rules
 from .quotes import compute_quote, MoveSpec, BoxOrder
-from .furniture_catalog import LocationProfile
-
-
-def create_appointment(**kwargs) -> int:
-    with SessionLocal() as db:
-        appt = Appointment(**kwargs)
-        db.add(appt)
-        db.commit()
-        db.refresh(appt)
-        return appt.id
-
-def get_order_status(ref: str | None, name: str | None, phone: str | None) -> str:
-    with SessionLocal() as db:
-        q = db.query(Order)
-        if ref:
-            q = q.filter(Order.ext_ref == ref)
-        elif phone:
-            q = q.filter(Order.notes.contains(phone))
-        elif name:
-            q = q.filter(Order.customer_name.ilike(f"%{name}%"))
-        row = q.first()
+from .scheduling import DEFAULT_JOB, JobSize, parse_start, scheduler
+from .furniture_catalog import LocationProfile, summarize_order
+from .geo import Route
+
+
+@timed("db_create_appointment")
+async def create_appointment(*, job: JobSize | None = None, **kwargs) -> int:
+    """Book a move, holding ``job``'s movers and trucks (``DEFAULT_JOB`` when unsized).
+
+    Raises ``SlotUnavailable`` when the crew or fleet is already committed then.
+    """
+    start = parse_start(kwargs["datetime_iso"])
+    return await scheduler.reserve(start, job or DEFAULT_JOB, **kwargs)
+
+@timed("db_order_status")
+async def get_order_status(
+    ref: str | None, name: str | None, phone: str | None, email: str | None = None
+) -> str:
+    async with AsyncSessionLocal() as db:
+        row = await find_order(db, ref=ref, name=name, phone=phone, email=email)
         if not row:
             return "I couldn't locate that order yet. Could you repeat the reference or name on the order?"
         msg = f"Order {row.ext_ref or row.id} for {row.customer_name} is '{row.status}'. ETA {row.eta or 'TBD'}."
@@ -31,12 +34,39 @@ def _approx_weight_from_rooms(rooms: int) -> float:
     # Conservative default: ~1,500 lbs per room.
     return max(rooms, 1) * 1500.0
 
-def estimate_from_strings(miles: float, rooms: int, stairs: bool, piano: bool, weekend: bool) -> dict:
-    weight_estimate = _approx_weight_from_rooms(rooms)
+def _is_intrastate(miles: float) -> bool:
+    return miles > 30
+
+def _drive_minutes(miles: float) -> float:
+    return max(20.0, miles * 1.5)
+
+@timed("quote_estimate")
+def estimate_from_strings(
+    miles: float,
+    rooms: int,
+    stairs: bool,
+    piano: bool,
+    weekend: bool,
+    route: Route | None = None,
+    weight_lbs: float | None = None,
+    trucks: int | None = None,
+) -> dict:
+    """Quote from the caller's answers; a ``route`` (``geo.route_for``) replaces the miles guess
+    when it has a distance of its own (``Route.has_distance``).
+
+    ``weight_lbs`` and ``trucks`` (the call's ``InventorySession``) replace the per-room guess.
+    """
+    weight_estimate = weight_lbs or _approx_weight_from_rooms(rooms)
     profile = LocationProfile.HEAVY_STAIRS if stairs else LocationProfile.MULTI_FLOOR
-    is_intrastate = miles > 30
+    if route is not None and not route.has_distance and miles:
+        route = None
+    if route is not None:
+        miles = route.loaded_miles
+    is_intrastate = _is_intrastate(miles)
 
-    origin_to_dest_minutes = max(20.0, miles * 1.5)
+    drive_fields = route.spec_fields() if route is not None else {
+        "origin_to_destination_minutes": _drive_minutes(miles),
+    }
 
     box_order = BoxOrder()
     if piano:
@@ -49,6 +79,48 @@ def estimate_from_strings(miles: float, rooms: int, stairs: bool, piano: bool, w
         location_profile=profile,
         friday_or_saturday=weekend,
         is_intrastate=is_intrastate,
-        origin_to_destination_minutes=origin_to_dest_minutes,
+        truck_override=trucks,
+        **drive_fields,
+    )
+    return compute_quote(spec, pricing_rules.current())
+
+@timed("quote_ballpark")
+def ballpark_from_strings(
+    miles: float, rooms: int, stairs: bool, weekend: bool, weight_lbs: float | None = None
+) -> dict | None:
+    """``estimate_from_strings`` from the precomputed surface, or ``None`` outside it."""
+    from .quote_surface import ballpark  # numpy; built off the import path
+
+    profile = LocationProfile.HEAVY_STAIRS if stairs else LocationProfile.MULTI_FLOOR
+    return ballpark(
+        weight_lbs or _approx_weight_from_rooms(rooms), profile, weekend, _is_intrastate(miles), _drive_minutes(miles)
+    )
+
+@timed("quote_estimate_inventory")
+def estimate_from_inventory(
+    items: dict[str, int],
+    distance_miles: float,
+    move_date: date,
+    profile: str = LocationProfile.MULTI_FLOOR,
+) -> dict:
+    """Quote a move from a caller's itemized inventory (the ``/estimate`` tool)."""
+    inventory = summarize_order(items, profile)
+    weekend = move_date.weekday() in (4, 5)  # Friday and Saturday rates
+    spec = MoveSpec(
+        total_weight_lbs=inventory["total_weight_lbs"],
+        location_profile=profile,
+        friday_or_saturday=weekend,
+        is_intrastate=_is_intrastate(distance_miles),
+        origin_to_destination_minutes=_drive_minutes(distance_miles),
+        truck_override=inventory["trucks_needed"],
     )
-    return compute_quote(spec)
+    quote = compute_quote(spec, pricing_rules.current())
+    return {
+        "estimate_price": quote["subtotal"],
+        "currency": "USD",
+        "move_date": move_date.isoformat(),
+        "friday_or_saturday": weekend,
+        "distance_miles": distance_miles,
+        "inventory": inventory,
+        "quote": quote,
+    }
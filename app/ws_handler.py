@@ -1,26 +1,119 @@
+import asyncio
 import json
+import logging
+import time
+from contextlib import suppress
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from .ai import stream_completion
-from .db import SessionLocal
-from .models import ConversationLog
+from .ai import astream_completion
+from .config import settings
+from .intents import Intent, classify
+from .inventory import InventorySession
+from .metrics import VOICE_TURNS, observe, timed
 from .quotes import compute_quote, MoveSpec
+from .relay_output import SpeechChunker, dumps, text_frame
+from .sessions import ConversationState, session_store
+from .tools import ToolSession
+from .tracing import bind
+from .transcripts import transcript_writer
+from .twilio_routes import LIVE_AGENT_REASON
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def _append_log(db, session_id, call_sid, from_number, to_number, role, text):
-    rec = db.query(ConversationLog).filter_by(session_id=session_id).first()
-    if not rec:
-        rec = ConversationLog(session_id=session_id, call_sid=call_sid,
-                              from_number=from_number, to_number=to_number, transcript=[])
-        db.add(rec)
-    rec.transcript.append({"role": role, "text": text})
-    db.commit()
+# Spoken when the LLM request fails mid-turn, so the caller is not left in silence.
+FALLBACK_REPLY = "Sorry, I'm having trouble on my end. Could you say that again?"
+
+CANNED_REPLIES = {
+    Intent.SCHEDULE: "Sure, let’s schedule your move. What date and time work best, and from where to where?",
+    Intent.QUOTE: "I can estimate that. How many miles, how many rooms, any stairs or special items like a piano, and is it a weekend move?",
+    Intent.STATUS: "I can check your order. What’s the order number or name and phone on the order?",
+}
+
+def _has_details(text: str) -> bool:
+    """Whether the caller already gave something a workflow tool can act on."""
+    return any(ch.isdigit() for ch in text) or "@" in text
+
+async def _cancel(task: asyncio.Task | None) -> None:
+    if task is None or task.done():
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
 
 @router.websocket("/voice/ws")
 async def ws(websocket: WebSocket):
     await websocket.accept()
-    history: list[dict] = []
+    state = ConversationState(session_id="")
     call_sid = session_id = from_number = to_number = None
+    reply: asyncio.Task | None = None
+    heard_before_interrupt: str | None = None
+    tools = ToolSession() if settings.LLM_TOOLS else None
+    inventory_revision = 0
+    turn = 0
+    turn_started = 0.0
+    first_frame_sent = True
+
+    def remember(role: str, text: str) -> None:
+        nonlocal inventory_revision
+        if tools is not None and tools.inventory.revision != inventory_revision:
+            inventory_revision = tools.inventory.revision
+            state.inventory = tools.inventory.to_dict()
+        state.add_turn(role, text)
+        if session_id is not None:
+            session_store().save(state)
+        transcript_writer.append(session_id, call_sid, from_number, to_number, role, text)
+
+    async def send(frame: str) -> None:
+        nonlocal first_frame_sent
+        started = time.perf_counter()
+        await websocket.send_text(frame)
+        now = time.perf_counter()
+        observe("ws_send", now - started)
+        if not first_frame_sent:
+            first_frame_sent = True
+            observe("turn_first_frame", now - turn_started)
+
+    async def send_token(token: str, last: bool=False):
+        await send(text_frame(token, last))
+
+    async def stream_reply(prior: list[dict], user_text: str):
+        nonlocal heard_before_interrupt
+        heard_before_interrupt = None
+        parts: list[str] = []
+        chunker = None
+        if settings.RELAY_COALESCE:
+            chunker = SpeechChunker(send, max_delay=settings.RELAY_FLUSH_MS / 1000)
+        try:
+            async for token in astream_completion(prior, user_text, tools=tools):
+                if chunker is not None:
+                    parts.append(token)
+                    await chunker.push(token)
+                else:
+                    await send_token(token, last=False)
+                    parts.append(token)
+            if chunker is not None:
+                await chunker.finish()
+            else:
+                await send_token("", last=True)
+            observe("turn_total", time.perf_counter() - turn_started)
+        except Exception:
+            # Nothing awaits this task, so an error here would otherwise vanish
+            # and leave the caller without a final frame.
+            logger.exception("reply failed; speaking the fallback line")
+            if chunker is not None:
+                chunker.abort()
+                # Keep only what went out; the buffer abort() dropped was never spoken.
+                parts = list(chunker.sent)
+            with suppress(Exception):
+                await send_token(FALLBACK_REPLY, last=True)
+                parts.append(FALLBACK_REPLY)
+        finally:
+            if chunker is not None:
+                chunker.abort()
+            # On barge-in Twilio reports how much of the answer was actually spoken.
+            text = heard_before_interrupt if heard_before_interrupt is not None else "".join(parts)
+            remember("assistant", text)
 
     try:
         while True:
@@ -32,66 +125,76 @@ async def ws(websocket: WebSocket):
                 call_sid = msg["callSid"]
                 from_number = msg.get("from", "")
                 to_number = msg.get("to", "")
+                bind(call_sid)
+                # A reconnect (possibly to another worker) resumes the call's context.
+                stored = await session_store().load(session_id)
+                if stored is not None:
+                    state = stored
+                else:
+                    state = ConversationState(session_id, call_sid, from_number, to_number, turns=state.turns)
+                if tools is not None:
+                    tools.inventory = InventorySession.from_dict(state.inventory)
+                    inventory_revision = tools.inventory.revision
                 continue
 
             if msg.get("type") == "prompt":
+                turn_started = time.perf_counter()
+                first_frame_sent = False
+                turn += 1
+                # Copied into the reply task, so its logs carry the turn too.
+                bind(f"{call_sid}/{turn}")
+                await _cancel(reply)
                 user_text = msg.get("voicePrompt", "")
-                history.append({"role": "user", "content": user_text})
-                with SessionLocal() as db:
-                    _append_log(db, session_id, call_sid, from_number, to_number, "user", user_text)
-
-                lower = user_text.lower()
-                if "schedule" in lower or "book" in lower or "appointment" in lower:
-                    response_text = "Sure, let’s schedule your move. What date and time work best, and from where to where?"
-                    await websocket.send_text(json.dumps({"type": "text", "token": response_text, "last": True}))
-                    history.append({"role": "assistant", "content": response_text})
-                    with SessionLocal() as db:
-                        _append_log(db, session_id, call_sid, from_number, to_number, "assistant", response_text)
-                    continue
-
-                if "quote" in lower or "estimate" in lower or "price" in lower:
-                    response_text = "I can estimate that. How many miles, how many rooms, any stairs or special items like a piano, and is it a weekend move?"
-                    await websocket.send_text(json.dumps({"type": "text", "token": response_text, "last": True}))
-                    history.append({"role": "assistant", "content": response_text})
-                    with SessionLocal() as db:
-                        _append_log(db, session_id, call_sid, from_number, to_number, "assistant", response_text)
-                    continue
+                prior = state.messages()
+                remember("user", user_text)
 
-                if "status" in lower or "order" in lower or "job" in lower:
-                    response_text = "I can check your order. What’s the order number or name and phone on the order?"
-                    await websocket.send_text(json.dumps({"type": "text", "token": response_text, "last": True}))
-                    history.append({"role": "assistant", "content": response_text})
-                    with SessionLocal() as db:
-                        _append_log(db, session_id, call_sid, from_number, to_number, "assistant", response_text)
+                with timed("intent_classify"):
+                    intent = classify(user_text).label
+                # Canned replies only open a call: classified without context, a later
+                # turn is usually an answer to the last question. With tools, a request
+                # that already carries details (miles, rooms, an order number) is
+                # answered by the LLM in this turn instead.
+                if (
+                    intent in CANNED_REPLIES
+                    and not prior
+                    and not (tools is not None and _has_details(user_text))
+                ):
+                    response_text = CANNED_REPLIES[intent]
+                    await send_token(response_text, last=True)
+                    remember("assistant", response_text)
+                    VOICE_TURNS.inc("canned")
                     continue
 
-                if "human" in lower or "agent" in lower or "representative" in lower:
-                    await websocket.send_text(json.dumps({
+                if intent == Intent.HANDOFF:
+                    await websocket.send_text(dumps({
                         "type": "end",
-                        "handoffData": "{\"reasonCode\":\"live-agent-handoff\"}"
+                        "handoffData": json.dumps({"reasonCode": LIVE_AGENT_REASON}),
                     }))
+                    VOICE_TURNS.inc("handoff")
                     break
 
-                buffer = ""
-                async def send_token(token: str, last: bool=False):
-                    await websocket.send_text(json.dumps({"type": "text", "token": token, "last": last}))
-
-                for token in stream_completion(history, user_text):
-                    buffer += token
-                    await send_token(token, last=False)
-
-                await send_token("", last=True)
-                history.append({"role": "assistant", "content": buffer})
-                with SessionLocal() as db:
-                    _append_log(db, session_id, call_sid, from_number, to_number, "assistant", buffer)
+                # Stream in a task so the receive loop keeps reading and can
+                # cancel the answer when the caller interrupts.
+                reply = asyncio.create_task(stream_reply(prior, user_text))
+                VOICE_TURNS.inc("llm")
 
             elif msg.get("type") == "interrupt":
-                continue
+                heard = msg.get("utteranceUntilInterrupt", "")
+                if reply is not None and not reply.done():
+                    heard_before_interrupt = heard
+                    await _cancel(reply)
+                elif state.turns and state.turns[-1]["role"] == "assistant":
+                    # Fully streamed, but cut off while still being spoken.
+                    state.turns[-1] = {"role": "assistant", "content": heard}
+                    if session_id is not None:
+                        session_store().save(state)
 
     except WebSocketDisconnect:
         pass
     finally:
+        await _cancel(reply)
+        await transcript_writer.end_call(session_id)
         try:
-            await websocket.send_text(json.dumps({"type": "end"}))
+            await websocket.send_text(dumps({"type": "end"}))
         except Exception:
             pass
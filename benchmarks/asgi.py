@@ -0,0 +1,62 @@
+"""Drive an ASGI app in-process, with no HTTP client or sockets involved."""
+from __future__ import annotations
+
+import json
+from urllib.parse import urlencode
+
+
+async def request(
+    app,
+    method: str,
+    path: str,
+    *,
+    json_body=None,
+    form: dict | None = None,
+    headers: dict[str, str] | None = None,
+) -> tuple[int, bytes]:
+    body = b""
+    header_list = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        header_list.append((b"content-type", b"application/json"))
+    elif form is not None:
+        body = urlencode(form).encode()
+        header_list.append((b"content-type", b"application/x-www-form-urlencoded"))
+    header_list.append((b"content-length", str(len(body)).encode()))
+    path, _, query = path.partition("?")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": header_list,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 0
+    chunks: list[bytes] = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
@@ -0,0 +1,90 @@
+"""Per-lookup latency of ``find_best_item`` against the legacy difflib scan,
+plus whole-order resolution through the ``resolve_items`` cache.
+
+Run from the repository root::
+
+    python -m benchmarks.catalog_match
+"""
+from __future__ import annotations
+
+import difflib
+import random
+import time
+
+from app.furniture_catalog import (
+    CatalogItem,
+    _catalog,
+    _resolve_normalized,
+    find_best_item,
+    resolve_cache_info,
+    total_weight,
+)
+
+
+def legacy_find_best_item(query: str) -> tuple[CatalogItem, float]:
+    key = query.strip().lower()
+    items = _catalog()
+    if key in items:
+        return items[key], 1.0
+    match_key = difflib.get_close_matches(key, items.keys(), n=1, cutoff=0.0)[0]
+    return items[match_key], difflib.SequenceMatcher(None, key, match_key).ratio()
+
+
+def sample_queries(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    keys = list(_catalog())
+    spoken = ["king mattress", "couch", "fridge", "bar stool", "box 1.5", "washer", "tredmill"]
+    queries: list[str] = []
+    while len(queries) < count:
+        key = rng.choice(keys)
+        variant = rng.randrange(4)
+        if variant == 0:
+            chars = list(key)
+            del chars[rng.randrange(len(chars))]
+            queries.append("".join(chars))
+        elif variant == 1:
+            queries.append(key.replace(" - ", "_").replace(" ", "_"))
+        elif variant == 2:
+            queries.append(" ".join(key.split()[:2]))
+        else:
+            queries.append(rng.choice(spoken))
+    return queries
+
+
+def _time_per_lookup(fn, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(count: int = 2000) -> None:
+    queries = sample_queries(count)
+    find_best_item(queries[0])  # build the catalog and index outside the timer
+
+    legacy = _time_per_lookup(legacy_find_best_item, queries)
+    indexed = _time_per_lookup(find_best_item, queries)
+    same = sum(
+        legacy_find_best_item(q)[0] == find_best_item(q)[0] for q in queries
+    )
+
+    print(f"queries:          {count}")
+    print(f"legacy difflib:   {legacy * 1e6:8.1f} us/lookup")
+    print(f"indexed matcher:  {indexed * 1e6:8.1f} us/lookup")
+    print(f"speedup:          {legacy / indexed:8.1f}x")
+    print(f"same item chosen: {same / count:8.1%}")
+
+    order = {query: 1 for query in queries[:40]}
+    _resolve_normalized.cache_clear()
+    start = time.perf_counter()
+    total_weight(order)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    total_weight(order)
+    warm = time.perf_counter() - start
+    print(f"40-item order:    {cold * 1e3:8.2f} ms cold, {warm * 1e3:.3f} ms warm")
+    print(f"resolve cache:    {resolve_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
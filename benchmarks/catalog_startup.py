@@ -0,0 +1,40 @@
+"""Catalog startup cost: parsing CATALOG_TSV and indexing it vs loading app/catalog.bin.
+
+Build the artifact first, then run from the repository root::
+
+    python -m app.catalog_artifact
+    python -m benchmarks.catalog_startup
+"""
+from __future__ import annotations
+
+import time
+
+from app.catalog_artifact import ARTIFACT_PATH, load_artifact
+from app.furniture_catalog import _build_match_index, _parse_catalog_tsv
+
+
+def _best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeats: int = 50) -> None:
+    if load_artifact() is None:
+        raise SystemExit(f"{ARTIFACT_PATH} is missing or stale; run python -m app.catalog_artifact")
+
+    parse = _best_of(_parse_catalog_tsv, repeats)
+    parse_and_index = _best_of(lambda: _build_match_index(_parse_catalog_tsv()), repeats)
+    artifact = _best_of(load_artifact, repeats)
+
+    print(f"TSV parse:            {parse * 1e3:7.2f} ms")
+    print(f"TSV parse + index:    {parse_and_index * 1e3:7.2f} ms")
+    print(f"artifact load:        {artifact * 1e3:7.2f} ms")
+    print(f"speedup (with index): {parse_and_index / artifact:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
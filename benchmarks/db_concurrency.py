@@ -0,0 +1,96 @@
+"""Throughput of concurrent POST /orders/email against SQLite.
+
+Fires ``--concurrency`` requests at a time through the app in-process and
+reports requests per second and per-request latency. ``--sync`` runs the same
+load against a copy of the old handler (blocking ``Session`` in FastAPI's
+threadpool) for comparison.
+
+    python -m benchmarks.db_concurrency --concurrency 1 10 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.asgi import request
+from benchmarks.local_env import configure
+
+BODY = {
+    "phone": "+15555550100",
+    "item_details": "1 couch, 2 dressers, 1 king bed",
+    "estimate_price": 1234.5,
+    "move_date": "2025-07-08",
+    "locations": "12 Oak St to 40 Elm Ave",
+    "estimate_calculation_table": "movers 2 x 4h",
+    "name": "Pat Example",
+    "stairwells": "none",
+    "email": "pat@example.com",
+}
+
+
+def _sync_app():
+    """The pre-async handler, mounted on its own app."""
+    from uuid import uuid4
+
+    from fastapi import FastAPI
+
+    from app.db import SessionLocal
+    from app.models import Order
+    from app.order_routes import OrderEmailPayload
+
+    app = FastAPI()
+
+    @app.post("/orders/email")
+    def record_order_email(payload: OrderEmailPayload) -> dict:
+        ext_ref = f"ORD-{uuid4().hex[:8].upper()}"
+        with SessionLocal() as db:
+            db.add(Order(ext_ref=ext_ref, customer_name=payload.name, status="new lead",
+                         eta=payload.move_date, notes=payload.item_details))
+            db.commit()
+        return {"status": "received", "order_ref": ext_ref}
+
+    return app
+
+
+async def _timed(app) -> float:
+    start = time.perf_counter()
+    status, _ = await request(app, "POST", "/orders/email", json_body=BODY)
+    assert status == 200, status
+    return time.perf_counter() - start
+
+
+async def run(app, concurrency: int, total: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    start = time.perf_counter()
+    for _ in range(0, total, concurrency):
+        latencies.extend(await asyncio.gather(*(_timed(app) for _ in range(concurrency))))
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+async def main(levels: list[int], total: int, sync: bool) -> None:
+    from app.db import dispose_engines, init_db
+    from app.main import app
+
+    init_db()
+    apps = [("async", app)] + ([("sync", _sync_app())] if sync else [])
+    for name, target in apps:
+        await run(target, 10, 50)  # warm the pool and the route
+        for concurrency in levels:
+            throughput, latencies = await run(target, concurrency, max(total, concurrency))
+            latencies.sort()
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(
+                f"{name:5}  concurrency {concurrency:3}  {throughput:7.0f} req/s  "
+                f"p50 {statistics.median(latencies) * 1e3:6.2f} ms  p95 {p95 * 1e3:6.2f} ms"
+            )
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--sync", action="store_true", help="also run the blocking baseline")
+    args = parser.parse_args()
+    configure()
+    asyncio.run(main(args.concurrency, args.requests, args.sync))
@@ -0,0 +1,93 @@
+"""SES client reuse and the background email queue, against a stubbed SES.
+
+No AWS access is needed: calls go to a real botocore SES client wrapped in a
+``Stubber``, which validates every request against the SES API model, and a
+``before-parameter-build`` hook adds ``--latency`` seconds to each call to
+stand in for the network. One bulk call is answered with a throttling error
+to exercise the retry path.
+
+    python -m benchmarks.email_queue
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.local_env import configure
+
+
+def _stubbed_client(latency: float, bulk_calls: int, raw_calls: int):
+    import boto3
+    from botocore.stub import Stubber
+
+    client = boto3.session.Session(
+        aws_access_key_id="bench", aws_secret_access_key="bench", region_name="us-east-1"
+    ).client("ses")
+    stubber = Stubber(client)
+    stubber.add_client_error("send_bulk_templated_email", service_error_code="Throttling", http_status_code=400)
+    for i in range(bulk_calls):
+        statuses = [{"Status": "Success", "MessageId": f"bulk-{i}-{j}"} for j in range(50)]
+        stubber.add_response("send_bulk_templated_email", {"Status": statuses})
+    for i in range(raw_calls):
+        stubber.add_response("send_email", {"MessageId": f"raw-{i}"})
+
+    def network(**_) -> None:
+        time.sleep(latency)
+
+    client.meta.events.register("before-parameter-build.ses", network)
+    stubber.activate()
+    return client, stubber
+
+
+async def run(concurrency: int, templated: int, raw: int, latency: float) -> None:
+    from app.emailer import EmailQueue
+
+    client, stubber = _stubbed_client(latency, templated // 50, raw)
+    queue = EmailQueue(lambda: client, concurrency=concurrency, base_delay=0.05)
+
+    start = time.perf_counter()
+    for i in range(templated):
+        queue.enqueue_templated(f"lead{i}@example.com", "MoveQuote", {"name": f"Lead {i}", "price": 1000 + i})
+    enqueue = (time.perf_counter() - start) / templated
+    await queue.drain()
+    # Raw sends go second: a Stubber answers calls strictly in the order it was primed.
+    for i in range(raw):
+        queue.enqueue(f"ops{i}@example.com", "New lead", "<p>New lead</p>")
+    await queue.stop()
+    total = time.perf_counter() - start
+    stubber.assert_no_pending_responses()
+
+    print(
+        f"concurrency {concurrency}: {templated + raw} emails in {queue.api_calls} calls, "
+        f"sent {queue.sent} failed {queue.failed}, {enqueue * 1e6:.1f} us per enqueue, "
+        f"all sent in {total * 1e3:.0f} ms"
+    )
+
+
+def client_setup(rounds: int) -> None:
+    from app.emailer import _get_ses_client
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _get_ses_client.__wrapped__()
+    fresh = (time.perf_counter() - start) / rounds
+
+    _get_ses_client()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _get_ses_client()
+    cached = (time.perf_counter() - start) / rounds
+    print(f"SES client per call: new {fresh * 1e3:7.2f} ms  cached {cached * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--templated", type=int, default=1000, help="multiple of 50")
+    parser.add_argument("--raw", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.04)
+    args = parser.parse_args()
+    configure()
+    client_setup(20)
+    for concurrency in (1, 4):
+        asyncio.run(run(concurrency, args.templated, args.raw, args.latency))
@@ -0,0 +1,58 @@
+"""Cold and warm latency of POST /estimate, called in-process through ASGI.
+
+Cold requests use a fresh inventory and distance each time (catalog match
+cache cleared); warm requests repeat one body, so they are served from the
+estimate cache. A final burst fires identical requests concurrently to show
+they collapse into a single computation.
+
+    python -m benchmarks.estimate_endpoint
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+
+from benchmarks.asgi import request
+from benchmarks.local_env import configure
+
+BODY = {
+    "items": {"bed_king_mattress": 1, "bar_stool": 4, "couch": 1, "dresser": 2, "fridge": 1},
+    "distance_miles": 15,
+    "move_date": "2025-07-08",
+}
+
+
+async def main(rounds: int = 200) -> None:
+    from app.estimate_routes import _estimate_cache
+    from app.furniture_catalog import _resolve_normalized
+    from app.main import app
+
+    cold: list[float] = []
+    for i in range(rounds):
+        _resolve_normalized.cache_clear()
+        body = dict(BODY, distance_miles=BODY["distance_miles"] + i)
+        start = time.perf_counter()
+        status, _ = await request(app, "POST", "/estimate", json_body=body)
+        cold.append(time.perf_counter() - start)
+        assert status == 200, status
+
+    warm: list[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await request(app, "POST", "/estimate", json_body=BODY)
+        warm.append(time.perf_counter() - start)
+
+    _estimate_cache.clear()
+    misses = _estimate_cache.misses
+    burst = dict(BODY, distance_miles=999)
+    await asyncio.gather(*(request(app, "POST", "/estimate", json_body=burst) for _ in range(50)))
+
+    print(f"cold  p50 {statistics.median(cold) * 1e3:6.2f} ms  max {max(cold) * 1e3:6.2f} ms")
+    print(f"warm  p50 {statistics.median(warm) * 1e3:6.2f} ms  max {max(warm) * 1e3:6.2f} ms")
+    print(f"50 concurrent identical requests -> {_estimate_cache.misses - misses} computation(s)")
+
+
+if __name__ == "__main__":
+    configure()
+    asyncio.run(main())
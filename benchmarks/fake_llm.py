@@ -0,0 +1,150 @@
+"""A local stand-in for the OpenAI chat completions streaming API.
+
+Speaks just enough HTTP/1.1 and server-sent events for the ``openai``
+client: ``POST /v1/chat/completions`` with ``stream=true`` answers with a
+fixed reply, split into tokens, after a configurable time-to-first-token and
+inter-token delay. With ``tool_call`` set, a request that offers tools is
+answered with that function call instead, and the follow-up request
+carrying the tool result gets ``tool_reply`` formatted with the result's
+fields. Run standalone with ``python -m benchmarks.fake_llm``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+REPLY = (
+    "Happy to help with that. Our crews wrap every piece of furniture in pads, "
+    "and basic valuation coverage is included with every move. Would you like "
+    "to hear about full value protection as well?"
+)
+
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        first_token_delay: float = 0.25,
+        token_delay: float = 0.01,
+        reply: str = REPLY,
+        tool_call: tuple[str, dict] | None = None,
+        tool_reply: str = "",
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tokens = [word + " " for word in reply.split()]
+        self.tool_call = tool_call
+        self.tool_reply = tool_reply
+        self.tool_results: list[dict] = []
+        self.requests = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.base_events.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n"):
+                name, _, value = line.partition(":")
+                if name.lower() == "content-length":
+                    length = int(value.strip())
+            body = json.loads(await reader.readexactly(length)) if length else {}
+            self.requests += 1
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            await writer.drain()
+            await asyncio.sleep(self.first_token_delay)
+            created = int(time.time())
+            for index, delta in enumerate(self._deltas(body)):
+                if index:
+                    await asyncio.sleep(self.token_delay)
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                }
+                writer.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                await writer.drain()
+            writer.write(b"data: [DONE]\n\n")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _deltas(self, body: dict) -> list[dict]:
+        messages = body.get("messages") or [{}]
+        if self.tool_call is not None and messages[-1].get("role") == "tool":
+            result = json.loads(messages[-1]["content"])
+            self.tool_results.append(result)
+            return [{"content": word + " "} for word in self.tool_reply.format(**result).split()]
+        if self.tool_call is not None and body.get("tools"):
+            name, arguments = self.tool_call
+            encoded = json.dumps(arguments)
+            half = len(encoded) // 2
+            return [
+                {"tool_calls": [{"index": 0, "id": "call_fake", "type": "function",
+                                 "function": {"name": name, "arguments": encoded[:half]}}]},
+                {"tool_calls": [{"index": 0, "function": {"arguments": encoded[half:]}}]},
+            ]
+        return [{"content": token} for token in self.tokens]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> "FakeLLMServer":
+        """Serve from a private event loop so it never competes with the code under test."""
+        ready = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-llm", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+
+async def _serve_forever(port: int) -> None:
+    server = FakeLLMServer(port=port)
+    await server.start()
+    print(f"fake LLM listening on {server.base_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_serve_forever(8901))
@@ -0,0 +1,102 @@
+"""Offline location lookups, drive times and stop ordering (``app.geo``).
+
+Reports lookups per second for:
+
+* ``locate`` on address strings, first sight and repeated;
+* ``drive`` between random pairs of places, cold and memoized;
+* ``plan_route`` for moves with 1 to ``--max-stops`` intermediate stops.
+  The local-search heuristic is also compared with the exhaustive order,
+  to show how far it lands from the shortest route.
+
+    python -m benchmarks.geo_lookup --pairs 20000 --max-stops 9
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from benchmarks.local_env import configure
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:12,.0f}/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--max-stops", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    configure()
+    from app import geo
+
+    rng = random.Random(args.seed)
+    by_city_state, _ = geo._city_index()
+    places = list(by_city_state.values())
+    addresses = [f"{rng.randrange(1, 9999)} Main St, {place.name}" for place in places for _ in range(20)]
+
+    started = time.perf_counter()
+    for address in addresses:
+        geo.locate(address)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for address in addresses:
+        geo.locate(address)
+    warm = time.perf_counter() - started
+    print(f"locate ({len(addresses)} addresses)   first {_rate(len(addresses), cold)}   repeat {_rate(len(addresses), warm)}")
+
+    # Random points around the bundled cities, so cold lookups really miss the cache.
+    points = [
+        geo.Place(f"p{i}", place.lat + rng.uniform(-0.3, 0.3), place.lon + rng.uniform(-0.3, 0.3))
+        for i, place in enumerate(rng.choice(places) for _ in range(2000))
+    ]
+    pairs = [(rng.choice(points), rng.choice(points)) for _ in range(args.pairs)]
+    geo._drive_between.cache_clear()
+    started = time.perf_counter()
+    for a, b in pairs:
+        geo.drive(a, b)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for a, b in pairs:
+        geo.drive(a, b)
+    warm = time.perf_counter() - started
+    print(f"drive  ({args.pairs} pairs)       cold  {_rate(args.pairs, cold)}   memoized {_rate(args.pairs, warm)}")
+
+    print("plan_route (origin, destination and N stops within one region):")
+    for stops in range(1, args.max_stops + 1):
+        routes = []
+        for _ in range(args.routes):
+            center = rng.choice(places)
+            routes.append([
+                geo.Place(f"s{i}", center.lat + rng.uniform(-1, 1), center.lon + rng.uniform(-1, 1))
+                for i in range(stops + 2)
+            ])
+        started = time.perf_counter()
+        for nodes in routes:
+            geo.plan_route(nodes[0], nodes[-1], nodes[1:-1])
+        elapsed = time.perf_counter() - started
+
+        gap = ""
+        if 4 <= stops <= 8:
+            # Force the heuristic and compare it with the exhaustive order on the same matrices.
+            exact_limit, geo.EXACT_STOP_LIMIT = geo.EXACT_STOP_LIMIT, 0
+            worst = 0.0
+            for nodes in routes[:50]:
+                matrix = [[geo.drive(a, b).minutes for b in nodes] for a in nodes]
+                heuristic = geo._path_minutes(matrix, geo.order_stops(matrix))
+                geo.EXACT_STOP_LIMIT = 99
+                exact = geo._path_minutes(matrix, geo.order_stops(matrix))
+                geo.EXACT_STOP_LIMIT = 0
+                worst = max(worst, heuristic / exact - 1 if exact else 0.0)
+            geo.EXACT_STOP_LIMIT = exact_limit
+            gap = f"   heuristic worst gap vs exact {worst * 100:4.1f}%"
+        print(f"  {stops:2d} stops  {elapsed / args.routes * 1e6:8.0f} us/route{gap}")
+    print(f"drive cache: {geo.drive_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold import and startup time of app.main, with a budget.
+
+Each run starts a fresh interpreter with ``-X importtime``, imports
+``app.main`` and runs the app's startup and shutdown handlers against
+SQLite. Reports the median import and startup time over ``--runs``, the
+heaviest top-level packages by self time, and any modules from
+``--forbid`` that were imported eagerly. Exits 1 when the import median is
+over ``--budget-ms`` or a forbidden module shows up, so a dependency that
+creeps back onto the import path is caught before it reaches a cold start.
+
+    python -m benchmarks.importtime --runs 5 --budget-ms 1500
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+from benchmarks.local_env import configure
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Heavy clients that should only load when first used.
+DEFAULT_FORBIDDEN = ("streamlit", "openai", "boto3", "botocore", "psycopg", "aiosqlite")
+
+_CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded = sorted(name for name in sys.modules if "." not in name)
+async def lifecycle():
+    await app.main.app.router.startup()
+    ready = time.perf_counter()
+    await app.main.app.router.shutdown()
+    return ready
+ready = asyncio.run(lifecycle())
+print(json.dumps({"import_s": imported - started, "startup_s": ready - imported, "modules": loaded}))
+"""
+
+
+def _run_once(workdir: Path) -> tuple[dict, Counter]:
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    self_time: Counter = Counter()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if name.strip() == "app.main":
+            break  # the rest was imported by the startup handlers
+        self_time[name.strip().split(".")[0]] += int(self_us)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), self_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN))
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = configure()
+    runs = [_run_once(workdir) for _ in range(args.runs)]
+    import_ms = statistics.median(result["import_s"] for result, _ in runs) * 1e3
+    startup_ms = statistics.median(result["startup_s"] for result, _ in runs) * 1e3
+    print(f"import app.main   median {import_ms:7.0f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"startup handlers  median {startup_ms:7.0f} ms")
+
+    packages: Counter = Counter()
+    for _, self_time in runs:
+        packages.update(self_time)
+    print("heaviest packages (self time, mean per run):")
+    for name, total_us in packages.most_common(args.top):
+        print(f"  {name:24s} {total_us / len(runs) / 1e3:7.1f} ms")
+
+    eager = sorted(set(args.forbid) & set(runs[-1][0]["modules"]))
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"import took {import_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if failures:
+        print("FAIL: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
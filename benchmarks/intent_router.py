@@ -0,0 +1,70 @@
+"""Accuracy and latency of the local intent router over a replayed utterance corpus.
+
+Compares ``app.intents.classify`` with the substring checks the websocket
+handler used before (``"order" in lower`` and friends). The corpus is one
+JSON object per line with ``text`` and ``intent``; pass ``--corpus`` to
+replay caller turns exported from ``conversation_logs``.
+
+    python -m benchmarks.intent_router
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import time
+
+from app.intents import Intent, classify
+
+CORPUS = Path(__file__).parent / "data" / "intent_corpus.jsonl"
+
+
+def legacy_classify(text: str) -> str:
+    lower = text.lower()
+    if "schedule" in lower or "book" in lower or "appointment" in lower:
+        return Intent.SCHEDULE
+    if "quote" in lower or "estimate" in lower or "price" in lower:
+        return Intent.QUOTE
+    if "status" in lower or "order" in lower or "job" in lower:
+        return Intent.STATUS
+    if "human" in lower or "agent" in lower or "representative" in lower:
+        return Intent.HANDOFF
+    return Intent.OTHER
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def evaluate(name: str, fn, rows: list[dict], rounds: int) -> None:
+    correct = sum(fn(row["text"]) == row["intent"] for row in rows)
+    canned_when_other = sum(
+        fn(row["text"]) != Intent.OTHER and row["intent"] == Intent.OTHER for row in rows
+    )
+    timings: list[float] = []
+    for _ in range(rounds):
+        for row in rows:
+            start = time.perf_counter()
+            fn(row["text"])
+            timings.append(time.perf_counter() - start)
+    print(
+        f"{name:8s} accuracy {correct / len(rows):6.1%}  wrong canned answers {canned_when_other:3d}  "
+        f"p50 {_percentile(timings, 50) * 1e6:6.1f} us  p99 {_percentile(timings, 99) * 1e6:6.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = [json.loads(line) for line in args.corpus.read_text().splitlines() if line.strip()]
+    print(f"{len(rows)} utterances from {args.corpus}")
+    evaluate("legacy", legacy_classify, rows, args.rounds)
+    evaluate("router", lambda text: classify(text).label, rows, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
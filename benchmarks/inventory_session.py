@@ -0,0 +1,118 @@
+"""Per-change cost of ``InventorySession`` against re-running ``summarize_order``.
+
+Simulates a caller listing ``--items`` items one change at a time (mostly
+additions, some quantity corrections and removals). After every change the
+old way re-summarizes the whole order dict; the session applies the delta,
+and ``totals()`` (timed separately) packs the lines into trucks once.
+Totals are compared with ``summarize_order`` after every change, and the
+session's ``ConversationState`` round trip is checked at the end.
+
+    python -m benchmarks.inventory_session --items 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from app.furniture_catalog import _catalog, summarize_order
+from app.inventory import InventorySession
+from app.sessions import ConversationState
+
+
+def _changes(count: int, seed: int) -> list[tuple[str, str, int]]:
+    rng = random.Random(seed)
+    names = [item.name for item in _catalog().values()] + ["couch", "fridge", "queen mattress", "tredmill", "box sprng"]
+    listed: list[str] = []
+    changes = []
+    for _ in range(count):
+        roll = rng.random()
+        if listed and roll < 0.15:
+            changes.append(("set", rng.choice(listed), rng.randrange(0, 4)))
+        elif listed and roll < 0.25:
+            changes.append(("remove", listed.pop(rng.randrange(len(listed))), 0))
+        else:
+            name = rng.choice(names)
+            listed.append(name)
+            changes.append(("add", name, rng.randrange(1, 4)))
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    changes = _changes(args.items, args.seed)
+    session = InventorySession()
+    order: dict[str, int] = {}
+    delta_time = totals_time = full_time = 0.0
+    mismatches = 0
+    for op, name, quantity in changes:
+        started = time.perf_counter()
+        if op == "add":
+            session.add(name, quantity)
+        elif op == "set":
+            session.set_quantity(name, quantity)
+        else:
+            session.remove(name)
+        delta_time += time.perf_counter() - started
+        started = time.perf_counter()
+        totals = session.totals()
+        totals_time += time.perf_counter() - started
+
+        # The old way: edit the spoken-name dict and summarize all of it again.
+        started = time.perf_counter()
+        if op == "add":
+            order[name] = order.get(name, 0) + quantity
+        elif op == "set" and quantity:
+            order[name] = quantity
+        else:
+            order.pop(name, None)
+        summarize_order(order)
+        full_time += time.perf_counter() - started
+
+        # Same lines, same totals (spoken names that match one item are one line in the session).
+        expected = summarize_order(dict(session.lines))
+        if (
+            abs(totals["total_weight_lbs"] - expected["total_weight_lbs"]) > 0.01
+            or abs(totals["total_volume_cuft"] - expected["total_volume_cuft"]) > 0.01
+            or totals["movers_needed"] != expected["movers_needed"]
+            or totals["trucks_needed"] != expected["trucks_needed"]
+            or totals["estimated_labor_hours"] != expected["estimated_labor_hours"]
+            or totals["handling"] != _flag_counts(expected["items"], "handling")
+        ):
+            mismatches += 1
+
+    count = len(changes)
+    print(f"{count} changes, {len(session)} lines, {totals['total_weight_lbs']:,.0f} lbs, {totals['total_volume_cuft']:,.0f} cu ft")
+    print(f"  InventorySession     {delta_time / count * 1e6:8.1f} us/change")
+    print(f"    + totals()         {totals_time / count * 1e6:8.1f} us (packs trucks for the new revision)")
+    print(f"  summarize_order      {full_time / count * 1e6:8.1f} us/change")
+
+    state = ConversationState("bench", inventory=session.to_dict())
+    payload = state.dumps()
+    started = time.perf_counter()
+    restored = InventorySession.from_dict(ConversationState.loads(payload).inventory)
+    restore_us = (time.perf_counter() - started) * 1e6
+    print(f"  state payload {len(payload)} bytes, restore {restore_us:.0f} us")
+    if restored.totals() != session.totals():
+        print("FAIL: restored session differs", file=sys.stderr)
+        sys.exit(1)
+    if mismatches:
+        print(f"FAIL: {mismatches} changes disagreed with summarize_order", file=sys.stderr)
+        sys.exit(1)
+
+
+def _flag_counts(items: list[dict], field: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for item in items:
+        if item[field]:
+            counts[item[field]] = counts.get(item[field], 0) + item["quantity"]
+    return counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Run the FastAPI app locally against SQLite and (optionally) the fake LLM.
+
+Settings are read from ``.streamlit/secrets.toml`` relative to the working
+directory, so ``configure`` writes one into a scratch directory and moves
+there *before* anything under ``app`` is imported.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+
+
+def configure(llm_base_url: str | None = None, database_url: str | None = None) -> Path:
+    workdir = Path(tempfile.mkdtemp(prefix="dash-bench-"))
+    database_url = database_url or f"sqlite:///{workdir / 'bench.db'}"
+    secrets = {
+        "OPENAI_API_KEY": "sk-local-bench",
+        "DATABASE_URL": database_url,
+        "BASE_URL": "http://127.0.0.1",
+        "FROM_EMAIL": "bench@example.com",
+        "AWS_SES_REGION": "us-east-1",
+    }
+    if llm_base_url:
+        secrets["OPENAI_BASE_URL"] = llm_base_url
+
+    (workdir / ".streamlit").mkdir()
+    lines = [f'{key} = "{value}"' for key, value in secrets.items()]
+    (workdir / ".streamlit" / "secrets.toml").write_text("\n".join(lines) + "\n")
+    os.environ["DATABASE_URL"] = database_url
+    os.chdir(workdir)
+    # Claim the root logger before app.logging_conf does, so the per-turn and
+    # per-request INFO lines stay out of benchmark output.
+    logging.basicConfig(level=logging.WARNING)
+    return workdir
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """uvicorn serving ``app.main:app`` from a background thread."""
+
+    def __init__(self, port: int | None = None) -> None:
+        import uvicorn
+
+        from app.main import app
+
+        self.port = port or free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        )
+        self.thread = threading.Thread(target=self.server.run, name="uvicorn", daemon=True)
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/voice/ws"
+
+    @property
+    def http_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "AppServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        # Measure a warm worker: wait for the OpenAI client to finish loading.
+        warmup = self.server.config.app.state.warmup
+        while warmup is not None and not warmup.done():
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
@@ -0,0 +1,133 @@
+"""Order status lookups at scale: notes/ILIKE scans vs the indexed keys.
+
+Loads ``--orders`` synthetic leads (notes in the ``record_order_email``
+format, lookup columns empty) into SQLite, times the old phone and name
+queries, runs the ``order_lookup`` backfill, then times ``find_order``.
+
+    python -m benchmarks.order_lookup --orders 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.local_env import configure
+
+FIRST = ["pat", "sam", "alex", "jordan", "casey", "morgan", "taylor", "jamie", "riley", "drew"]
+LAST = ["smith", "garcia", "nguyen", "patel", "johnson", "okafor", "kowalski", "silva", "cohen", "reyes"]
+
+
+def _phone(i: int) -> str:
+    return f"(555) {i // 10000 % 1000:03d}-{i % 10000:04d}"
+
+
+def _surname(i: int) -> str:
+    return f"{LAST[i // len(FIRST) % len(LAST)]}{i % 997}"
+
+
+def _rows(count: int):
+    for i in range(count):
+        name = f"{FIRST[i % len(FIRST)].title()} {_surname(i).title()}"
+        phone = _phone(i)
+        yield {
+            "ext_ref": f"ORD-{i:08X}",
+            "customer_name": name,
+            "status": "new lead",
+            "eta": "2025-07-08",
+            "notes": f"Name: {name}\nPhone: {phone}\nEmail: lead{i}@example.com\nItems: 1 couch",
+        }
+
+
+def _load(count: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db import get_engine, init_db
+    from app.models import Order
+
+    init_db()
+    rows = _rows(count)
+    with get_engine().begin() as conn:
+        while batch := [row for _, row in zip(range(50_000), rows)]:
+            conn.execute(insert(Order), batch)
+
+
+def _time(fn, probes) -> list[float]:
+    samples = []
+    for probe in probes:
+        start = time.perf_counter()
+        fn(probe)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(0.95 * (len(samples) - 1))]
+    print(f"{label:26} p50 {statistics.median(samples) * 1e3:8.3f} ms  p95 {p95 * 1e3:8.3f} ms")
+
+
+async def _indexed(probes_phone, probes_name) -> None:
+    from app.db import AsyncSessionLocal, dispose_engines
+    from app.order_lookup import find_order
+
+    for label, kwarg, probes in (("indexed phone", "phone", probes_phone), ("indexed name prefix", "name", probes_name)):
+        samples = []
+        async with AsyncSessionLocal() as db:
+            for probe in probes:
+                start = time.perf_counter()
+                order = await find_order(db, **{kwarg: probe})
+                samples.append(time.perf_counter() - start)
+                assert order is not None, probe
+        _report(label, samples)
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        assert await find_order(db, name="nobody") is None
+        _report("indexed name prefix, miss", [time.perf_counter() - start])
+    await dispose_engines()
+
+
+def main(count: int, probes: int) -> None:
+    from sqlalchemy import select
+
+    from app.db import SessionLocal
+    from app.models import Order
+    from app.order_lookup import backfill
+
+    start = time.perf_counter()
+    _load(count)
+    print(f"loaded {count} orders in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(11)
+    targets = [rng.randrange(count) for _ in range(probes)]
+    probes_phone = [_phone(i) for i in targets]
+    probes_name = [_surname(i) for i in targets]
+
+    with SessionLocal() as db:
+        def old_phone(phone):
+            return db.scalars(select(Order).where(Order.notes.contains(phone)).limit(1)).first()
+
+        def old_name(name):
+            return db.scalars(select(Order).where(Order.customer_name.ilike(f"%{name}%")).limit(1)).first()
+
+        # The old queries scan the table, so only a handful of probes are timed.
+        _report("notes LIKE phone", _time(old_phone, probes_phone[:10]))
+        _report("customer_name ILIKE", _time(old_name, probes_name[:10]))
+        _report("customer_name ILIKE, miss", _time(old_name, ["nobody"] * 3))
+
+    start = time.perf_counter()
+    updated = backfill()
+    print(f"backfilled {updated} orders in {time.perf_counter() - start:.1f} s")
+
+    asyncio.run(_indexed(probes_phone, probes_name))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+    configure()
+    main(args.orders, args.probes)
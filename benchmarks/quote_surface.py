@@ -0,0 +1,82 @@
+"""Deviation and speed of the precomputed quote surface against ``compute_quote``.
+
+Prices ``--samples`` random moves inside the surface's domain (weight,
+profile, weekday/weekend, local/intrastate, drive time) both ways, for the
+default rates and for an overridden ruleset, and reports the worst and
+p99 relative error, the worst error in dollars, build time, size and
+lookups per second. Exits 1 when the worst relative error is over
+``--max-rel-error``, so a pricing rule change that the surface cannot
+represent is caught before first-pass prices drift from final quotes.
+
+    python -m benchmarks.quote_surface --samples 200000 --max-rel-error 0.005
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+
+from app.quote_surface import MAX_DRIVE_MINUTES, MAX_WEIGHT_LBS, PROFILES, QuoteSurface
+from app.quotes import DEFAULT_RULES, MoveSpec, PricingRuleset, compute_quote
+
+OVERRIDES = {"local_mover_rate_weekday": 62.5, "intrastate_truck_rate_weekend": 71.0, "protective_per_1000_lbs": 7.25}
+
+
+def _samples(count: int, seed: int) -> list[tuple]:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.uniform(1.0, MAX_WEIGHT_LBS),
+            rng.choice(PROFILES),
+            rng.random() < 0.5,
+            rng.random() < 0.5,
+            rng.uniform(0.0, MAX_DRIVE_MINUTES),
+        )
+        for _ in range(count)
+    ]
+
+
+def check(rules: PricingRuleset, samples: list[tuple]) -> float:
+    started = time.perf_counter()
+    surface = QuoteSurface.build(rules)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    approx = [surface.lookup(*sample)[0] for sample in samples]
+    lookup = time.perf_counter() - started
+    started = time.perf_counter()
+    exact = [compute_quote(MoveSpec(w, p, wk, it, d), rules)["subtotal"] for w, p, wk, it, d in samples]
+    full = time.perf_counter() - started
+
+    errors = sorted(abs(a - e) / e for a, e in zip(approx, exact))
+    worst_usd = max(abs(a - e) for a, e in zip(approx, exact))
+    print(f"ruleset version {rules.version}: built in {build * 1e3:.0f} ms, {surface.nbytes / 1024:.0f} KiB")
+    print(f"  lookup        {len(samples) / lookup:12,.0f}/s")
+    print(f"  compute_quote {len(samples) / full:12,.0f}/s")
+    print(
+        f"  relative error p50 {errors[len(errors) // 2] * 100:.4f}%  p99 {errors[int(len(errors) * 0.99)] * 100:.4f}%  "
+        f"max {errors[-1] * 100:.4f}%  (max ${worst_usd:.2f})"
+    )
+    return errors[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--max-rel-error", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    samples = _samples(args.samples, args.seed)
+    worst = max(
+        check(DEFAULT_RULES, samples),
+        check(PricingRuleset.from_overrides(7, OVERRIDES), samples),
+    )
+    if worst > args.max_rel_error:
+        print(f"FAIL: surface deviates {worst * 100:.3f}% from compute_quote (limit {args.max_rel_error * 100:.3f}%)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""``compute_quotes_batch`` vs a ``compute_quote`` loop over 100k random specs.
+
+Also checks every quote figure matches to the cent.
+
+    python -m benchmarks.quotes_batch --specs 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.furniture_catalog import PROFILE_RATE
+from app.quotes import MoveSpec, compute_quote
+from app.quotes_batch import compute_quotes_batch
+
+FIELDS = [
+    ("movers", "movers"),
+    ("trucks", "trucks"),
+    ("onsite_hours", "onsite_hours"),
+    ("travel_hours", "travel_hours"),
+    ("total_hours", "total_hours"),
+    ("mover_cost", "costs.mover_cost"),
+    ("truck_cost", "costs.truck_cost"),
+    ("protective_materials", "costs.protective_materials"),
+    ("subtotal", "subtotal"),
+]
+
+
+def random_columns(n: int, seed: int = 11) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "total_weight_lbs": np.round(rng.uniform(0, 30000, n), rng.integers(0, 3)),
+        "location_profile": rng.choice(list(PROFILE_RATE), n),
+        "friday_or_saturday": rng.random(n) < 0.3,
+        "is_intrastate": rng.random(n) < 0.4,
+        "origin_to_destination_minutes": rng.uniform(5, 400, n),
+        "warehouse_to_origin_minutes": rng.uniform(5, 120, n),
+        "destination_to_warehouse_minutes": rng.uniform(5, 120, n),
+        "extra_stops": np.where(rng.random(n) < 0.2, rng.integers(1, 4, n), 0),
+        "extra_tasks": rng.integers(0, 4, n),
+        "mover_override": np.where(rng.random(n) < 0.1, rng.integers(0, 7, n), -1),
+        "truck_override": np.where(rng.random(n) < 0.1, rng.integers(1, 5, n), -1),
+    }
+
+
+def _lookup(quote: dict, path: str):
+    for part in path.split("."):
+        quote = quote[part]
+    return quote
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--specs", type=int, default=100_000)
+    args = parser.parse_args()
+    cols = random_columns(args.specs)
+
+    start = time.perf_counter()
+    batch = compute_quotes_batch(**cols)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    quotes = []
+    for i in range(args.specs):
+        extra = int(cols["extra_tasks"][i])
+        override = int(cols["mover_override"][i])
+        trucks = int(cols["truck_override"][i])
+        quotes.append(compute_quote(MoveSpec(
+            total_weight_lbs=float(cols["total_weight_lbs"][i]),
+            location_profile=str(cols["location_profile"][i]),
+            friday_or_saturday=bool(cols["friday_or_saturday"][i]),
+            is_intrastate=bool(cols["is_intrastate"][i]),
+            origin_to_destination_minutes=float(cols["origin_to_destination_minutes"][i]),
+            warehouse_to_origin_minutes=float(cols["warehouse_to_origin_minutes"][i]),
+            destination_to_warehouse_minutes=float(cols["destination_to_warehouse_minutes"][i]),
+            extra_stops=int(cols["extra_stops"][i]),
+            disassembled_beds=extra,
+            mover_override=override if override >= 0 else None,
+            truck_override=trucks if trucks >= 0 else None,
+        )))
+    loop_time = time.perf_counter() - start
+
+    mismatches = 0
+    for column, path in FIELDS:
+        expected = np.array([_lookup(q, path) for q in quotes])
+        mismatches += int(np.count_nonzero(batch[column] != expected))
+
+    print(f"specs:            {args.specs}")
+    print(f"compute_quote:    {loop_time * 1e3:9.1f} ms")
+    print(f"batch:            {batch_time * 1e3:9.1f} ms  ({loop_time / batch_time:.0f}x)")
+    print(f"mismatched cells: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Websocket frames per answer on /voice/ws, per-token versus coalesced.
+
+Runs the same ConversationRelay turns twice against the in-process app and
+the fake streaming LLM from ``benchmarks.fake_llm``: once with
+``RELAY_COALESCE`` off (one frame per LLM delta, as before) and once with
+the ``SpeechChunker`` on. Reports text frames per answer, time to the first
+non-empty frame (what TTS can start speaking) and time to the ``last`` frame.
+
+    python -m benchmarks.relay_chunks --sockets 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.local_env import AppServer, configure
+
+PROMPT = "Do you wrap furniture and what coverage do I get?"
+
+
+async def one_call(url: str, index: int) -> tuple[float, float, list[str]]:
+    from websockets.asyncio.client import connect
+
+    async with connect(url) as sock:
+        await sock.send(json.dumps({
+            "type": "setup",
+            "sessionId": f"VR{index:06d}",
+            "callSid": f"CR{index:06d}",
+            "from": "+15555550100",
+            "to": "+15555550199",
+        }))
+        start = time.perf_counter()
+        await sock.send(json.dumps({"type": "prompt", "voicePrompt": PROMPT, "last": True}))
+        first = None
+        frames: list[str] = []
+        while True:
+            msg = json.loads(await sock.recv())
+            if msg.get("type") != "text":
+                continue
+            frames.append(msg["token"])
+            if first is None and msg["token"]:
+                first = time.perf_counter() - start
+            if msg.get("last"):
+                return first or 0.0, time.perf_counter() - start, frames
+
+
+async def run(url: str, sockets: int, label: str, show: bool) -> str:
+    results = await asyncio.gather(*(one_call(url, i) for i in range(sockets)))
+    frames = [len(r[2]) for r in results]
+    first = [r[0] * 1e3 for r in results]
+    last = [r[1] * 1e3 for r in results]
+    print(
+        f"{label:10s} frames/answer {statistics.mean(frames):6.1f}  "
+        f"first frame p50 {statistics.median(first):7.1f} ms  "
+        f"last frame p50 {statistics.median(last):7.1f} ms"
+    )
+    if show:
+        for frame in results[0][2]:
+            print(f"    {frame!r}")
+    return "".join(results[0][2])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=20)
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--show", action="store_true", help="print one coalesced answer frame by frame")
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(first_token_delay=args.first_token_delay, token_delay=args.token_delay).start_in_thread()
+    configure(llm_base_url=llm.base_url)
+    from app.config import settings
+
+    try:
+        with AppServer() as server:
+            answers = []
+            for label, coalesce in (("per-token", False), ("coalesced", True)):
+                settings.RELAY_COALESCE = coalesce
+                answers.append(asyncio.run(run(server.ws_url, args.sockets, label, show=args.show and coalesce)))
+            assert answers[0] == answers[1], "coalescing changed the spoken text"
+    finally:
+        llm.stop_thread()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Replay recorded ConversationRelay sessions against /voice/ws under load.
+
+Each line of the sessions file (``benchmarks/data/relay_sessions.jsonl`` by
+default) is one call: ``{"name": ..., "frames": [...]}`` where frames are
+the relay's own ``setup`` / ``prompt`` / ``interrupt`` messages plus a
+``delay`` in seconds. A prompt is sent ``delay`` after the previous answer
+finished (the caller's pause); an interrupt is sent ``delay`` after the
+prompt before it (barge-in mid-answer). ``sessionId`` and ``callSid`` are
+generated so replays never collide.
+
+The app runs in-process against SQLite with OpenAI replaced by the fake
+streaming server from ``benchmarks.fake_llm``. Reported:
+
+* time to first text frame and turn latency (prompt to ``last`` frame);
+* event-loop lag of the server's loop, sampled by a probe task;
+* SQL statements per caller turn, counted on both engines.
+
+``--max-ttft-p95-ms`` / ``--max-lag-ms`` turn the run into a pass/fail
+check (exit status 1), for running before a deploy:
+
+    python -m benchmarks.replay --calls 200 --concurrency 50 --max-ttft-p95-ms 600 --max-lag-ms 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import itertools
+import json
+from pathlib import Path
+import sys
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.local_env import AppServer, configure
+
+DEFAULT_SESSIONS = Path(__file__).parent / "data" / "relay_sessions.jsonl"
+
+
+@dataclass
+class Turn:
+    ttft: float | None = None
+    total: float | None = None
+    interrupted: bool = False
+
+
+@dataclass
+class CallResult:
+    turns: list[Turn] = field(default_factory=list)
+    stale_frames: int = 0
+    ended_by_agent: bool = False
+
+
+def load_sessions(path: Path) -> list[dict]:
+    with path.open() as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+async def _read_until(sock, deadline: float | None, turn: Turn | None, started: float) -> str | None:
+    """Read frames until a ``last`` text frame, an ``end`` frame or ``deadline``.
+
+    Returns ``"last"``, ``"end"`` or ``None`` on deadline. With no ``turn``
+    the frames are stale leftovers and are only drained.
+    """
+    while True:
+        timeout = None if deadline is None else deadline - time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            return None
+        try:
+            raw = await asyncio.wait_for(sock.recv(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        msg = json.loads(raw)
+        if msg.get("type") == "end":
+            return "end"
+        if msg.get("type") != "text":
+            continue
+        if turn is None:
+            return "stale"
+        if turn.ttft is None and msg.get("token"):
+            turn.ttft = time.perf_counter() - started
+        if msg.get("last"):
+            turn.total = time.perf_counter() - started
+            return "last"
+
+
+async def replay_call(url: str, session: dict, index: int, speed: float) -> CallResult:
+    from websockets.asyncio.client import connect
+
+    result = CallResult()
+    frames = session["frames"]
+    async with connect(url) as sock:
+        for position, frame in enumerate(frames):
+            delay = frame.get("delay", 0.0) / speed
+            kind = frame["type"]
+            if kind == "setup":
+                await sock.send(json.dumps({
+                    **{k: v for k, v in frame.items() if k != "delay"},
+                    "sessionId": f"VR{index:07d}",
+                    "callSid": f"CR{index:07d}",
+                }))
+            elif kind == "prompt":
+                # The caller's pause; anything still arriving is a leftover of an interrupted answer.
+                pause_ends = time.perf_counter() + delay
+                while await _read_until(sock, pause_ends, None, 0.0) == "stale":
+                    result.stale_frames += 1
+                await sock.send(json.dumps({"type": "prompt", "voicePrompt": frame["voicePrompt"], "last": True}))
+                started = time.perf_counter()
+                turn = Turn()
+                result.turns.append(turn)
+                following = frames[position + 1] if position + 1 < len(frames) else None
+                deadline = None
+                if following is not None and following["type"] == "interrupt":
+                    deadline = started + following.get("delay", 0.0) / speed
+                outcome = await _read_until(sock, deadline, turn, started)
+                if outcome == "end":
+                    result.ended_by_agent = True
+                    return result
+                if outcome is None:
+                    turn.interrupted = True
+            elif kind == "interrupt":
+                if result.turns and result.turns[-1].interrupted:
+                    await sock.send(json.dumps({
+                        "type": "interrupt",
+                        "utteranceUntilInterrupt": frame.get("utteranceUntilInterrupt", ""),
+                    }))
+    return result
+
+
+class LoopLagProbe:
+    """Samples how late the server's event loop wakes up from a short sleep."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    async def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+class StatementCounter:
+    def __init__(self, *engines) -> None:
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(url: str, sessions: list[dict], calls: int, concurrency: int, speed: float) -> list[CallResult]:
+    limit = asyncio.Semaphore(concurrency)
+    picks = itertools.islice(itertools.cycle(sessions), calls)
+
+    async def bounded(index: int, session: dict) -> CallResult:
+        async with limit:
+            return await replay_call(url, session, index, speed)
+
+    return await asyncio.gather(*(bounded(i, s) for i, s in enumerate(picks)))
+
+
+def summarize(results: list[CallResult], lag: list[float], statements: int, elapsed: float) -> dict:
+    turns = [turn for call in results for turn in call.turns]
+    ttft = [t.ttft * 1e3 for t in turns if t.ttft is not None]
+    total = [t.total * 1e3 for t in turns if t.total is not None]
+    lag_ms = [sample * 1e3 for sample in lag]
+    return {
+        "calls": len(results),
+        "turns": len(turns),
+        "interrupted": sum(t.interrupted for t in turns),
+        "handoffs": sum(call.ended_by_agent for call in results),
+        "stale_frames": sum(call.stale_frames for call in results),
+        "elapsed_s": round(elapsed, 2),
+        "ttft_ms": {p: round(_percentile(ttft, q), 1) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+        "turn_ms": {p: round(_percentile(total, q), 1) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+        "loop_lag_ms": {
+            "p50": round(_percentile(lag_ms, 50), 2),
+            "p99": round(_percentile(lag_ms, 99), 2),
+            "max": round(max(lag_ms, default=0.0), 2),
+        },
+        "db_statements_per_turn": round(statements / max(len(turns), 1), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=Path, default=DEFAULT_SESSIONS)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--speed", type=float, default=4.0, help="divide recorded pauses by this")
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    parser.add_argument("--max-ttft-p95-ms", type=float)
+    parser.add_argument("--max-lag-ms", type=float)
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.sessions)
+    llm = FakeLLMServer(first_token_delay=args.first_token_delay).start_in_thread()
+    configure(llm_base_url=llm.base_url)
+    from app.db import get_async_engine, get_engine
+    from app.main import app
+
+    probe = LoopLagProbe()
+    app.add_event_handler("startup", probe.start)
+    app.add_event_handler("shutdown", probe.stop)
+    counter = StatementCounter(get_engine(), get_async_engine().sync_engine)
+    try:
+        with AppServer() as server:
+            baseline = counter.count  # schema creation and pricing load at startup
+            started = time.perf_counter()
+            results = asyncio.run(run(server.ws_url, sessions, args.calls, args.concurrency, args.speed))
+            elapsed = time.perf_counter() - started
+        # Shutdown flushes the last transcript batch, which belongs to these turns.
+        summary = summarize(results, probe.samples, counter.count - baseline, elapsed)
+    finally:
+        llm.stop_thread()
+
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n")
+
+    failures = []
+    if args.max_ttft_p95_ms is not None and summary["ttft_ms"]["p95"] > args.max_ttft_p95_ms:
+        failures.append(f"TTFT p95 {summary['ttft_ms']['p95']} ms > {args.max_ttft_p95_ms} ms")
+    if args.max_lag_ms is not None and summary["loop_lag_ms"]["max"] > args.max_lag_ms:
+        failures.append(f"loop lag max {summary['loop_lag_ms']['max']} ms > {args.max_lag_ms} ms")
+    if failures:
+        print("FAIL: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Availability queries and concurrent reservations against the capacity index.
+
+Seeds ``--appointments`` random bookings over the next ``--days`` days
+into SQLite (sized with ``JobSize.from_weight``), loads the index, then:
+
+* times ``Scheduler.open_slots`` for small to large moves (target: well
+  under a millisecond each);
+* races ``--racers`` reservations for the same start through ``--workers``
+  independent ``Scheduler`` instances, as separate app workers would be,
+  each with an index loaded before the race (so none of them sees the
+  others' bookings). Only as many as the free crew and trucks allow may
+  succeed, and the committed rows must never exceed the capacity.
+
+    python -m benchmarks.scheduling --appointments 2000 --racers 40 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, time as dtime, timedelta
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.local_env import configure
+
+WEIGHTS = (1500.0, 4500.0, 9000.0, 16000.0)
+
+
+def _seed(count: int, days: int, seed: int) -> None:
+    from app.db import SessionLocal, init_db
+    from app.models import Appointment
+    from app.scheduling import CapacityIndex, JobSize, company_now
+
+    init_db()
+    rng = random.Random(seed)
+    index = CapacityIndex.from_settings()
+    first_day = company_now().date() + timedelta(days=1)
+    rows = []
+    for i in range(count * 4):
+        if len(rows) == count:
+            break
+        job = JobSize.from_weight(rng.choice(WEIGHTS[:3]))
+        start = index.slot_time(first_day + timedelta(days=rng.randrange(days)), rng.randrange(index.slots_per_day))
+        if not index.fits(start, job):
+            continue
+        index.add(i, start, job)
+        end = start + timedelta(minutes=index.length(job) * index.slot_minutes)
+        rows.append(Appointment(
+            customer_name=f"Seed {i}", phone=f"555{i:07d}", email="", datetime_iso=start.isoformat(),
+            origin_addr="1 Main St", destination_addr="9 Elm St",
+            start_at=start, end_at=end, movers=job.movers, trucks=job.trucks,
+        ))
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+    print(f"seeded {len(rows)} appointments over {days} days")
+
+
+def _time_queries(queries: int) -> None:
+    from app.scheduling import JobSize, Scheduler
+
+    sched = Scheduler()
+    started = time.perf_counter()
+    sched.index
+    print(f"index load: {(time.perf_counter() - started) * 1e3:.1f} ms for {len(sched.index)} appointments")
+    for weight in WEIGHTS:
+        job = JobSize.from_weight(weight)
+        samples = []
+        for _ in range(queries):
+            started = time.perf_counter()
+            slots = sched.open_slots(job, count=5)
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        print(
+            f"  {weight:7.0f} lbs ({job.movers} movers, {job.trucks} trucks, {job.hours:4.1f} h): "
+            f"p50 {statistics.median(samples) * 1e6:6.0f} us  p99 {samples[int(len(samples) * 0.99)] * 1e6:6.0f} us  "
+            f"first {slots[0].isoformat(timespec='minutes') if slots else '-'}"
+        )
+
+
+async def _race(racers: int, workers: int) -> tuple[int, int, int, int]:
+    from sqlalchemy import func, select
+
+    from app.db import AsyncSessionLocal
+    from app.models import Appointment
+    from app.scheduling import JobSize, Scheduler, SlotUnavailable, company_now
+
+    # A day past the seeded ones, so the free capacity is the whole crew.
+    start = datetime.combine(company_now().date() + timedelta(days=400), dtime(9, 0))
+    job = JobSize(movers=2, trucks=1, hours=4.0)
+    schedulers = [Scheduler() for _ in range(workers)]
+    for sched in schedulers:
+        await asyncio.to_thread(lambda s=sched: s.index)
+    capacity = min(schedulers[0].index.movers // job.movers, schedulers[0].index.trucks // job.trucks)
+
+    async def attempt(i: int) -> bool:
+        try:
+            await schedulers[i % workers].reserve(
+                start, job, customer_name=f"Racer {i}", phone="5550000000", email="",
+                datetime_iso=start.isoformat(), origin_addr="a", destination_addr="b",
+            )
+            return True
+        except SlotUnavailable:
+            return False
+
+    results = await asyncio.gather(*(attempt(i) for i in range(racers)))
+    async with AsyncSessionLocal() as db:
+        committed = await db.scalar(select(func.count()).select_from(Appointment).where(Appointment.start_at == start))
+        trucks = await db.scalar(select(func.sum(Appointment.trucks)).where(Appointment.start_at == start))
+    return sum(results), committed, capacity, trucks or 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appointments", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--racers", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    configure()
+    from app.db import dispose_engines
+
+    _seed(args.appointments, args.days, args.seed)
+    _time_queries(args.queries)
+    succeeded, committed, capacity, trucks = asyncio.run(_race(args.racers, args.workers))
+    asyncio.run(dispose_engines())
+    print(
+        f"race: {args.racers} reservations for one start via {args.workers} workers: "
+        f"{succeeded} succeeded, {committed} rows committed, capacity {capacity}, trucks held {trucks}"
+    )
+    if committed > capacity or succeeded != committed:
+        print("FAIL: capacity oversubscribed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
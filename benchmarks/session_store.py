@@ -0,0 +1,96 @@
+"""Prompt size over a long call, and session hand-off between workers.
+
+Replays a synthetic 60-turn call through ``ConversationState`` and reports
+the history sent to the LLM per turn against resending the whole call, and
+how often the previous turn's prompt is a prefix of the next one (what
+provider-side prompt caching needs). Then two ``SharedSessionStore``
+instances (two workers) share one ``InMemoryBackend``: the call moves from
+one to the other mid-way and must resume with its context.
+
+    python -m benchmarks.session_store
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from benchmarks.local_env import configure
+
+CALLER = [
+    "Hi, I'm moving from a three bedroom house on Oak Street to an apartment about 12 miles away.",
+    "We have a king bed, two dressers, a sectional couch and a fridge.",
+    "The new place is on the third floor and there is an elevator but it's small.",
+    "Would Saturday the 14th work, or is Friday cheaper?",
+    "Okay, and do you bring the blankets and the wrap or do I need to buy those?",
+    "My name is Pat Smith and my number is 555 555 0100.",
+]
+AGENT = (
+    "Thanks, that helps. For a move like that we would usually send a three person crew with one truck. "
+    "I'll note the elevator so the crew brings dollies and door jamb protection. "
+    "Is there anything fragile or unusually heavy, like a piano or a safe, that we should plan for?"
+)
+
+
+def replay(turns: int):
+    from app.prompts import count_tokens
+    from app.sessions import ConversationState
+
+    state = ConversationState("bench")
+    full: list[dict] = []
+    sent_budgeted, sent_full = [], []
+    previous: list[dict] = []
+    prefix_kept = 0
+    for i in range(turns):
+        caller = CALLER[i % len(CALLER)]
+        history = state.messages()
+        sent_budgeted.append(sum(count_tokens(m["content"]) for m in history))
+        sent_full.append(sum(count_tokens(m["content"]) for m in full))
+        # Provider prompt caching pays off when last turn's prompt is a prefix of this one.
+        prefix_kept += history[: len(previous)] == previous
+        previous = [*history, {"role": "user", "content": caller}]
+        for role, text in (("user", caller), ("assistant", AGENT)):
+            state.add_turn(role, text)
+            full.append({"role": role, "content": text})
+    return state, sent_budgeted, sent_full, prefix_kept
+
+
+async def handoff(turns: int) -> None:
+    from app.sessions import ConversationState, InMemoryBackend, SharedSessionStore
+
+    backend = InMemoryBackend()
+    worker_a, worker_b = SharedSessionStore(backend), SharedSessionStore(backend)
+    state = ConversationState("CA-handoff", call_sid="CA1")
+    for i in range(turns):
+        state.add_turn("user", CALLER[i % len(CALLER)])
+        worker_a.save(state)
+    await worker_a.flush()
+
+    start = time.perf_counter()
+    resumed = await worker_b.load("CA-handoff")
+    load_ms = (time.perf_counter() - start) * 1e3
+    assert resumed is not None and resumed.messages() == state.messages()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        worker_b.save(resumed)
+    save_us = (time.perf_counter() - start) * 1e3  # total ms for 1000 saves == us per save
+    await worker_b.flush()
+    print(
+        f"hand-off: worker B resumed {len(resumed.turns)} turns in {load_ms:.2f} ms; "
+        f"save costs {save_us:.2f} us on the voice path; {turns + 1000} saves coalesced into "
+        f"{backend.sets} backend writes"
+    )
+
+
+def main(turns: int = 60) -> None:
+    state, budgeted, full, prefix_kept = replay(turns)
+    for turn in (1, 10, 20, 40, turns):
+        print(f"turn {turn:3}: history sent ~{budgeted[turn - 1]:5} tokens (whole call: ~{full[turn - 1]:5})")
+    print(f"summary after {turns} turns: {len(state.summary.splitlines())} lines, {len(state.turns)} recent turns kept")
+    print(f"previous prompt reused as prefix on {prefix_kept}/{turns} turns")
+    asyncio.run(handoff(turns))
+
+
+if __name__ == "__main__":
+    configure()
+    main()
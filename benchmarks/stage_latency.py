@@ -0,0 +1,86 @@
+"""Per-stage latency breakdown of voice turns, read back from /metrics.
+
+Drives ConversationRelay calls against the in-process app and the fake LLM
+(``benchmarks.fake_llm``), mixing canned-intent and LLM turns, then prints
+the p50/p95/p99 that ``/metrics/latency`` reports for each stage and checks
+that ``/metrics`` parses as Prometheus text. Also times the cost of one
+histogram observation, the price of leaving the instrumentation on.
+
+    python -m benchmarks.stage_latency --sockets 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import timeit
+import urllib.request
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.local_env import AppServer, configure
+
+PROMPTS = ["Do you wrap furniture and what coverage do I get?", "I need a quote", "What about my piano?"]
+
+
+async def one_call(url: str, index: int) -> None:
+    from websockets.asyncio.client import connect
+
+    async with connect(url) as sock:
+        await sock.send(json.dumps({
+            "type": "setup",
+            "sessionId": f"VM{index:06d}",
+            "callSid": f"CM{index:06d}",
+            "from": "+15555550100",
+            "to": "+15555550199",
+        }))
+        for text in PROMPTS:
+            await sock.send(json.dumps({"type": "prompt", "voicePrompt": text, "last": True}))
+            while True:
+                msg = json.loads(await sock.recv())
+                if msg.get("type") == "text" and msg.get("last"):
+                    break
+
+
+async def run(url: str, sockets: int) -> None:
+    await asyncio.gather(*(one_call(url, i) for i in range(sockets)))
+
+
+def _get(url: str) -> bytes:
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=20)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer().start_in_thread()
+    configure(llm_base_url=llm.base_url)
+    from app.metrics import STAGE_SECONDS
+
+    try:
+        with AppServer() as server:
+            asyncio.run(run(server.ws_url, args.sockets))
+            latency = json.loads(_get(f"{server.http_url}/metrics/latency"))
+            exposition = _get(f"{server.http_url}/metrics").decode()
+    finally:
+        llm.stop_thread()
+
+    print(f"{'stage':26s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for stage, stats in latency.items():
+        print(
+            f"{stage:26s} {stats['count']:6d} {stats['p50'] * 1e3:9.2f} "
+            f"{stats['p95'] * 1e3:9.2f} {stats['p99'] * 1e3:9.2f}"
+        )
+    samples = [line for line in exposition.splitlines() if line and not line.startswith("#")]
+    assert all(len(line.rsplit(" ", 1)) == 2 for line in samples)
+    print(f"/metrics: {len(samples)} samples, {len(exposition)} bytes")
+
+    series = STAGE_SECONDS.labels("bench_overhead")
+    cost = min(timeit.repeat(lambda: series.observe(0.001), number=100_000, repeat=5)) / 100_000
+    print(f"one observation: {cost * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
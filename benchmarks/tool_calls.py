@@ -0,0 +1,136 @@
+"""Quote requests on /voice/ws with and without LLM tool calling.
+
+The caller gives everything up front ("20 miles, 3 rooms, stairs, on a
+Saturday"). Without tools (``LLM_TOOLS=false``) the quote intent gets the
+canned question, the caller has to repeat the details, and the LLM still
+has no price to give. With tools the fake LLM (``benchmarks.fake_llm``)
+calls ``get_quote``, the app speaks the filler while the quote runs in a
+worker thread, and the priced answer arrives in the same turn.
+
+Each socket asks twice; the second ask is served from the call's tool cache.
+A booking run checks that a repeated ``book_appointment`` creates one row.
+
+    python -m benchmarks.tool_calls --sockets 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import statistics
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.local_env import AppServer, configure
+
+PROMPT = "How much to move 3 rooms 20 miles, with stairs, on a Saturday?"
+QUOTE_ARGS = {"miles": 20, "rooms": 3, "stairs": True, "piano": False, "weekend": True}
+BOOKING_ARGS = {
+    "customer_name": "Bench Caller",
+    "phone": "+15555550100",
+    "datetime_iso": "2030-06-01T08:00:00",
+    "origin_addr": "1 Main St",
+    "destination_addr": "9 Elm St",
+}
+
+
+async def ask(sock, text: str) -> tuple[float, float, str]:
+    start = time.perf_counter()
+    await sock.send(json.dumps({"type": "prompt", "voicePrompt": text, "last": True}))
+    first = None
+    spoken: list[str] = []
+    while True:
+        msg = json.loads(await sock.recv())
+        if msg.get("type") != "text":
+            continue
+        spoken.append(msg["token"])
+        if first is None and msg["token"]:
+            first = time.perf_counter() - start
+        if msg.get("last"):
+            return first or 0.0, time.perf_counter() - start, "".join(spoken)
+
+
+async def one_call(url: str, index: int, prompts: list[str]) -> list[tuple[float, float, str]]:
+    from websockets.asyncio.client import connect
+
+    async with connect(url) as sock:
+        await sock.send(json.dumps({
+            "type": "setup",
+            "sessionId": f"VT{index:06d}",
+            "callSid": f"CT{index:06d}",
+            "from": "+15555550100",
+            "to": "+15555550199",
+        }))
+        return [await ask(sock, text) for text in prompts]
+
+
+def _report(label: str, timings: list[tuple[float, float, str]]) -> None:
+    first = [t[0] * 1e3 for t in timings]
+    done = [t[1] * 1e3 for t in timings]
+    print(f"  {label:26s} first frame p50 {statistics.median(first):7.1f} ms  answer p50 {statistics.median(done):7.1f} ms")
+
+
+async def run(url: str, sockets: int, prompts: list[str]) -> list[list[tuple[float, float, str]]]:
+    return await asyncio.gather(*(one_call(url, i, prompts) for i in range(sockets)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=20)
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(
+        first_token_delay=args.first_token_delay,
+        tool_call=("get_quote", QUOTE_ARGS),
+        tool_reply="That comes to about {estimate_usd} dollars with {movers} movers.",
+    ).start_in_thread()
+    configure(llm_base_url=llm.base_url)
+    from sqlalchemy import func, select
+
+    from app import tools
+    from app.config import settings
+    from app.db import SessionLocal
+    from app.models import Appointment
+
+    computed = 0
+
+    def counted_quote(**kwargs):
+        nonlocal computed
+        computed += 1
+        return quote(**kwargs)
+
+    quote = tools.TOOLS["get_quote"].func
+    tools.TOOLS["get_quote"] = dataclasses.replace(tools.TOOLS["get_quote"], func=counted_quote)
+    try:
+        with AppServer() as server:
+            expected = f"{quote(**QUOTE_ARGS)['estimate_usd']}"
+            settings.LLM_TOOLS = False
+            calls = asyncio.run(run(server.ws_url, args.sockets, [PROMPT, "20 miles and 3 rooms, with stairs."]))
+            print(f"without tools ({args.sockets} sockets): 2 caller turns, priced answer: {expected in calls[0][1][2]}")
+            _report("turn 1 (canned question)", [c[0] for c in calls])
+            _report("turn 2 (LLM, no price)", [c[1] for c in calls])
+
+            settings.LLM_TOOLS = True
+            calls = asyncio.run(run(server.ws_url, args.sockets, [PROMPT, PROMPT]))
+            priced = all(expected in turn[2] for call in calls for turn in call)
+            print(f"with tools ({args.sockets} sockets): 1 caller turn, priced answer: {priced}")
+            print(f"  {calls[0][0][2]!r}")
+            _report("ask 1 (tool run)", [c[0] for c in calls])
+            _report("ask 2 (tool cache)", [c[1] for c in calls])
+            print(f"  quotes computed: {computed} for {2 * args.sockets} asks")
+
+            llm.tool_call = ("book_appointment", BOOKING_ARGS)
+            llm.tool_reply = "You're booked, confirmation number {appointment_id}."
+            text = "Book 1 Main St to 9 Elm St on June 1 at 8am, Bench Caller, 555 555 0100."
+            asyncio.run(run(server.ws_url, 1, [text, text]))
+        with SessionLocal() as db:
+            rows = db.scalar(select(func.count()).select_from(Appointment).where(Appointment.customer_name == "Bench Caller"))
+        print(f"booking asked twice on one call: {rows} appointment row(s)")
+    finally:
+        llm.stop_thread()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Truck packing by volume and weight (``app.truck_loading.plan_loads``).
+
+For random catalog orders of 10 to ``--max-lines`` line items, and for
+bulky, light orders (sofas, mattresses, storage beds), reports:
+
+* time per ``plan_loads`` call;
+* trucks from packing against the weight-only ``trucks_needed`` and the
+  lower bound (total cubic feet or weight over one truck's capacity);
+* that every plan is valid: each load within the truck's usable cubic feet
+  and payload, and every unit placed exactly once.
+
+    python -m benchmarks.truck_loading --orders 200 --max-lines 5000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from app.furniture_catalog import _catalog, trucks_needed
+from app.truck_loading import TruckModel, plan_loads
+
+BULKY = (
+    "sofa - sec. per section", "bed king - mattress", "bed queen - storage", "bed king - storage",
+    "statue (medium)", "patio sofa", "bathtub", "water fountain (medium)", "conference table (large)",
+)
+
+
+def _order(rng: random.Random, lines: int, keys: list[str]) -> list[tuple[float, float, int]]:
+    items = _catalog()
+    return [(item.volume, item.weight, rng.randrange(1, 5)) for item in (items[rng.choice(keys)] for _ in range(lines))]
+
+
+def _check(order: list[tuple[float, float, int]], truck: TruckModel) -> tuple[int, int, int, float]:
+    started = time.perf_counter()
+    plan = plan_loads(order, truck)
+    elapsed = time.perf_counter() - started
+    units = sum(qty for volume, weight, qty in order if volume > 0 or weight > 0)
+    if sum(load.units for load in plan.loads) != units:
+        raise AssertionError("units lost or duplicated")
+    for load in plan.loads:
+        if load.volume_cuft > truck.usable_cuft + 1e-6 or load.weight_lbs > truck.payload_lbs + 1e-6:
+            raise AssertionError(f"overloaded truck {load}")
+    weight = sum(weight * qty for _, weight, qty in order)
+    return plan.trucks, plan.lower_bound, trucks_needed(weight), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--max-lines", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    truck = TruckModel.from_settings()
+    print(f"truck: {truck.usable_cuft:.0f} usable cu ft ({truck.volume_cuft:.0f} x {truck.load_factor}), {truck.payload_lbs:.0f} lbs")
+    everything = list(_catalog())
+    bulky = [key for key in BULKY if key in _catalog()]
+    sizes = [size for size in (10, 50, 200, 1000, 5000, 20000) if size <= args.max_lines]
+    try:
+        for label, keys in (("catalog", everything), ("bulky", bulky)):
+            for lines in sizes:
+                trucks = bounds = weight_only = 0
+                at_bound = 0
+                timings = []
+                for _ in range(max(1, args.orders * 10 // lines)):
+                    planned, lower, by_weight, elapsed = _check(_order(rng, lines, keys), truck)
+                    trucks += planned
+                    bounds += lower
+                    weight_only += by_weight
+                    at_bound += planned == lower
+                    timings.append(elapsed)
+                runs = len(timings)
+                print(
+                    f"  {label:8s} {lines:6d} lines: {statistics.median(timings) * 1e3:7.2f} ms/plan  "
+                    f"trucks {trucks / runs:7.1f}  lower bound {bounds / runs:7.1f}  weight-only {weight_only / runs:7.1f}  "
+                    f"at bound {at_bound}/{runs}"
+                )
+    except AssertionError as exc:
+        print(f"FAIL: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
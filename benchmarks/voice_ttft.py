@@ -0,0 +1,81 @@
+"""Time-to-first-token on /voice/ws under N concurrent ConversationRelay sockets.
+
+The app runs in-process against SQLite, with OpenAI replaced by the fake
+streaming server from ``benchmarks.fake_llm`` (250 ms to first token by
+default). Because every socket waits on the same fake latency, TTFT well
+above that floor means the event loop was blocked by someone else's turn.
+
+    python -m benchmarks.voice_ttft --sockets 1 10 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.local_env import AppServer, configure
+
+PROMPT = "Do you wrap furniture and what coverage do I get?"
+
+
+async def one_call(url: str, index: int) -> tuple[float, float]:
+    from websockets.asyncio.client import connect
+
+    async with connect(url) as sock:
+        await sock.send(json.dumps({
+            "type": "setup",
+            "sessionId": f"VX{index:06d}",
+            "callSid": f"CA{index:06d}",
+            "from": "+15555550100",
+            "to": "+15555550199",
+        }))
+        start = time.perf_counter()
+        await sock.send(json.dumps({"type": "prompt", "voicePrompt": PROMPT, "last": True}))
+        first = None
+        while True:
+            msg = json.loads(await sock.recv())
+            if msg.get("type") != "text":
+                continue
+            if first is None and msg.get("token"):
+                first = time.perf_counter() - start
+            if msg.get("last"):
+                return first or 0.0, time.perf_counter() - start
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(url: str, sockets: int) -> None:
+    results = await asyncio.gather(*(one_call(url, i) for i in range(sockets)))
+    ttft = [r[0] * 1e3 for r in results]
+    turn = [r[1] * 1e3 for r in results]
+    print(
+        f"{sockets:4d} sockets  TTFT p50 {statistics.median(ttft):7.1f} ms  "
+        f"p95 {_percentile(ttft, 95):7.1f} ms  max {max(ttft):7.1f} ms  "
+        f"turn p50 {statistics.median(turn):7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(first_token_delay=args.first_token_delay).start_in_thread()
+    configure(llm_base_url=llm.base_url)
+    try:
+        with AppServer() as server:
+            for count in args.sockets:
+                asyncio.run(run(server.ws_url, count))
+    finally:
+        llm.stop_thread()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Requests per second on the Twilio voice webhooks, called in-process.
+
+Compares the cached-TwiML routes with a copy of the previous handlers
+(f-string TwiML per call, Starlette form parsing for ``/voice/after``).
+
+    python -m benchmarks.voice_webhooks
+"""
+import asyncio
+import json
+import time
+
+from benchmarks.asgi import request
+from benchmarks.local_env import configure
+
+CALL = {"CallSid": "CA" + "0" * 32, "From": "+15555550100", "To": "+15555551234", "CallStatus": "ringing"}
+HANDOFF = dict(CALL, HandoffData=json.dumps({"reasonCode": "live-agent-handoff"}))
+
+
+def _legacy_app():
+    from fastapi import FastAPI, Request
+    from fastapi.responses import Response
+
+    from app.config import settings
+
+    from app.main import app as current
+
+    # Same middleware and route table as the real app, with the old handlers in front.
+    app = FastAPI()
+    app.user_middleware = list(current.user_middleware)
+
+    @app.post("/voice/incoming")
+    async def incoming_call(_: Request):
+        xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+  <Connect action="{settings.BASE_URL}/voice/after">
+    <ConversationRelay url="{settings.WS_URL}" ttsProvider="ElevenLabs" voice="{settings.ELEVENLABS_VOICE_ID}"
+      language="en-US" interruptible="speech" reportInputDuringAgentSpeech="speech"
+      welcomeGreeting="Hi, thanks for calling {settings.COMPANY_NAME}. How can I help with your move today?" />
+  </Connect>
+</Response>"""
+        return Response(content=xml, media_type="text/xml")
+
+    @app.post("/voice/after")
+    async def after_connect(request: Request):
+        form = await request.form()
+        if "live-agent" in form.get("HandoffData", ""):
+            xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response><Say>Connecting you to a specialist now.</Say><Dial>{settings.TWILIO_FORWARD_NUMBER}</Dial></Response>"""
+        else:
+            xml = """<?xml version="1.0" encoding="UTF-8"?>
+<Response><Say>Thanks for calling. Goodbye!</Say></Response>"""
+        return Response(content=xml, media_type="text/xml")
+
+    app.router.routes.extend(current.router.routes)
+    return app
+
+
+def _has_multipart() -> bool:
+    try:
+        import multipart  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def throughput(app, path: str, form: dict, rounds: int) -> float:
+    for _ in range(50):
+        await request(app, "POST", path, form=form)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        status, _ = await request(app, "POST", path, form=form)
+    assert status == 200, status
+    return rounds / (time.perf_counter() - start)
+
+
+async def main(rounds: int = 5000) -> None:
+    from app.main import app
+
+    legacy = _legacy_app()
+    for label, path, form in (
+        ("incoming", "/voice/incoming", CALL),
+        ("after, goodbye", "/voice/after", CALL),
+        ("after, live agent", "/voice/after", HANDOFF),
+    ):
+        after = await throughput(app, path, form, rounds)
+        if path == "/voice/after" and not _has_multipart():
+            # The old handler used request.form(), which needs python-multipart.
+            print(f"{label:18} previous      n/a (python-multipart missing)  cached {after:8.0f} req/s")
+            continue
+        before = await throughput(legacy, path, form, rounds)
+        print(f"{label:18} previous {before:8.0f} req/s  cached {after:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    configure()
+    asyncio.run(main())